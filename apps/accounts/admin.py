@@ -7,7 +7,7 @@ from django.contrib import admin, messages
 from django.db import transaction
 from django.utils.timezone import now, localtime
 
-from .models import VerificationCode
+from .models import RevokedToken, VerificationCode
 
 
 @admin.register(VerificationCode)
@@ -121,3 +121,13 @@ class VerificationCodeAdmin(admin.ModelAdmin):
         )
 
     actions = ("mark_as_consumed", "purge_expired", "purge_old_consumed")
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "jti", "user", "revoked_at", "expires_at")
+    list_select_related = ("user",)
+    search_fields = ("jti",)
+    raw_id_fields = ("user",)
+    readonly_fields = ("revoked_at",)
+    ordering = ("-revoked_at",)
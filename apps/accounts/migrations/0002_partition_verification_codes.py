@@ -0,0 +1,96 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:15
+
+from django.db import migrations, models
+
+# verification_codes -> range-partitioned by created_at (daily partitions).
+# Further partitions are created by `manage.py maintain_partitions`.
+PARTITION = """
+ALTER TABLE verification_codes RENAME TO verification_codes_old;
+
+CREATE TABLE verification_codes
+    (LIKE verification_codes_old INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+    PARTITION BY RANGE (created_at);
+-- catch-all; also keeps codes older than the daily partitions below
+CREATE TABLE verification_codes_default PARTITION OF verification_codes DEFAULT;
+
+DO $$
+DECLARE
+    today timestamptz := date_trunc('day', now(), 'UTC');
+    d timestamptz;
+BEGIN
+    FOR i IN -30..7 LOOP
+        d := today + make_interval(days => i);
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF verification_codes FOR VALUES FROM (%L) TO (%L)',
+            'verification_codes_p' || to_char(d AT TIME ZONE 'UTC', 'YYYY_MM_DD'),
+            d, d + interval '1 day'
+        );
+    END LOOP;
+END $$;
+
+INSERT INTO verification_codes SELECT * FROM verification_codes_old;
+DROP TABLE verification_codes_old;
+
+-- a primary key on a partitioned table must include the partition key
+ALTER TABLE verification_codes ADD PRIMARY KEY (id, created_at);
+CREATE INDEX vc_tid_purp_cons_exp_cre_idx ON verification_codes
+    (telegram_id, purpose, consumed, expires_at, created_at);
+CREATE INDEX vc_tuser_purp_cons_exp_cre_idx ON verification_codes
+    (telegram_username, purpose, consumed, expires_at, created_at);
+CREATE INDEX verification_codes_created_at_9bdf361c ON verification_codes (created_at);
+CREATE INDEX verification_codes_expires_at_b4051d1d ON verification_codes (expires_at);
+"""
+
+UNPARTITION = """
+ALTER TABLE verification_codes RENAME TO verification_codes_part;
+CREATE TABLE verification_codes
+    (LIKE verification_codes_part INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+INSERT INTO verification_codes SELECT * FROM verification_codes_part;
+DROP TABLE verification_codes_part;
+
+ALTER TABLE verification_codes ADD PRIMARY KEY (id);
+CREATE INDEX vc_tid_purp_cons_exp_cre_idx ON verification_codes
+    (telegram_id, purpose, consumed, expires_at, created_at);
+CREATE INDEX vc_tuser_purp_cons_exp_cre_idx ON verification_codes
+    (telegram_username, purpose, consumed, expires_at, created_at);
+CREATE INDEX verification_codes_created_at_9bdf361c ON verification_codes (created_at);
+CREATE INDEX verification_codes_expires_at_b4051d1d ON verification_codes (expires_at);
+CREATE INDEX verification_codes_consumed_ead15021 ON verification_codes (consumed);
+CREATE INDEX verification_codes_telegram_id_6e18573e ON verification_codes (telegram_id);
+CREATE INDEX verification_codes_telegram_username_0e22ba4d
+    ON verification_codes (telegram_username);
+CREATE INDEX verification_codes_telegram_username_0e22ba4d_like
+    ON verification_codes (telegram_username varchar_pattern_ops);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(PARTITION, reverse_sql=UNPARTITION),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="verificationcode",
+                    name="consumed",
+                    field=models.BooleanField(default=False),
+                ),
+                migrations.AlterField(
+                    model_name="verificationcode",
+                    name="telegram_id",
+                    field=models.BigIntegerField(null=True),
+                ),
+                migrations.AlterField(
+                    model_name="verificationcode",
+                    name="telegram_username",
+                    field=models.CharField(blank=True, max_length=50, null=True),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:15
+
+import apps.core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_partition_verification_codes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="verificationcode",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
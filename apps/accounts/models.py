@@ -1,7 +1,6 @@
 # apps/accounts/models.py
 from __future__ import annotations
 
-import uuid
 from datetime import timedelta
 from typing import Optional
 
@@ -9,11 +8,24 @@ from django.db import models, transaction
 from django.db.models import Q
 from django.utils import timezone
 
+from apps.core.ids import uuid7
+
+# verification_codes is partitioned by created_at (daily). No code lives
+# longer than this, so alive() can bound created_at and Postgres only scans
+# the latest one or two partitions.
+CODE_MAX_TTL = timedelta(hours=1)
+
 
 class VerificationCodeQuerySet(models.QuerySet):
     def alive(self) -> "VerificationCodeQuerySet":
         now = timezone.now()
-        return self.filter(consumed=False, expires_at__gt=now)  # type: ignore
+        # the upper bound lets Postgres prune the DEFAULT partition too
+        return self.filter(  # type: ignore
+            consumed=False,
+            expires_at__gt=now,
+            created_at__gt=now - CODE_MAX_TTL,
+            created_at__lte=now + timedelta(minutes=1),
+        )
 
     def for_target(
         self,
@@ -49,6 +61,24 @@ class VerificationCodeQuerySet(models.QuerySet):
             .first()
         )
 
+    async def alatest_alive_for(
+        self,
+        *,
+        telegram_id: Optional[int] = None,
+        telegram_username: Optional[str] = None,
+        purpose: Optional[str] = None,
+    ) -> Optional["VerificationCode"]:
+        return (
+            await self.alive()
+            .for_target(
+                telegram_id=telegram_id,
+                telegram_username=telegram_username,
+                purpose=purpose,
+            )
+            .order_by("-created_at")
+            .afirst()
+        )
+
 
 class VerificationCodeManager(models.Manager.from_queryset(VerificationCodeQuerySet)):
     def issue(
@@ -61,7 +91,8 @@ class VerificationCodeManager(models.Manager.from_queryset(VerificationCodeQuery
         ttl_minutes: int = 2,
     ) -> "VerificationCode":
 
-        expires = timezone.now() + timedelta(minutes=ttl_minutes)
+        ttl = min(timedelta(minutes=ttl_minutes), CODE_MAX_TTL)
+        expires = timezone.now() + ttl
         return self.create(  # type: ignore
             telegram_id=telegram_id,
             telegram_username=(telegram_username or None),
@@ -89,19 +120,18 @@ class VerificationCode(models.Model):
         REGISTER = "register", "Register"
         LOGIN = "login", "Login"
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
-    telegram_id = models.BigIntegerField(db_index=True, null=True)
-    telegram_username = models.CharField(
-        max_length=50, null=True, blank=True, db_index=True
-    )
+    # lookups go through the composite indexes below
+    telegram_id = models.BigIntegerField(null=True)
+    telegram_username = models.CharField(max_length=50, null=True, blank=True)
 
     code = models.CharField(max_length=6)
     purpose = models.CharField(max_length=10, choices=Purpose.choices)  # type: ignore
 
     created_at = models.DateTimeField(default=timezone.now, db_index=True)
     expires_at = models.DateTimeField(db_index=True)
-    consumed = models.BooleanField(default=False, db_index=True)
+    consumed = models.BooleanField(default=False)
 
     from typing import ClassVar
 
@@ -148,4 +178,41 @@ class VerificationCode(models.Model):
     def consume(self) -> None:
         if not self.consumed:
             self.consumed = True
-            self.save(update_fields=["consumed"])
+            # created_at pins the UPDATE to one partition (PK is id+created_at)
+            VerificationCode.objects.filter(
+                pk=self.pk, created_at=self.created_at
+            ).update(consumed=True)
+
+
+class RevokedToken(models.Model):
+    """
+    One revoked token (jti) or all tokens of a user issued before revoked_at
+    (user). Rows are useless once the tokens they cover have expired and are
+    purged by apps/accounts/revocation.py.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    jti = models.CharField(max_length=64, null=True, blank=True, unique=True)
+    user = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="revoked_tokens",
+    )
+    revoked_at = models.DateTimeField(default=timezone.now, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = "revoked_tokens"
+        constraints = [
+            models.CheckConstraint(
+                check=Q(jti__isnull=False, user__isnull=True)
+                | Q(jti__isnull=True, user__isnull=False),
+                name="revoked_token_jti_xor_user",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        target = f"jti={self.jti}" if self.jti else f"user={self.user_id}"  # type: ignore[attr-defined]
+        return f"RevokedToken<{target}> until {self.expires_at:%Y-%m-%d %H:%M}"
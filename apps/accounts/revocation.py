@@ -0,0 +1,184 @@
+# apps/accounts/revocation.py
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from apps.core.bloom import BloomFilter
+from .models import RevokedToken
+
+log = logging.getLogger(__name__)
+
+# JWTs stay valid until they expire; RevokedToken rows cut that short for a
+# single token (jti: rotated or logged-out refresh tokens) or for every token
+# a user got before a point in time (user: deactivation). Each process keeps
+# the live rows in memory: user revocations in a dict, jtis in a Bloom filter.
+# A check is a dict lookup plus one hash; only a Bloom hit (a revoked jti, or
+# a false positive at ERROR_RATE) costs a query. A daemon thread pulls new
+# rows every REFRESH_INTERVAL seconds and rebuilds everything (dropping
+# expired rows) every REBUILD_INTERVAL seconds. Revocations made in this
+# process apply at once, in other processes within REFRESH_INTERVAL.
+
+# re-read rows this far behind the last pull: commits that landed late and
+# clock skew between workers
+_OVERLAP = timedelta(seconds=60)
+
+
+def _max_lifetime() -> timedelta:
+    return max(jwt_settings.ACCESS_TOKEN_LIFETIME, jwt_settings.REFRESH_TOKEN_LIFETIME)
+
+
+class _RevocationSet:
+    def __init__(self, interval: float, rebuild: float, capacity: int, error_rate):
+        self.interval = interval
+        self.rebuild = rebuild
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.users: Dict[str, datetime] = {}  # user id -> latest revoked_at
+        self.loaded = threading.Event()
+        self._watermark: Optional[datetime] = None
+        self._rebuilt_at = 0.0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="token-revocation", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    # ---------------------------------------------------------------- checks
+
+    def is_revoked(self, payload: dict) -> bool:
+        jti = payload.get(jwt_settings.JTI_CLAIM)
+        user_id = payload.get(jwt_settings.USER_ID_CLAIM)
+        if not self.loaded.is_set():
+            return self._is_revoked_db(jti, user_id, payload.get("iat"))
+        revoked_at = self.users.get(str(user_id))
+        if revoked_at is not None and payload.get("iat", 0) <= revoked_at.timestamp():
+            return True
+        if jti and jti in self.bloom:
+            return RevokedToken.objects.filter(jti=jti).exists()
+        return False
+
+    @staticmethod
+    def _is_revoked_db(jti, user_id, iat) -> bool:
+        # only until the first load finished
+        cond = Q(user_id=user_id, revoked_at__gte=datetime_from_epoch(iat or 0))
+        if jti:
+            cond |= Q(jti=jti)
+        return RevokedToken.objects.filter(cond, expires_at__gt=timezone.now()).exists()
+
+    def add(self, *, jti: Optional[str] = None, user_id=None, revoked_at=None):
+        with self._lock:
+            if jti:
+                self.bloom.add(jti)
+            if user_id is not None:
+                key = str(user_id)
+                current = self.users.get(key)
+                if current is None or revoked_at > current:
+                    self.users[key] = revoked_at
+
+    # --------------------------------------------------------------- loading
+
+    def refresh(self) -> None:
+        now = timezone.now()
+        full = (
+            self._watermark is None
+            or time.monotonic() - self._rebuilt_at >= self.rebuild
+            or self.bloom.saturated
+        )
+        qs = RevokedToken.objects.filter(expires_at__gt=now)
+        if not full:
+            qs = qs.filter(revoked_at__gte=self._watermark - _OVERLAP)
+        rows = list(qs.values_list("jti", "user_id", "revoked_at"))
+        if full:
+            RevokedToken.objects.filter(expires_at__lte=now).delete()
+            bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+            users: Dict[str, datetime] = {}
+            for jti, user_id, revoked_at in rows:
+                if jti:
+                    bloom.add(jti)
+                else:
+                    key = str(user_id)
+                    users[key] = max(revoked_at, users.get(key, revoked_at))
+            with self._lock:
+                self.bloom, self.users = bloom, users
+            self._rebuilt_at = time.monotonic()
+        else:
+            for jti, user_id, revoked_at in rows:
+                self.add(jti=jti, user_id=user_id, revoked_at=revoked_at)
+        self._watermark = now
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.refresh()
+                self.loaded.set()
+            except Exception as e:  # noqa
+                log.warning("Token revocation refresh failed: %s", e)
+            finally:
+                connection.close()  # back to the pool until the next pull
+            self._stopped.wait(self.interval)
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+
+
+_store: Optional[_RevocationSet] = None
+_store_lock = threading.Lock()
+
+
+def store() -> _RevocationSet:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                cfg = settings.TOKEN_REVOCATION
+                _store = _RevocationSet(
+                    cfg.get("REFRESH_INTERVAL", 5.0),
+                    cfg.get("REBUILD_INTERVAL", 3600.0),
+                    cfg.get("CAPACITY", 100_000),
+                    cfg.get("ERROR_RATE", 0.001),
+                )
+    return _store
+
+
+def is_revoked(payload: dict) -> bool:
+    return store().is_revoked(payload)
+
+
+def revoke_token(payload: dict) -> None:
+    """Revokes one token (by jti) until it expires."""
+    jti = payload[jwt_settings.JTI_CLAIM]
+    RevokedToken.objects.bulk_create(
+        [RevokedToken(jti=jti, expires_at=datetime_from_epoch(payload["exp"]))],
+        ignore_conflicts=True,
+    )
+    transaction.on_commit(lambda: store().add(jti=jti))
+
+
+def revoke_user(*user_ids) -> None:
+    """Revokes every token issued so far to each of `user_ids`."""
+    now = timezone.now()
+    RevokedToken.objects.bulk_create(
+        RevokedToken(user_id=pk, revoked_at=now, expires_at=now + _max_lifetime())
+        for pk in user_ids
+    )
+
+    def apply():
+        for pk in user_ids:
+            store().add(user_id=pk, revoked_at=now)
+
+    transaction.on_commit(apply)
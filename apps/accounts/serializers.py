@@ -1,14 +1,17 @@
 # apps/accounts/serializers.py
 from __future__ import annotations
 from __future__ import annotations
-from django.utils import timezone
 from typing import Any, Dict
 from uuid import UUID
 
 from django.db import transaction
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import (
+    TokenRefreshSerializer as BaseTokenRefreshSerializer,
+)
 
 from apps.accounts.models import VerificationCode
+from apps.users.authentication import AuthRefreshToken
 from apps.users.models import User
 
 
@@ -110,12 +113,8 @@ class LoginVerifySerializer(serializers.Serializer):
         code = attrs["code"]
 
         vc = (
-            VerificationCode.objects.filter(
-                purpose=VerificationCode.Purpose.LOGIN,
-                consumed=False,
-                expires_at__gt=timezone.now(),
-                code=code,
-            )
+            VerificationCode.objects.alive()
+            .filter(purpose=VerificationCode.Purpose.LOGIN, code=code)
             .order_by("-created_at")
             .first()
         )
@@ -189,3 +188,8 @@ class OtpStatusQuerySerializer(serializers.Serializer):
                 attrs["telegram_username"].strip().lstrip("@").lower()
             )
         return attrs
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    # rotation revokes the old refresh token (BLACKLIST_AFTER_ROTATION)
+    token_class = AuthRefreshToken
@@ -1,5 +1,6 @@
 # apps/accounts/urls.py
 from django.urls import path
+from rest_framework_simplejwt.views import TokenRefreshView
 
 from .views import (
     RegisterStartView,
@@ -10,9 +11,10 @@ from .views import (
 )
 
 urlpatterns = [
-    path("register/start/", RegisterStartView.as_view()),
-    path("register/verify/", RegisterVerifyView.as_view()),
-    path("login/verify/", LoginVerifyView.as_view()),
-    path("otp/ingest/", OtpIngestView.as_view()),
-    path("otp/status/", OtpStatusView.as_view()),
+    path("register/start/", RegisterStartView.as_view(), name="register-start"),
+    path("register/verify/", RegisterVerifyView.as_view(), name="register-verify"),
+    path("login/verify/", LoginVerifyView.as_view(), name="login-verify"),
+    path("otp/ingest/", OtpIngestView.as_view(), name="otp-ingest"),
+    path("otp/status/", OtpStatusView.as_view(), name="otp-status"),
+    path("token/refresh/", TokenRefreshView.as_view(), name="token-refresh"),
 ]
@@ -9,6 +9,8 @@ from rest_framework import generics, status, throttling, permissions, serializer
 from rest_framework.response import Response
 
 from apps.accounts.models import VerificationCode
+from apps.core.async_views import AsyncAPIView
+from apps.core.metrics import OTP_EVENTS
 from .serializers import (
     RegisterStartSerializer,
     RegisterVerifySerializer,
@@ -90,6 +92,7 @@ class RegisterVerifyView(generics.CreateAPIView):
         ser = self.get_serializer(data=request.data)
         ser.is_valid(raise_exception=True)
         user = ser.save()
+        OTP_EVENTS.labels("verified", VerificationCode.Purpose.REGISTER).inc()
         tokens = issue_tokens(user)
         return Response(
             {"message": "Registration completed.", **tokens}, status=status.HTTP_200_OK
@@ -118,6 +121,7 @@ class LoginVerifyView(generics.CreateAPIView):
         ser = self.get_serializer(data=request.data)
         ser.is_valid(raise_exception=True)
         user = ser.save()
+        OTP_EVENTS.labels("verified", VerificationCode.Purpose.LOGIN).inc()
         tokens = issue_tokens(user)
         return Response(
             {"message": "Login success.", **tokens}, status=status.HTTP_200_OK
@@ -183,6 +187,7 @@ class OtpIngestView(generics.CreateAPIView):
                 return Response(data, status=status.HTTP_409_CONFLICT)
             raise
 
+        OTP_EVENTS.labels("issued", vc.purpose).inc()
         return Response(
             {"status": "stored", "expires_at": vc.expires_at},
             status=status.HTTP_201_CREATED,
@@ -238,39 +243,26 @@ class OtpIngestView(generics.CreateAPIView):
         400: OpenApiResponse(description="Validation error"),
     },
 )
-class OtpStatusView(generics.GenericAPIView):
-
+class OtpStatusView(AsyncAPIView):
     permission_classes = [permissions.AllowAny]
     throttle_classes = [OTPStatusThrottle]
 
-    def get(self, request, *args, **kwargs):  # noqa yoki
-        telegram_id = request.query_params.get("telegram_id")
-        telegram_username = request.query_params.get("telegram_username")
+    async def get(self, request, *args, **kwargs):
+        # The bot calls this on every button press; async so the wait on the
+        # database doesn't hold a worker thread.
         purpose = request.query_params.get("purpose")
-
         if not purpose:
             return Response(
-                {"detail": "purpose is required"},
-                status=status.HTTP_400_BAD_REQUEST,
+                {"detail": "purpose is required"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        vc = VerificationCode.objects.latest_alive_for(
-            telegram_id=telegram_id,
-            telegram_username=telegram_username,
+        vc = await VerificationCode.objects.alatest_alive_for(
+            telegram_id=request.query_params.get("telegram_id"),
+            telegram_username=request.query_params.get("telegram_username"),
             purpose=purpose,
         )
-
         if not vc:
-            return Response(
-                {"active": False, "remaining_seconds": 0},
-                status=status.HTTP_200_OK,
-            )
+            return Response({"active": False, "remaining_seconds": 0})
 
         remaining = int((vc.expires_at - timezone.now()).total_seconds())
-        return Response(
-            {
-                "active": True,
-                "remaining_seconds": max(remaining, 0),
-            },
-            status=status.HTTP_200_OK,
-        )
+        return Response({"active": True, "remaining_seconds": max(remaining, 0)})
@@ -1,3 +1,137 @@
+# apps/core/admin.py
+from __future__ import annotations
+
+import json
+from typing import Optional
+
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Model, QuerySet
+from django.db.models.expressions import Col
+from django.db.models.lookups import Lookup
+from django.db.models.sql.where import AND, WhereNode
+from django.utils.functional import cached_property
+
+# Admin changelists on big tables (user_answers, verification_codes,
+# payments, logs) count their rows on every page load, and with filters and
+# date_hierarchy that COUNT(*) becomes a full scan. Above
+# ADMIN_PAGINATION["ESTIMATE_THRESHOLD"] rows the planner's estimate is used
+# instead: pg_class.reltuples for a whole table, EXPLAIN for a changelist
+# filtered only by equality/range conditions on indexed columns of the table
+# itself. Those estimates come from the column statistics and stay close; a
+# search (ORed icontains over several, often joined, columns) or any other
+# filter can be off by orders of magnitude, so it is counted exactly, as are
+# results below the threshold.
+
+# lookups whose selectivity the planner takes straight from the statistics
+_PLAIN_LOOKUPS = frozenset({"exact", "in", "gt", "gte", "lt", "lte", "range"})
+
+
+def _indexed_columns(model: type[Model]) -> set[str]:
+    """Columns that lead an unconditional index of `model`'s table."""
+    opts = model._meta
+    columns = {
+        f.column
+        for f in opts.concrete_fields
+        if f.primary_key or f.unique or f.db_index
+    }
+    leading = [
+        index.fields[0]
+        for index in opts.indexes
+        if index.fields and not index.condition
+    ]
+    leading += [fields[0] for fields in opts.unique_together]
+    leading += [
+        c.fields[0]
+        for c in opts.constraints
+        if getattr(c, "fields", None) and getattr(c, "condition", None) is None
+    ]
+    columns.update(opts.get_field(name.lstrip("-")).column for name in leading)
+    return columns
+
+
+def _plain_indexed_filter(queryset: QuerySet) -> bool:
+    """True if every WHERE condition is a plain lookup on an indexed column."""
+    query = queryset.query
+    indexed = _indexed_columns(queryset.model)
+
+    def plain(node) -> bool:
+        if isinstance(node, WhereNode):
+            return (
+                node.connector == AND
+                and not node.negated
+                and all(plain(child) for child in node.children)
+            )
+        return (
+            isinstance(node, Lookup)
+            and node.lookup_name in _PLAIN_LOOKUPS
+            and isinstance(node.lhs, Col)
+            and node.lhs.alias == query.base_table
+            and node.lhs.target.column in indexed
+            and not hasattr(node.rhs, "resolve_expression")
+        )
+
+    return plain(query.where)
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """
+    Planner's row estimate for `queryset`, or None if there is none yet or
+    the filter is one the planner can't be trusted with (see above).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    query = queryset.query
+    if query.distinct or query.combinator or not _plain_indexed_filter(queryset):
+        return None
+    with connection.cursor() as cur:
+        if not query.where:
+            # whole table: statistics from the last (auto)vacuum/analyze.
+            # autovacuum never analyzes a partitioned parent, only its
+            # partitions, so those are summed
+            cur.execute(
+                """
+                SELECT CASE WHEN p.relkind = 'p' THEN (
+                    SELECT sum(c.reltuples) FILTER (WHERE c.reltuples >= 0)
+                    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = p.oid
+                ) ELSE nullif(p.reltuples, -1) END
+                FROM pg_class p
+                WHERE p.oid = %s::regclass
+                """,
+                [queryset.model._meta.db_table],
+            )
+            value = cur.fetchone()[0]
+            return None if value is None else int(value)
+        sql, params = queryset.order_by().query.sql_with_params()
+        cur.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cur.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, QuerySet):
+            estimate = estimate_count(self.object_list)
+            threshold = settings.ADMIN_PAGINATION["ESTIMATE_THRESHOLD"]
+            if estimate is not None and estimate >= threshold:
+                return estimate
+        return super().count
+
 
-# Register your models here.
+def use_estimated_counts(site: admin.AdminSite) -> None:
+    """
+    Switches every registered ModelAdmin that kept Django's default paginator
+    to EstimatedCountPaginator and drops the second, unfiltered COUNT(*) the
+    changelist runs for "N of M selected" (show_full_result_count).
+    """
+    for model_admin in site._registry.values():  # noqa
+        if model_admin.paginator is Paginator:
+            model_admin.paginator = EstimatedCountPaginator
+            model_admin.show_full_result_count = False
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
+
+    def ready(self):
+        from django.contrib import admin
+        from django.db.backends.signals import connection_created
+
+        from . import dbhooks
+        from .admin import use_estimated_counts
+
+        connection_created.connect(dbhooks.install, dispatch_uid="core.dbhooks")
+        # admin.autodiscover() already ran in django.contrib.admin's ready()
+        use_estimated_counts(admin.site)
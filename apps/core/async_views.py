@@ -0,0 +1,49 @@
+# apps/core/async_views.py
+import inspect
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+# DRF has no async views, so the few hot read endpoints subclass AsyncAPIView
+# and define `async def get(...)`. Authentication, permissions (with the view
+# passed in), throttles, content negotiation and error bodies are DRF's own;
+# only the handler runs on the event loop, so under ASGI the wait on the
+# database doesn't occupy a worker thread.
+
+
+# Django marks the view returned by as_view() as async when every handler is
+# (OPTIONS aside), so the ASGI handler awaits dispatch() directly. No class
+# docstring: drf-spectacular would use it as the description of every
+# subclass that has none.
+class AsyncAPIView(APIView):
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # authentication (user lookup), permissions and throttles
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):  # OPTIONS is DRF's sync handler
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def acheck_object_permissions(self, request, obj):
+        await sync_to_async(self.check_object_permissions)(request, obj)
@@ -0,0 +1,84 @@
+# apps/core/bench_urls.py
+# URLconf for `manage.py benchmark_asgi`: every async read view next to a sync
+# DRF baseline doing the same work, so both run through the same ASGI handler.
+# The baselines exist only here; the API routes the async views.
+from django.db.models import Exists, OuterRef
+from django.shortcuts import get_object_or_404
+from django.urls import path
+from django.utils import timezone
+from rest_framework import permissions, status
+from rest_framework.generics import RetrieveAPIView
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.accounts.models import VerificationCode
+from apps.accounts.views import OTPStatusThrottle, OtpStatusView
+from apps.payments.models import Payment
+from apps.payments.serializers import PaymentDetailSerializer
+from apps.payments.views import PaymentStatusView
+from apps.tests.models.ielts import Test
+from apps.tests.serializers import TestDetailSerializer
+from apps.tests.views import TestDetailView, test_detail_queryset
+from apps.user_tests.models import UserTest
+from apps.user_tests.serializers import TestListItemSerializer
+from apps.user_tests.views import AllTestsView
+from .pagination import paginate
+
+
+class SyncTestDetailView(RetrieveAPIView):
+    permission_classes = [permissions.AllowAny]
+    serializer_class = TestDetailSerializer
+
+    def get_queryset(self):
+        return test_detail_queryset()
+
+
+class SyncPaymentStatusView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        pid = request.query_params.get("payment_id")
+        payment = get_object_or_404(Payment, id=pid, student__user=request.user)
+        return Response(PaymentDetailSerializer(payment).data)
+
+
+class SyncOtpStatusView(APIView):
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [OTPStatusThrottle]
+
+    def get(self, request, *args, **kwargs):
+        purpose = request.query_params.get("purpose")
+        if not purpose:
+            return Response(
+                {"detail": "purpose is required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        vc = VerificationCode.objects.latest_alive_for(
+            telegram_id=request.query_params.get("telegram_id"),
+            telegram_username=request.query_params.get("telegram_username"),
+            purpose=purpose,
+        )
+        if not vc:
+            return Response({"active": False, "remaining_seconds": 0})
+        remaining = int((vc.expires_at - timezone.now()).total_seconds())
+        return Response({"active": True, "remaining_seconds": max(remaining, 0)})
+
+
+class SyncAllTestsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        purchased_qs = UserTest.objects.filter(user=request.user, test=OuterRef("pk"))
+        tests = Test.objects.all().annotate(purchased=Exists(purchased_qs))
+        return paginate(request, tests, TestListItemSerializer)
+
+
+urlpatterns = [
+    path("sync/tests/<int:pk>/", SyncTestDetailView.as_view()),
+    path("async/tests/<int:pk>/", TestDetailView.as_view()),
+    path("sync/payments/status/", SyncPaymentStatusView.as_view()),
+    path("async/payments/status/", PaymentStatusView.as_view()),
+    path("sync/otp/status/", SyncOtpStatusView.as_view()),
+    path("async/otp/status/", OtpStatusView.as_view()),
+    path("sync/all-tests/", SyncAllTestsView.as_view()),
+    path("async/all-tests/", AllTestsView.as_view()),
+]
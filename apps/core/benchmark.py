@@ -0,0 +1,852 @@
+# apps/core/benchmark.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import VerificationCode
+from apps.payments.models import Payment
+from apps.profiles.models import StudentProfile, TeacherProfile
+from apps.teacher_checking.counters import rebuild_counters
+from apps.teacher_checking.models import TeacherSubmission
+from apps.tests.models import (
+    Listening,
+    ListeningSection,
+    Question,
+    QuestionSet,
+    QuestionType,
+    Reading,
+    ReadingPassage,
+    TaskTwo,
+    Test,
+)
+from apps.user_tests import services as purchases
+from apps.user_tests.models import TestResult, UserTest
+from apps.users.models import User
+from . import dbhooks
+from .ids import uuid7
+from .profiling import RequestProfile
+
+# Synthetic rows are recognisable by these markers, so a benchmark can be
+# re-run against the same database and cleaned up with --flush.
+PHONE_PREFIX = "+99800"
+TEST_PREFIX = "[bench]"
+TELEGRAM_ID_BASE = 9_000_000_000
+
+
+@dataclass
+class SeedConfig:
+    students: int = 200
+    teachers: int = 10
+    tests: int = 10
+    questions_per_set: int = 5
+    tests_per_student: int = 3
+    payments_per_student: int = 3
+    codes_per_student: int = 3
+
+
+def bench_users():
+    return User.objects.filter(phone_number__startswith=PHONE_PREFIX)
+
+
+def bench_tests():
+    return Test.objects.filter(title__startswith=TEST_PREFIX)
+
+
+@transaction.atomic
+def flush() -> None:
+    tg_ids = bench_users().exclude(telegram_id=None).values("telegram_id")
+    VerificationCode.objects.filter(telegram_id__in=tg_ids).delete()
+    bench_users().delete()
+    # Writing/Listening/Reading deletes cascade to the tests themselves.
+    TaskTwo.objects.filter(topic__startswith=TEST_PREFIX).delete()
+    Listening.objects.filter(title__startswith=TEST_PREFIX).delete()
+    Reading.objects.filter(title__startswith=TEST_PREFIX).delete()
+    ListeningSection.objects.filter(name__contains=TEST_PREFIX).delete()
+    ReadingPassage.objects.filter(name__contains=TEST_PREFIX).delete()
+    QuestionSet.objects.filter(name__startswith=TEST_PREFIX).delete()
+    Question.objects.filter(text__startswith=TEST_PREFIX).delete()
+    rebuild_counters()
+
+
+def _make_users(role: str, count: int, offset: int) -> List[User]:
+    users = []
+    for i in range(offset, offset + count):
+        u = User(
+            phone_number=f"{PHONE_PREFIX}{i:07d}",
+            fullname=f"Bench {role.title()} {i}",
+            role=role,
+            telegram_id=TELEGRAM_ID_BASE + i,
+            telegram_username=f"bench_{role}_{i}",
+        )
+        u.set_unusable_password()
+        users.append(u)
+    return User.objects.bulk_create(users, batch_size=1000)
+
+
+def _seed_test(index: int, questions_per_set: int) -> Test:
+    # post_save on Test builds the listening/reading/writing skeleton.
+    test = Test.objects.create(
+        title=f"{TEST_PREFIX} Test {index}", price=Decimal("50000.00")
+    )
+    test.refresh_from_db()
+    sections = list(test.listening.sections.all())
+    passages = list(test.reading.passages.all())
+
+    owners = [(s, QuestionType.L_MULTIPLE_CHOICE) for s in sections for _ in range(4)]
+    owners += [(p, QuestionType.R_YES_NO_NOT_GIVEN) for p in passages for _ in range(3)]
+    sets = QuestionSet.objects.bulk_create(
+        QuestionSet(name=f"{TEST_PREFIX} {index}.{n}") for n in range(len(owners))
+    )
+    questions = Question.objects.bulk_create(
+        Question(
+            text=f"{TEST_PREFIX} question {index}.{n}.{k} about the passage",
+            question_type=qtype,
+            options=["A", "B", "C", "D"],
+            answer_list=["A"],
+        )
+        for n, (_, qtype) in enumerate(owners)
+        for k in range(questions_per_set)
+    )
+    through = QuestionSet.questions.through
+    through.objects.bulk_create(
+        through(questionset_id=qs.pk, question_id=q.pk)
+        for n, qs in enumerate(sets)
+        for q in questions[n * questions_per_set : (n + 1) * questions_per_set]
+    )
+    section_links, passage_links = [], []
+    for qs, (owner, _) in zip(sets, owners):
+        if isinstance(owner, ListeningSection):
+            section_links.append(
+                ListeningSection.questions_set.through(
+                    listeningsection_id=owner.pk, questionset_id=qs.pk
+                )
+            )
+        else:
+            passage_links.append(
+                ReadingPassage.questions_set.through(
+                    readingpassage_id=owner.pk, questionset_id=qs.pk
+                )
+            )
+    ListeningSection.questions_set.through.objects.bulk_create(section_links)
+    ReadingPassage.questions_set.through.objects.bulk_create(passage_links)
+    QuestionSet.objects.filter(pk__in=[s.pk for s in sets]).refresh_stats()
+    return test
+
+
+@transaction.atomic
+def seed(cfg: SeedConfig, *, rng: random.Random) -> Dict[str, int]:
+    now = timezone.now()
+    students = _make_users(User.Roles.STUDENT, cfg.students, 0)
+    teachers = _make_users(User.Roles.TEACHER, cfg.teachers, cfg.students)
+    profiles = StudentProfile.objects.bulk_create(
+        StudentProfile(user=u, balance=Decimal("1000000000.00")) for u in students
+    )
+    TeacherProfile.objects.bulk_create(TeacherProfile(user=u) for u in teachers)
+
+    tests = [_seed_test(i, cfg.questions_per_set) for i in range(cfg.tests)]
+
+    # Leave some tests unpurchased for the purchase scenario.
+    owned = min(cfg.tests_per_student, max(cfg.tests - 1, 0))
+    user_tests = UserTest.objects.bulk_create(
+        (
+            UserTest(
+                user=u,
+                test=t,
+                price_paid=t.price,
+                status=UserTest.Status.COMPLETED,
+                started_at=now - timedelta(hours=2),
+                completed_at=now - timedelta(hours=1),
+                created_at=now - timedelta(minutes=rng.randint(1, 60 * 24 * 90)),
+            )
+            for u in students
+            for t in rng.sample(tests, owned)
+        ),
+        batch_size=2000,
+    )
+    TestResult.objects.bulk_create(
+        (
+            TestResult(
+                user_test=ut,
+                listening_score=rng.choice([5.0, 5.5, 6.0, 6.5, 7.0, 7.5]),
+                reading_score=rng.choice([5.0, 5.5, 6.0, 6.5, 7.0, 7.5]),
+            )
+            for ut in user_tests
+        ),
+        batch_size=2000,
+    )
+
+    statuses = [
+        TeacherSubmission.Status.REQUESTED,
+        TeacherSubmission.Status.REQUESTED,
+        TeacherSubmission.Status.IN_CHECKING,
+        TeacherSubmission.Status.CHECKED,
+    ]
+    submissions = []
+    for ut in user_tests:
+        for task in TeacherSubmission.Task.values:
+            status = rng.choice(statuses)
+            teacher = None
+            if status != TeacherSubmission.Status.REQUESTED:
+                teacher = rng.choice(teachers)
+            submissions.append(
+                TeacherSubmission(
+                    user_test=ut,
+                    task=task,
+                    submitted_text="Some people believe ... " * 20,
+                    status=status,
+                    teacher=teacher,
+                    score=6.5 if status == TeacherSubmission.Status.CHECKED else None,
+                    checked_at=(
+                        now if status == TeacherSubmission.Status.CHECKED else None
+                    ),
+                    submitted_at=ut.created_at,
+                )
+            )
+    TeacherSubmission.objects.bulk_create(submissions, batch_size=2000)
+    rebuild_counters()
+
+    Payment.objects.bulk_create(
+        (
+            Payment(student=sp, amount=Decimal("100000.00"))
+            for sp in profiles
+            for _ in range(cfg.payments_per_student)
+        ),
+        batch_size=2000,
+    )
+
+    codes = rng.sample(range(100000, 1000000), cfg.students * cfg.codes_per_student)
+    VerificationCode.objects.bulk_create(
+        (
+            VerificationCode(
+                telegram_id=u.telegram_id,
+                telegram_username=u.telegram_username,
+                code=str(codes.pop()),
+                purpose=VerificationCode.Purpose.LOGIN,
+                expires_at=now + timedelta(hours=1),
+            )
+            for u in students
+            for _ in range(cfg.codes_per_student)
+        ),
+        batch_size=2000,
+    )
+    return {
+        "students": len(students),
+        "teachers": len(teachers),
+        "tests": len(tests),
+        "user_tests": len(user_tests),
+        "submissions": len(submissions),
+    }
+
+
+# --- load generation ---------------------------------------------------------
+
+
+@dataclass
+class Call:
+    method: str
+    path: str
+    data: Optional[Dict[str, Any]] = None
+    user: Optional[User] = None
+    extra: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Sample:
+    status: int
+    latency_ms: float
+    queries: int
+    db_ms: float
+
+
+_tokens: Dict[Any, str] = {}
+_tokens_lock = threading.Lock()
+
+
+def _auth_header(user: Optional[User]) -> Dict[str, str]:
+    if user is None:
+        return {}
+    with _tokens_lock:
+        token = _tokens.get(user.pk)
+        if token is None:
+            token = _tokens[user.pk] = str(AccessToken.for_user(user))
+    return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+def _click_payload(payment: Payment, action: str) -> Dict[str, Any]:
+    payload = {
+        "click_trans_id": str(random.randint(10**8, 10**9)),
+        "service_id": str(settings.CLICK.get("SERVICE_ID", "")),
+        "merchant_trans_id": str(payment.pk),
+        "amount": str(payment.amount),
+        "action": action,
+        "error": "0",
+        "error_note": "",
+        "sign_time": timezone.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    raw = "".join(
+        payload[k]
+        for k in (
+            "click_trans_id",
+            "service_id",
+            "merchant_trans_id",
+            "amount",
+            "action",
+            "sign_time",
+        )
+    )
+    payload["sign_string"] = hashlib.sha256(
+        (raw + settings.CLICK["SECRET_KEY"]).encode()
+    ).hexdigest()
+    return payload
+
+
+def _cycle(items: List[Any], n: int) -> List[Any]:
+    return list(itertools.islice(itertools.cycle(items), n)) if items else []
+
+
+def _tests_retrieve(n: int) -> List[Call]:
+    ids = list(bench_tests().values_list("pk", flat=True))
+    return [Call("GET", reverse("tests-detail", args=[pk])) for pk in _cycle(ids, n)]
+
+
+def _student_dashboard(n: int) -> List[Call]:
+    users = list(bench_users().filter(role=User.Roles.STUDENT)[:500])
+    path = reverse("student-dashboard")
+    return [Call("GET", path, user=u) for u in _cycle(users, n)]
+
+
+def _teacher_dashboard(n: int) -> List[Call]:
+    users = list(bench_users().filter(role=User.Roles.TEACHER))
+    path = reverse("teacher-dashboard")
+    return [Call("GET", path, user=u) for u in _cycle(users, n)]
+
+
+def _purchase(n: int) -> List[Call]:
+    tests = list(bench_tests().values_list("pk", flat=True))
+    calls = []
+    users = bench_users().filter(role=User.Roles.STUDENT).prefetch_related("user_tests")
+    for u in users.iterator(chunk_size=500):
+        owned = {ut.test_id for ut in u.user_tests.all()}
+        for test_id in tests:
+            if test_id not in owned:
+                path = reverse("purchase-test", args=[test_id])
+                calls.append(Call("POST", path, user=u))
+        if len(calls) >= n:
+            break
+    return calls[:n]
+
+
+def _click_webhook(n: int) -> List[Call]:
+    # "prepare" is repeatable, so the same payments can be replayed.
+    payments = list(
+        Payment.objects.filter(student__user__phone_number__startswith=PHONE_PREFIX)[
+            :1000
+        ]
+    )
+    ip = (settings.CLICK.get("ALLOWED_IPS") or ["127.0.0.1"])[0]
+    path = reverse("payments:click-webhook")
+    return [
+        Call("POST", path, data=_click_payload(p, "prepare"), extra={"REMOTE_ADDR": ip})
+        for p in _cycle(payments, n)
+    ]
+
+
+def _otp_verify(n: int) -> List[Call]:
+    codes = (
+        VerificationCode.objects.alive()
+        .filter(
+            purpose=VerificationCode.Purpose.LOGIN,
+            telegram_id__gte=TELEGRAM_ID_BASE,
+        )
+        .values_list("code", flat=True)[:n]
+    )
+    return [Call("POST", reverse("login-verify"), {"code": c}) for c in codes]
+
+
+def _teacher_claim(n: int) -> List[Call]:
+    teachers = list(bench_users().filter(role=User.Roles.TEACHER))
+    ids = TeacherSubmission.objects.filter(
+        status=TeacherSubmission.Status.REQUESTED,
+        user_test__user__phone_number__startswith=PHONE_PREFIX,
+    ).values_list("pk", flat=True)[:n]
+    path = reverse("claim-writing")
+    return [
+        Call("POST", path, {"submission_id": str(pk)}, user=t)
+        for pk, t in zip(ids, itertools.cycle(teachers))
+    ]
+
+
+def _teacher_grade(n: int) -> List[Call]:
+    subs = (
+        TeacherSubmission.objects.filter(
+            status=TeacherSubmission.Status.IN_CHECKING,
+            teacher__phone_number__startswith=PHONE_PREFIX,
+        )
+        .select_related("teacher")
+        .only("pk", "teacher")[:n]
+    )
+    path = reverse("grade-writing")
+    return [
+        Call("POST", path, {"submission_id": str(s.pk), "score": 6.5}, user=s.teacher)
+        for s in subs
+    ]
+
+
+SCENARIOS: Dict[str, Callable[[int], List[Call]]] = {
+    "tests_retrieve": _tests_retrieve,
+    "student_dashboard": _student_dashboard,
+    "teacher_dashboard": _teacher_dashboard,
+    "purchase": _purchase,
+    "click_webhook": _click_webhook,
+    "otp_verify": _otp_verify,
+    "teacher_claim": _teacher_claim,
+    "teacher_grade": _teacher_grade,
+}
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def _worker(calls: Iterator[Call], lock: threading.Lock) -> List[Sample]:
+    client = Client()
+    samples: List[Sample] = []
+    try:
+        while True:
+            with lock:
+                call = next(calls, None)
+            if call is None:
+                return samples
+            profile = RequestProfile()
+            headers = {**_auth_header(call.user), **call.extra}
+            start = time.perf_counter()
+            with connection.execute_wrapper(profile):
+                response = client.generic(
+                    call.method,
+                    call.path,
+                    data=json.dumps(call.data) if call.data is not None else "",
+                    content_type="application/json",
+                    **headers,
+                )
+            samples.append(
+                Sample(
+                    status=response.status_code,
+                    latency_ms=(time.perf_counter() - start) * 1000,
+                    queries=profile.queries,
+                    db_ms=profile.db_ms,
+                )
+            )
+    finally:
+        connection.close()
+
+
+def run_scenario(calls: List[Call], *, concurrency: int) -> Dict[str, Any]:
+    lock = threading.Lock()
+    it = iter(calls)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(_worker, it, lock) for _ in range(concurrency)]
+        samples = [s for f in futures for s in f.result()]
+    elapsed = time.perf_counter() - start
+    return summarize(samples, elapsed)
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(s.latency_ms for s in samples)
+    queries = [s.queries for s in samples]
+    statuses: Dict[str, int] = {}
+    for s in samples:
+        statuses[str(s.status)] = statuses.get(str(s.status), 0) + 1
+    n = len(samples)
+    return {
+        "requests": n,
+        "errors": sum(1 for s in samples if s.status >= 400),
+        "status_codes": statuses,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(n / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / n, 2) if n else 0.0,
+            "p50": round(_percentile(latencies, 50), 2),
+            "p95": round(_percentile(latencies, 95), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if n else 0.0,
+        },
+        "queries_per_request": {
+            "mean": round(sum(queries) / n, 2) if n else 0.0,
+            "max": max(queries, default=0),
+        },
+        "db_ms_mean": round(sum(s.db_ms for s in samples) / n, 2) if n else 0.0,
+    }
+
+
+# --- ASGI: async read views vs their sync baselines --------------------------
+# Paths are relative to apps.core.bench_urls, prefixed with /sync or /async.
+
+AsgiCall = Tuple[str, Dict[str, str]]
+
+
+def _bearer(user: User) -> Dict[str, str]:
+    return {"Authorization": _auth_header(user)["HTTP_AUTHORIZATION"]}
+
+
+def _asgi_tests_detail(n: int) -> List[AsgiCall]:
+    ids = list(bench_tests().values_list("pk", flat=True))
+    return [(f"/tests/{pk}/", {}) for pk in _cycle(ids, n)]
+
+
+def _asgi_payment_status(n: int) -> List[AsgiCall]:
+    payments = list(
+        Payment.objects.filter(
+            student__user__phone_number__startswith=PHONE_PREFIX
+        ).select_related("student__user")[:1000]
+    )
+    return [
+        (f"/payments/status/?payment_id={p.pk}", _bearer(p.student.user))
+        for p in _cycle(payments, n)
+    ]
+
+
+def _asgi_otp_status(n: int) -> List[AsgiCall]:
+    users = list(bench_users().filter(role=User.Roles.STUDENT)[:1000])
+    return [
+        (
+            f"/otp/status/?telegram_id={u.telegram_id}"
+            f"&telegram_username={u.telegram_username}&purpose=login",
+            {},
+        )
+        for u in _cycle(users, n)
+    ]
+
+
+def _asgi_all_tests(n: int) -> List[AsgiCall]:
+    users = list(bench_users().filter(role=User.Roles.STUDENT)[:500])
+    return [("/all-tests/", _bearer(u)) for u in _cycle(users, n)]
+
+
+ASGI_ENDPOINTS: Dict[str, Callable[[int], List[AsgiCall]]] = {
+    "tests_detail": _asgi_tests_detail,
+    "payment_status": _asgi_payment_status,
+    "otp_status": _asgi_otp_status,
+    "all_tests": _asgi_all_tests,
+}
+
+
+async def run_asgi(
+    calls: List[AsgiCall],
+    *,
+    mode: str,
+    concurrency: int,
+    db_latency_ms: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Drives the ASGI application in-process with up to `concurrency` requests
+    in flight, against the `mode` ("sync" / "async") half of bench_urls.
+    db_latency_ms adds a sleep per query to model a remote DB.
+    """
+
+    def _db_latency(execute, sql, params, many, context):
+        time.sleep(db_latency_ms / 1000)
+        return execute(sql, params, many, context)
+
+    app = get_asgi_application()
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[Sample] = []
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None
+    ) as client:
+
+        async def one(path: str, headers: Dict[str, str]) -> None:
+            async with semaphore:
+                profile = RequestProfile()
+                start = time.perf_counter()
+                with dbhooks.execute_wrapper(profile):
+                    if db_latency_ms:
+                        with dbhooks.execute_wrapper(_db_latency):
+                            r = await client.get(f"/{mode}{path}", headers=headers)
+                    else:
+                        r = await client.get(f"/{mode}{path}", headers=headers)
+                samples.append(
+                    Sample(
+                        status=r.status_code,
+                        latency_ms=(time.perf_counter() - start) * 1000,
+                        queries=profile.queries,
+                        db_ms=profile.db_ms,
+                    )
+                )
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(path, headers) for path, headers in calls))
+        elapsed = time.perf_counter() - start
+    return summarize(samples, elapsed)
+
+
+# --- purchase contention -----------------------------------------------------
+# `threads` workers buy for one student at the same moment, `rounds` times.
+# Every round resets that student's purchases and balance (enough for
+# `funds_for` of the `tests` targets), so each round races on the write path.
+
+CONTENTION_PHONE = f"{PHONE_PREFIX}9999999"
+
+
+def _contention_student() -> Tuple[User, StudentProfile]:
+    user = User.objects.filter(phone_number=CONTENTION_PHONE).first()
+    if user is None:
+        user = _make_users(User.Roles.STUDENT, 1, 9_999_999)[0]
+    profile, _ = StudentProfile.objects.get_or_create(user=user)
+    return user, profile
+
+
+def _contention_buy(
+    user: User, targets: List[Test], i: int, cart: bool, barrier: threading.Barrier
+) -> Tuple[str, int, Decimal, float]:
+    barrier.wait()
+    start = time.perf_counter()
+    if cart:
+        # rotated, so overlapping carts list the same tests in different orders
+        ids = [t.pk for t in targets[i:] + targets[:i]]
+        result = purchases.checkout(user=user, test_ids=ids)
+        bought, spent = len(result.user_tests), result.quote.total
+    else:
+        result = purchases.purchase(user=user, test=targets[i % len(targets)])
+        bought, spent = int(result.ok), result.price
+    latency = (time.perf_counter() - start) * 1000
+    return result.outcome.value, bought, spent if result.ok else 0, latency
+
+
+def run_purchase_contention(
+    *,
+    threads: int,
+    rounds: int,
+    tests: int = 1,
+    funds_for: int = 1,
+    cart: bool = False,
+) -> Dict[str, Any]:
+    """
+    cart=True: every worker checks out all `tests` at once via the cart
+    instead of buying a single test.
+    """
+    user, profile = _contention_student()
+    targets = list(bench_tests().order_by("pk")[:tests])
+    if not targets:
+        return {}
+    budget = sum((t.price for t in targets[:funds_for]), Decimal("0.00"))
+
+    outcomes: Dict[str, int] = {}
+    latencies: List[float] = []
+    violations = 0
+    elapsed = 0.0
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for _ in range(rounds):
+            UserTest.objects.filter(user=user).delete()
+            StudentProfile.objects.filter(pk=profile.pk).update(balance=budget)
+            barrier = threading.Barrier(threads)
+            start = time.perf_counter()
+            results = list(
+                pool.map(
+                    lambda i: _contention_buy(
+                        user, targets, i % len(targets), cart, barrier
+                    ),
+                    range(threads),
+                )
+            )
+            elapsed += time.perf_counter() - start
+
+            spent = Decimal("0.00")
+            created = 0
+            for outcome, bought, paid, latency in results:
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+                latencies.append(latency)
+                created += bought
+                spent += paid
+            profile.refresh_from_db(fields=["balance"])
+            owned = UserTest.objects.filter(user=user).count()
+            # each target at most once, every purchase paid for exactly once
+            if owned != created or created > len(targets):
+                violations += 1
+            elif profile.balance != budget - spent:
+                violations += 1
+
+        barrier = threading.Barrier(threads)
+        list(pool.map(lambda _: (barrier.wait(), connection.close()), range(threads)))
+    UserTest.objects.filter(user=user).delete()
+
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "threads": threads,
+        "rounds": rounds,
+        "attempts": n,
+        "outcomes": outcomes,
+        "mode": "cart" if cart else "single",
+        "invariant_violations": violations,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(n / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / n, 2) if n else 0.0,
+            "p50": round(_percentile(latencies, 50), 2),
+            "p95": round(_percentile(latencies, 95), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if n else 0.0,
+        },
+    }
+
+
+def run_cart_comparison(*, items: int, rounds: int) -> Dict[str, Any]:
+    """
+    Cost of buying `items` tests one by one with purchase() versus a single
+    cart checkout(), for one student with enough balance.
+    """
+    user, profile = _contention_student()
+    targets = list(bench_tests().order_by("pk")[:items])
+    if not targets:
+        return {}
+    budget = sum((t.price for t in targets), Decimal("0.00"))
+
+    def measure(buy) -> Tuple[float, int]:
+        UserTest.objects.filter(user=user).delete()
+        StudentProfile.objects.filter(pk=profile.pk).update(balance=budget)
+        profile_ = RequestProfile()
+        start = time.perf_counter()
+        with dbhooks.execute_wrapper(profile_):
+            buy()
+        return (time.perf_counter() - start) * 1000, profile_.queries
+
+    report: Dict[str, Any] = {"items": len(targets), "rounds": rounds}
+    variants = {
+        "single_one": lambda: purchases.purchase(user=user, test=targets[0]),
+        "single_all": lambda: [purchases.purchase(user=user, test=t) for t in targets],
+        "cart_all": lambda: purchases.checkout(
+            user=user, test_ids=[t.pk for t in targets]
+        ),
+    }
+    for name, buy in variants.items():
+        runs = [measure(buy) for _ in range(rounds)]
+        latencies = sorted(ms for ms, _ in runs)
+        report[name] = {
+            "ms_mean": round(sum(latencies) / len(latencies), 2),
+            "ms_p50": round(_percentile(latencies, 50), 2),
+            "queries": runs[-1][1],
+        }
+    UserTest.objects.filter(user=user).delete()
+    return report
+
+
+# --- primary keys: uuid4 vs uuid7 --------------------------------------------
+# Rows shaped like user_answers (the busiest insert path) go into a scratch
+# table per key generator, with the same primary key and (user_test, question)
+# index, so both generators are measured on identical data.
+
+PK_GENERATORS: Dict[str, Callable[[], uuid.UUID]] = {
+    "uuid4": uuid.uuid4,
+    "uuid7": uuid7,
+}
+
+
+def _relation_mb(cur, name: str) -> float:
+    cur.execute("SELECT pg_relation_size(%s)", [name])
+    return round(cur.fetchone()[0] / 2**20, 2)
+
+
+def run_pk_inserts(
+    kind: str, *, rows: int, batch_size: int = 500, keep: bool = False
+) -> Dict[str, Any]:
+    """
+    Inserts `rows` answers (one transaction per batch) using the `kind` key
+    generator and reports throughput plus primary key size before and after
+    a REINDEX; the difference is what random page splits cost.
+    """
+    new_id = PK_GENERATORS[kind]
+    user_tests = list(
+        UserTest.objects.filter(
+            user__phone_number__startswith=PHONE_PREFIX
+        ).values_list("pk", flat=True)
+    )
+    questions = list(
+        Question.objects.filter(text__startswith=TEST_PREFIX).values_list(
+            "pk", flat=True
+        )
+    )
+    pairs = _cycle(list(itertools.product(user_tests, questions)), rows)
+    if not pairs:
+        return {}
+
+    qn = connection.ops.quote_name
+    table = f"bench_pk_{kind}"
+    with connection.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {qn(table)}")
+        cur.execute(f"CREATE TABLE {qn(table)} (LIKE user_answers INCLUDING DEFAULTS)")
+        cur.execute(f"ALTER TABLE {qn(table)} ADD PRIMARY KEY (id)")
+        cur.execute(
+            f"CREATE INDEX {qn(table + '_ut_q')} "
+            f"ON {qn(table)} (user_test_id, question_id)"
+        )
+    sql = (
+        f"INSERT INTO {qn(table)} "
+        f"(id, user_test_id, question_id, raw_answer, is_correct, created_at) "
+        f"VALUES (%s, %s, %s, %s, %s, %s)"
+    )
+    answer = json.dumps({"value": "A"})
+    tail_from, tail_rows, tail_start = len(pairs) - len(pairs) // 4, 0, 0.0
+    start = time.perf_counter()
+    for offset in range(0, len(pairs), batch_size):
+        if offset >= tail_from and not tail_rows:
+            tail_rows, tail_start = len(pairs) - offset, time.perf_counter()
+        batch = [
+            (new_id(), ut, q, answer, True, timezone.now())
+            for ut, q in pairs[offset : offset + batch_size]
+        ]
+        with transaction.atomic(), connection.cursor() as cur:
+            cur.executemany(sql, batch)
+    elapsed = time.perf_counter() - start
+    if not tail_rows:
+        tail_rows, tail_start = len(pairs), start
+    tail_elapsed = time.perf_counter() - tail_start
+
+    pk_index = f"{table}_pkey"
+    with connection.cursor() as cur:
+        table_mb = _relation_mb(cur, table)
+        pk_mb = _relation_mb(cur, pk_index)
+        cur.execute(f"REINDEX INDEX {qn(pk_index)}")
+        pk_compact_mb = _relation_mb(cur, pk_index)
+        if not keep:
+            cur.execute(f"DROP TABLE {qn(table)}")
+    return {
+        "rows": len(pairs),
+        "batch_size": batch_size,
+        "seconds": round(elapsed, 2),
+        "throughput_rps": round(len(pairs) / elapsed, 1),
+        # last quarter, when the index no longer fits in a few hot pages
+        "tail_throughput_rps": round(tail_rows / tail_elapsed, 1),
+        "table_mb": table_mb,
+        "pk_index_mb": pk_mb,
+        "pk_index_mb_reindexed": pk_compact_mb,
+        "pk_index_bloat_pct": (
+            round((pk_mb / pk_compact_mb - 1) * 100, 1) if pk_compact_mb else 0.0
+        ),
+    }
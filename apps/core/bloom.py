@@ -0,0 +1,43 @@
+# apps/core/bloom.py
+from __future__ import annotations
+
+import hashlib
+import math
+
+# Plain Bloom filter: `key in f` is False for keys never added and True for
+# added keys plus about `error_rate` of the others. Bits live in a bytearray;
+# the k positions come from one blake2b digest (Kirsch-Mitzenmacher double
+# hashing), so a lookup is a single hash call.
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(int(capacity), 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8
+        )  # bits
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def saturated(self) -> bool:
+        """More keys than it was sized for; the error rate is now higher."""
+        return self.count > self.capacity
@@ -0,0 +1,26 @@
+# apps/core/cache.py
+from django.core.cache.backends.locmem import LocMemCache
+
+from .metrics import CACHE_OPERATIONS
+
+_MISSING = object()
+
+
+class MetricsCacheMixin:
+    """Counts get() hits/misses per cache for the cache_get_total metric."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)  # noqa
+        hit = value is not _MISSING
+        CACHE_OPERATIONS.labels(self.metrics_label, "hit" if hit else "miss").inc()
+        return value if hit else default
+
+    @property
+    def metrics_label(self) -> str:
+        return getattr(self, "_location", "") or "default"
+
+
+class InstrumentedLocMemCache(MetricsCacheMixin, LocMemCache):
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self._location = name
@@ -0,0 +1,36 @@
+# apps/core/dbhooks.py
+from __future__ import annotations
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# connection.execute_wrapper() is bound to a connection object, i.e. to one
+# thread. Under ASGI an async view's queries run on asgiref's sync thread,
+# not on the thread the middleware wrapped. Wrappers registered here live in
+# a ContextVar instead (sync_to_async carries the context into that thread)
+# and one dispatcher installed on every connection applies them.
+_wrappers: ContextVar[tuple] = ContextVar("db_execute_wrappers", default=())
+
+
+def _dispatch(execute, sql, params, many, context):
+    wrappers = _wrappers.get()
+    for wrapper in reversed(wrappers):
+        execute = functools.partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def execute_wrapper(wrapper):
+    """Like connection.execute_wrapper(), for every alias and for async views."""
+    token = _wrappers.set(_wrappers.get() + (wrapper,))
+    try:
+        yield
+    finally:
+        _wrappers.reset(token)
+
+
+def install(sender=None, connection=None, **kwargs):
+    # connection_created receiver; runs again after every reconnect
+    if _dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _dispatch)
@@ -0,0 +1,219 @@
+# apps/core/exports.py
+from __future__ import annotations
+
+import csv
+import io
+import re
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Iterator, Optional, Sequence, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework.exceptions import ValidationError
+
+# Streaming CSV / JSONL exports for big tables (results, payments, top-ups).
+# Rows come from values_list(...).iterator(chunk_size=EXPORTS["CHUNK_SIZE"]),
+# i.e. a Postgres server-side cursor, and are written into a small buffer that
+# is handed to StreamingHttpResponse every BUFFER_SIZE characters, so a worker
+# holds one chunk of rows at a time however long the date range is. Under ASGI
+# the rows are pulled through sync_to_async one piece at a time; a plain sync
+# iterator would be collected into a list first.
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "jsonl": ("application/x-ndjson; charset=utf-8", "jsonl"),
+}
+
+BUFFER_SIZE = 64 * 1024
+
+_encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+# cells starting with these are run as formulas by Excel / LibreOffice;
+# plain numbers and phone numbers (+998...) are left alone
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+_NUMBER_RE = re.compile(r"[+-]?\d[\d.]*")
+
+
+def _cells(row, tz):
+    return [v.astimezone(tz).isoformat() if isinstance(v, datetime) else v for v in row]
+
+
+def _csv_cell(value):
+    if (
+        isinstance(value, str)
+        and value.startswith(_FORMULA_PREFIXES)
+        and not _NUMBER_RE.fullmatch(value)
+    ):
+        return "'" + value
+    return value
+
+
+def _csv_rows(headers: Sequence[str], rows) -> Iterator[str]:
+    tz = timezone.get_current_timezone()
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("\ufeff")  # BOM: Excel reads the file as UTF-8
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow([_csv_cell(v) for v in _cells(row, tz)])
+        if buf.tell() >= BUFFER_SIZE:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def _jsonl_rows(headers: Sequence[str], rows) -> Iterator[str]:
+    tz = timezone.get_current_timezone()
+    parts, size = [], 0
+    for row in rows:
+        line = _encoder.encode(dict(zip(headers, _cells(row, tz)))) + "\n"
+        parts.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            yield "".join(parts)
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts)
+
+
+async def _aiter(iterator: Iterator[str]):
+    # thread_sensitive: every step runs on the request's thread, which owns
+    # the connection the server-side cursor lives on
+    step = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (part := await step(iterator, None)) is not None:
+            yield part
+    finally:
+        await sync_to_async(iterator.close, thread_sensitive=True)()
+
+
+def date_range(params) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    `from` / `to` query parameters as [start, end). Both accept a date or a
+    datetime; a date in `to` includes that whole day.
+    """
+    bounds = []
+    for key in ("from", "to"):
+        raw = (params.get(key) or "").strip()
+        if not raw:
+            bounds.append(None)
+            continue
+        try:
+            day = parse_date(raw)
+            value = None if day else parse_datetime(raw)
+        except ValueError:
+            value = day = None
+        if value is None and day is None:
+            raise ValidationError({key: "Expected YYYY-MM-DD or an ISO datetime."})
+        if value is None:
+            day = day + timedelta(days=1) if key == "to" else day
+            value = datetime.combine(day, time.min)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        bounds.append(value)
+    start, end = bounds
+    if start and end and start >= end:
+        raise ValidationError({"to": "Must be after `from`."})
+    return start, end
+
+
+@dataclass(frozen=True)
+class Export:
+    """A named set of columns: (header, values_list lookup) pairs."""
+
+    name: str
+    columns: Tuple[Tuple[str, str], ...]
+    date_field: str = "created_at"
+
+    @property
+    def headers(self) -> Tuple[str, ...]:
+        return tuple(header for header, _ in self.columns)
+
+    def between(self, queryset: QuerySet, start=None, end=None) -> QuerySet:
+        if start is not None:
+            queryset = queryset.filter(**{f"{self.date_field}__gte": start})
+        if end is not None:
+            queryset = queryset.filter(**{f"{self.date_field}__lt": end})
+        return queryset
+
+    def rows(self, queryset: QuerySet, fmt: str = "csv") -> Iterator[str]:
+        # ordered by the indexed date column: a range scan, no sort
+        rows = (
+            queryset.order_by(self.date_field, "pk")
+            .values_list(*(lookup for _, lookup in self.columns))
+            .iterator(chunk_size=settings.EXPORTS["CHUNK_SIZE"])
+        )
+        writer = _jsonl_rows if fmt == "jsonl" else _csv_rows
+        return writer(self.headers, rows)
+
+    def response(self, request, queryset: QuerySet, fmt: str = "csv"):
+        content_type, ext = FORMATS[fmt]
+        content = self.rows(queryset, fmt)
+        if isinstance(getattr(request, "_request", request), ASGIRequest):
+            content = _aiter(content)
+        filename = f"{self.name}-{timezone.localdate():%Y%m%d}.{ext}"
+        return StreamingHttpResponse(
+            content,
+            content_type=content_type,
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "Cache-Control": "no-store",
+            },
+        )
+
+    def view_response(self, request, queryset: QuerySet):
+        """API views: `fmt`, `from` and `to` from the query string."""
+        fmt = request.query_params.get("fmt") or "csv"
+        if fmt not in FORMATS:
+            raise ValidationError({"fmt": f"One of: {', '.join(FORMATS)}."})
+        start, end = date_range(request.query_params)
+        return self.response(request, self.between(queryset, start, end), fmt)
+
+    def admin_actions(self):
+        """Changelist actions exporting the selected (or all filtered) rows."""
+
+        def make(fmt):
+            @admin.action(
+                description=f"Export selected as {fmt.upper()}",
+                permissions=["view"],
+            )
+            def action(modeladmin, request, queryset):
+                return self.response(request, queryset, fmt)
+
+            action.__name__ = f"export_{fmt}"
+            return action
+
+        return [make(fmt) for fmt in FORMATS]
+
+
+def export_schema(tag: str, summary: str):
+    """extend_schema for an Export.view_response endpoint."""
+    return extend_schema(
+        tags=[tag],
+        summary=summary,
+        parameters=[
+            OpenApiParameter(
+                "fmt", OpenApiTypes.STR, enum=list(FORMATS), description="csv (default)"
+            ),
+            OpenApiParameter("from", OpenApiTypes.DATE, description="created_at >="),
+            OpenApiParameter(
+                "to", OpenApiTypes.DATE, description="created_at <= (whole day)"
+            ),
+        ],
+        responses={
+            (200, FORMATS["csv"][0].split(";")[0]): OpenApiTypes.BINARY,
+            (200, FORMATS["jsonl"][0].split(";")[0]): OpenApiTypes.BINARY,
+        },
+    )
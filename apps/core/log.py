@@ -0,0 +1,159 @@
+# apps/core/log.py
+from __future__ import annotations
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+REQUEST_ID_HEADER = "X-Request-ID"
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+_request_id_re = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+# LogRecord attributes that are not user "extra" fields.
+_RESERVED = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__.keys()
+    | {"message", "asctime", "request_id"}
+)
+
+
+class RequestIdMiddleware:
+    """
+    Takes X-Request-ID from the caller (the bot sends one per update) or makes
+    a new one, exposes it to logging and echoes it back on the response.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _request_id(request) -> str:
+        incoming = request.headers.get(REQUEST_ID_HEADER, "")
+        return incoming if _request_id_re.match(incoming) else uuid.uuid4().hex
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        rid = self._request_id(request)
+        token = request_id_var.set(rid)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response[REQUEST_ID_HEADER] = rid
+        return response
+
+    async def __acall__(self, request):
+        rid = self._request_id(request)
+        token = request_id_var.set(rid)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response[REQUEST_ID_HEADER] = rid
+        return response
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of records below WARNING for the configured logger
+    prefixes, e.g. {"apps.profiling": 0.1}. Warnings and errors always pass.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        # longest prefix first, so "a.b" wins over "a"
+        self.rates = sorted((rates or {}).items(), key=lambda kv: -len(kv[0]))
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                return rate >= 1 or random.random() < rate
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class QueueStreamHandler(QueueHandler):
+    """
+    Drop-in for StreamHandler: the calling thread only enqueues the record,
+    a QueueListener thread formats and writes it. Filters attached to this
+    handler still run in the caller (request id, sampling).
+    """
+
+    def __init__(self, stream=None, maxsize: int = 10000):
+        super().__init__(queue.Queue(maxsize))
+        self._target = logging.StreamHandler(stream or sys.stderr)
+        self._listener = QueueListener(self.queue, self._target)
+        self._listener.start()
+        atexit.register(self._stop)
+
+    def setFormatter(self, fmt):
+        # dictConfig sets the formatter here; formatting happens in the listener
+        super().setFormatter(fmt)
+        self._target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Resolve %-args now (they may be mutated later) but leave the
+        # expensive formatting / traceback rendering to the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # never block a request on logging; drop and count instead
+            self.dropped = getattr(self, "dropped", 0) + 1
+
+    def _stop(self):
+        if self._listener._thread is not None:  # noqa
+            self._listener.stop()  # flushes what is still queued
+
+    def close(self):
+        self._stop()
+        super().close()
@@ -0,0 +1,136 @@
+# apps/core/management/commands/benchmark_api.py
+import json
+import logging
+import platform
+import random
+import subprocess
+from contextlib import ExitStack
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.throttling import SimpleRateThrottle
+
+from apps.core import benchmark
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic data and benchmark key API endpoints concurrently "
+        "(latency percentiles, throughput, queries per request)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=sorted(benchmark.SCENARIOS),
+            help="Scenario to run (repeatable). Default: all.",
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument(
+            "--seed",
+            action="store_true",
+            help="Create synthetic data before running.",
+        )
+        parser.add_argument(
+            "--flush",
+            action="store_true",
+            help="Delete previously seeded synthetic data first.",
+        )
+        parser.add_argument("--students", type=int, default=200)
+        parser.add_argument("--teachers", type=int, default=10)
+        parser.add_argument("--tests", type=int, default=10)
+        parser.add_argument("--random-seed", type=int, default=42)
+        parser.add_argument(
+            "--keep-throttling",
+            action="store_true",
+            help="Do not bypass DRF throttles (they cap OTP/anon rates).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Allow seeding/flushing when DEBUG is off.",
+        )
+
+    def handle(self, *args, **opts):
+        if (opts["seed"] or opts["flush"]) and not (settings.DEBUG or opts["force"]):
+            raise CommandError("Refusing to write synthetic data with DEBUG=False.")
+
+        rng = random.Random(opts["random_seed"])
+        if opts["flush"]:
+            benchmark.flush()
+            self.stdout.write("Flushed synthetic data.")
+            if not opts["seed"]:
+                return
+        if opts["seed"]:
+            cfg = benchmark.SeedConfig(
+                students=opts["students"],
+                teachers=opts["teachers"],
+                tests=opts["tests"],
+            )
+            counts = benchmark.seed(cfg, rng=rng)
+            self.stdout.write(f"Seeded: {counts}")
+        if not benchmark.bench_users().exists():
+            raise CommandError("No synthetic data found, run with --seed first.")
+
+        concurrency = max(opts["concurrency"], 1)
+        results = {}
+        # Expected 4xx (e.g. exhausted pools) would otherwise flood the console.
+        logging.getLogger("django.request").setLevel(logging.ERROR)
+        with ExitStack() as stack:
+            if not opts["keep_throttling"]:
+                stack.enter_context(
+                    mock.patch.object(
+                        SimpleRateThrottle, "allow_request", return_value=True
+                    )
+                )
+            for name in opts["scenario"] or list(benchmark.SCENARIOS):
+                calls = benchmark.SCENARIOS[name](opts["requests"] + opts["warmup"])
+                if not calls:
+                    self.stdout.write(self.style.WARNING(f"{name}: no data, skipped"))
+                    continue
+                warmup, calls = calls[: opts["warmup"]], calls[opts["warmup"] :]
+                benchmark.run_scenario(warmup, concurrency=concurrency)
+                res = benchmark.run_scenario(calls, concurrency=concurrency)
+                results[name] = res
+                lat = res["latency_ms"]
+                self.stdout.write(
+                    f"{name:<18} n={res['requests']:<5} err={res['errors']:<4} "
+                    f"rps={res['throughput_rps']:<8} p50={lat['p50']:<8} "
+                    f"p95={lat['p95']:<8} p99={lat['p99']:<8} "
+                    f"q/req={res['queries_per_request']['mean']}"
+                )
+
+        report = {
+            "meta": {
+                "timestamp": timezone.now().isoformat(),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "concurrency": concurrency,
+                "requests": opts["requests"],
+                "warmup": opts["warmup"],
+                "throttles_bypassed": not opts["keep_throttling"],
+            },
+            "scenarios": results,
+        }
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {opts['output']}"))
@@ -0,0 +1,117 @@
+# apps/core/management/commands/benchmark_asgi.py
+import asyncio
+import json
+import logging
+import platform
+from contextlib import ExitStack
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.throttling import SimpleRateThrottle
+
+from apps.core import benchmark
+from apps.core.management.commands.benchmark_api import _git_revision
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the async read views with sync DRF baselines doing the same "
+        "work, both served by the ASGI handler in-process under high concurrency. "
+        "Uses data created by `benchmark_api --seed`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            choices=sorted(benchmark.ASGI_ENDPOINTS),
+            help="Endpoint to run (repeatable). Default: all.",
+        )
+        parser.add_argument(
+            "--mode",
+            action="append",
+            choices=["sync", "async"],
+            help="View variant to run (repeatable). Default: both.",
+        )
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1000,
+            help="Requests in flight at once (open connections).",
+        )
+        parser.add_argument(
+            "--db-latency-ms",
+            type=float,
+            default=0.0,
+            help="Extra sleep per SQL query, to model a remote database.",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument(
+            "--keep-throttling",
+            action="store_true",
+            help="Do not bypass DRF throttles.",
+        )
+
+    def handle(self, *args, **opts):
+        if not benchmark.bench_users().exists():
+            raise CommandError(
+                "No synthetic data found, run `benchmark_api --seed` first."
+            )
+
+        concurrency = max(opts["concurrency"], 1)
+        modes = opts["mode"] or ["sync", "async"]
+        results = {}
+        logging.getLogger("django.request").setLevel(logging.ERROR)
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        with ExitStack() as stack:
+            stack.enter_context(override_settings(ROOT_URLCONF="apps.core.bench_urls"))
+            if not opts["keep_throttling"]:
+                stack.enter_context(
+                    mock.patch.object(
+                        SimpleRateThrottle, "allow_request", return_value=True
+                    )
+                )
+            for name in opts["endpoint"] or list(benchmark.ASGI_ENDPOINTS):
+                calls = benchmark.ASGI_ENDPOINTS[name](opts["requests"])
+                if not calls:
+                    self.stdout.write(self.style.WARNING(f"{name}: no data, skipped"))
+                    continue
+                results[name] = {}
+                for mode in modes:
+                    res = asyncio.run(
+                        benchmark.run_asgi(
+                            calls,
+                            mode=mode,
+                            concurrency=concurrency,
+                            db_latency_ms=opts["db_latency_ms"],
+                        )
+                    )
+                    results[name][mode] = res
+                    lat = res["latency_ms"]
+                    self.stdout.write(
+                        f"{name:<15} {mode:<6} n={res['requests']:<6} "
+                        f"err={res['errors']:<4} rps={res['throughput_rps']:<9} "
+                        f"p50={lat['p50']:<9} p95={lat['p95']:<9} "
+                        f"p99={lat['p99']:<9} q/req={res['queries_per_request']['mean']}"
+                    )
+
+        report = {
+            "meta": {
+                "timestamp": timezone.now().isoformat(),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "server": "asgi (in-process)",
+                "concurrency": concurrency,
+                "requests": opts["requests"],
+                "db_latency_ms": opts["db_latency_ms"],
+                "throttles_bypassed": not opts["keep_throttling"],
+            },
+            "endpoints": results,
+        }
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {opts['output']}"))
@@ -0,0 +1,73 @@
+# apps/core/management/commands/benchmark_pk.py
+import json
+import platform
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core import benchmark
+from apps.core.management.commands.benchmark_api import _git_revision
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare uuid4 and uuid7 primary keys: insert throughput and primary "
+        "key index size for answer-shaped rows built from the data created "
+        "by `benchmark_api --seed`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--generator",
+            action="append",
+            choices=sorted(benchmark.PK_GENERATORS),
+            help="Key generator to run (repeatable). Default: all.",
+        )
+        parser.add_argument("--rows", type=int, default=200_000)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument(
+            "--keep-tables",
+            action="store_true",
+            help="Leave the bench_pk_* scratch tables in place.",
+        )
+
+    def handle(self, *args, **opts):
+        if not benchmark.bench_users().exists():
+            raise CommandError(
+                "No synthetic data found, run `benchmark_api --seed` first."
+            )
+
+        results = {}
+        for kind in opts["generator"] or list(benchmark.PK_GENERATORS):
+            res = benchmark.run_pk_inserts(
+                kind,
+                rows=opts["rows"],
+                batch_size=max(opts["batch_size"], 1),
+                keep=opts["keep_tables"],
+            )
+            if not res:
+                raise CommandError("Seeded data has no user tests or questions.")
+            results[kind] = res
+            self.stdout.write(
+                f"{kind:<6} rows={res['rows']:<8} rps={res['throughput_rps']:<9} "
+                f"tail_rps={res['tail_throughput_rps']:<9} "
+                f"table={res['table_mb']}MB pk={res['pk_index_mb']}MB "
+                f"(reindexed {res['pk_index_mb_reindexed']}MB, "
+                f"+{res['pk_index_bloat_pct']}%)"
+            )
+
+        report = {
+            "meta": {
+                "timestamp": timezone.now().isoformat(),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "rows": opts["rows"],
+                "batch_size": opts["batch_size"],
+            },
+            "generators": results,
+        }
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {opts['output']}"))
@@ -0,0 +1,99 @@
+# apps/core/management/commands/benchmark_purchase.py
+import json
+import platform
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core import benchmark
+from apps.core.management.commands.benchmark_api import _git_revision
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer the purchase engine with concurrent purchases for one student "
+        "and check that nothing is bought twice or paid for without a test. "
+        "Uses data created by `benchmark_api --seed`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--rounds", type=int, default=200)
+        parser.add_argument(
+            "--tests",
+            type=int,
+            default=1,
+            help="Distinct tests the workers compete for (1 = all the same test).",
+        )
+        parser.add_argument(
+            "--funds-for",
+            type=int,
+            default=1,
+            help="Balance per round covers this many of the tests.",
+        )
+        parser.add_argument(
+            "--cart",
+            action="store_true",
+            help="Workers check out all --tests at once through the cart.",
+        )
+        parser.add_argument(
+            "--compare-cart",
+            type=int,
+            metavar="ITEMS",
+            help="Instead: time buying ITEMS tests one by one vs one checkout.",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **opts):
+        if not benchmark.bench_tests().exists():
+            raise CommandError(
+                "No synthetic data found, run `benchmark_api --seed` first."
+            )
+
+        if opts["compare_cart"]:
+            res = benchmark.run_cart_comparison(
+                items=max(opts["compare_cart"], 1), rounds=max(opts["rounds"], 1)
+            )
+            for name in ("single_one", "single_all", "cart_all"):
+                row = res[name]
+                items = 1 if name == "single_one" else res["items"]
+                self.stdout.write(
+                    f"{name:<11} items={items:<3} mean={row['ms_mean']}ms "
+                    f"p50={row['ms_p50']}ms queries={row['queries']}"
+                )
+            self._report(opts, {"cart_comparison": res})
+            return
+
+        res = benchmark.run_purchase_contention(
+            threads=max(opts["threads"], 1),
+            rounds=max(opts["rounds"], 1),
+            tests=max(opts["tests"], 1),
+            funds_for=max(opts["funds_for"], 0),
+            cart=opts["cart"],
+        )
+        lat = res["latency_ms"]
+        outcomes = " ".join(f"{k}={v}" for k, v in sorted(res["outcomes"].items()))
+        self.stdout.write(
+            f"attempts={res['attempts']} rps={res['throughput_rps']} "
+            f"p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} {outcomes}"
+        )
+        style = self.style.ERROR if res["invariant_violations"] else self.style.SUCCESS
+        self.stdout.write(style(f"invariant violations: {res['invariant_violations']}"))
+
+        self._report(opts, {"contention": res})
+
+    def _report(self, opts, results):
+        report = {
+            "meta": {
+                "timestamp": timezone.now().isoformat(),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "tests": opts["tests"],
+                "funds_for": opts["funds_for"],
+            },
+            **results,
+        }
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {opts['output']}"))
@@ -0,0 +1,34 @@
+# apps/core/management/commands/maintain_partitions.py
+from django.core.management.base import BaseCommand
+
+from apps.core import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming created_at partitions and detach/drop expired ones "
+        "for the tables in settings.PARTITIONS. Runs at startup (runner.sh) and "
+        "daily in the docker-compose `scheduler` service."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--table",
+            action="append",
+            choices=sorted(partitioning.specs()),
+            help="Table to maintain (repeatable). Default: all.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only print what would be done.",
+        )
+
+    def handle(self, *args, **opts):
+        specs = partitioning.specs()
+        for table in opts["table"] or list(specs):
+            actions = partitioning.maintain(specs[table], dry_run=opts["dry_run"])
+            for action in actions:
+                self.stdout.write(f"{table}: {action}")
+            if not actions:
+                self.stdout.write(f"{table}: up to date")
@@ -0,0 +1,109 @@
+# apps/core/management/commands/trace_report.py
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[k]
+
+
+class Command(BaseCommand):
+    help = (
+        "Summarize a trace file (bot + backend spans): slowest traces and where "
+        "their time goes (DB, Telegram, backend calls)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "files",
+            nargs="*",
+            help="JSONL span files (default: TRACING['FILE']). Pass the bot's "
+            "file too to join both sides of a trace.",
+        )
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument(
+            "--percentile",
+            type=float,
+            default=95,
+            help="Break down traces at or above this latency percentile.",
+        )
+        parser.add_argument("--name", help="Only traces whose root span has this name.")
+
+    def handle(self, *args, **opts):
+        files = opts["files"] or [settings.TRACING.get("FILE")]
+        spans = []
+        for path in filter(None, files):
+            try:
+                with open(path, encoding="utf-8") as fh:
+                    spans.extend(json.loads(line) for line in fh if line.strip())
+            except OSError as e:
+                raise CommandError(f"Cannot read {path}: {e}")
+        if not spans:
+            raise CommandError("No spans found.")
+
+        traces = defaultdict(list)
+        for sp in spans:
+            traces[sp["trace_id"]].append(sp)
+
+        roots = {}
+        for trace_id, items in traces.items():
+            ids = {sp["span_id"] for sp in items}
+            # bot update span if present, otherwise the backend server span
+            top = [sp for sp in items if sp.get("parent_id") not in ids]
+            root = max(top, key=lambda sp: sp["duration_ms"])
+            if opts["name"] and root["name"] != opts["name"]:
+                continue
+            roots[trace_id] = root
+        if not roots:
+            raise CommandError("No matching traces.")
+
+        durations = [r["duration_ms"] for r in roots.values()]
+        self.stdout.write(
+            f"traces={len(roots)} spans={len(spans)} "
+            f"p50={_percentile(durations, 50):.1f}ms "
+            f"p95={_percentile(durations, 95):.1f}ms "
+            f"p99={_percentile(durations, 99):.1f}ms"
+        )
+
+        self.stdout.write(f"\nSlowest {opts['top']} traces:")
+        slowest = sorted(roots.items(), key=lambda kv: -kv[1]["duration_ms"])
+        for trace_id, root in slowest[: opts["top"]]:
+            self.stdout.write(
+                f"  {root['duration_ms']:>9.1f}ms  {trace_id}  "
+                f"{root['service']}: {root['name']}  ({len(traces[trace_id])} spans)"
+            )
+
+        # Time spent in leaf-ish operations of the tail traces. DB spans are
+        # summed per statement shape, so a repeated query shows up as one row.
+        cutoff = _percentile(durations, opts["percentile"])
+        tail = [t for t, r in roots.items() if r["duration_ms"] >= cutoff]
+        totals = defaultdict(lambda: [0, 0.0])
+        for trace_id in tail:
+            for sp in traces[trace_id]:
+                if sp is roots[trace_id]:
+                    continue
+                if sp["kind"] == "db":
+                    key = (sp["service"], "db", sp["attrs"].get("statement", "")[:80])
+                else:
+                    key = (sp["service"], sp["kind"], sp["name"])
+                totals[key][0] += 1
+                totals[key][1] += sp["duration_ms"]
+
+        self.stdout.write(
+            f"\nBreakdown of {len(tail)} traces >= p{opts['percentile']:g} "
+            f"({cutoff:.1f}ms), total ms per trace:"
+        )
+        for (service, kind, name), (count, total) in sorted(
+            totals.items(), key=lambda kv: -kv[1][1]
+        )[:20]:
+            self.stdout.write(
+                f"  {total / len(tail):>9.1f}ms  x{count / len(tail):<5.1f} "
+                f"{service}/{kind}  {name}"
+            )
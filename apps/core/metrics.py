@@ -0,0 +1,212 @@
+# apps/core/metrics.py
+from __future__ import annotations
+
+import hmac
+import os
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.models import Count, Q
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils import timezone
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from apps.core import dbhooks
+
+# With PROMETHEUS_MULTIPROC_DIR set (one shared dir per host, wiped on deploy)
+# every worker writes its samples to mmap files there and the scrape view
+# merges them, so any worker can answer /metrics for all of them.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by view.",
+    ["view", "method", "status"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL queries executed per request.",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+CACHE_OPERATIONS = Counter(
+    "cache_get_total",
+    "Cache reads by alias and result (hit/miss).",
+    ["cache", "result"],
+)
+OTP_EVENTS = Counter(
+    "otp_events_total",
+    "OTP codes issued by the bot and verified by users.",
+    ["event", "purpose"],
+)
+PURCHASES = Counter(
+    "test_purchases_total",
+    "Test purchase attempts by outcome.",
+    ["outcome"],
+)
+ACTIVITY_FLUSHED = Counter(
+    "user_activity_flushed_total",
+    "users.last_activity rows written by the activity tracker.",
+)
+
+ACTIVE_USER_WINDOWS = {
+    "5m": timedelta(minutes=5),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+
+class DomainCollector:
+    """
+    Gauges read from the database at scrape time (not per process). The
+    families are kept for METRICS["DOMAIN_TTL"] seconds, so frequent scrapes
+    (or several Prometheus replicas) run the aggregates once per TTL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families = []
+        self._expires = 0.0
+
+    def collect(self):
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._expires:
+                self._families = list(self._read())
+                self._expires = now + settings.METRICS.get("DOMAIN_TTL", 0)
+            return list(self._families)
+
+    def _read(self):
+        from apps.payments.models import Payment
+        from apps.teacher_checking.models import SubmissionCounter
+        from apps.users.models import User
+
+        payments = GaugeMetricFamily(
+            "payments", "Payments by status.", labels=["status"]
+        )
+        rows = Payment.objects.order_by().values("status").annotate(n=Count("pk"))
+        for status, n in rows.values_list("status", "n"):
+            payments.add_metric([status], n)
+        yield payments
+
+        queue = GaugeMetricFamily(
+            "teacher_submissions",
+            "Writing submissions by status (maintained counters).",
+            labels=["status"],
+        )
+        for status, n in SubmissionCounter.objects.filter(
+            teacher__isnull=True
+        ).values_list("status", "count"):
+            queue.add_metric([status], max(n, 0))
+        yield queue
+
+        # last_activity is written by apps/users/activity.py, so these lag by
+        # up to ACTIVITY["GRANULARITY"] + ["FLUSH_INTERVAL"] seconds
+        active = GaugeMetricFamily(
+            "active_users",
+            "Users with activity within the window.",
+            labels=["window"],
+        )
+        now = timezone.now()
+        counts = User.objects.aggregate(
+            **{
+                window: Count("pk", filter=Q(last_activity__gte=now - delta))
+                for window, delta in ACTIVE_USER_WINDOWS.items()
+            }
+        )
+        for window, n in counts.items():
+            active.add_metric([window], n)
+        yield active
+
+
+class _QueryCounter:
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """Per-view latency and query-count histograms (settings.METRICS)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS.get("ENABLED"):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        with dbhooks.execute_wrapper(counter):
+            response = self.get_response(request)
+        self._observe(request, response, time.perf_counter() - start, counter)
+        return response
+
+    async def __acall__(self, request):
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        with dbhooks.execute_wrapper(counter):
+            response = await self.get_response(request)
+        self._observe(request, response, time.perf_counter() - start, counter)
+        return response
+
+    @staticmethod
+    def _observe(request, response, elapsed, counter):
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match and match.view_name else "unmatched"
+        REQUEST_LATENCY.labels(view, request.method, response.status_code).observe(
+            elapsed
+        )
+        REQUEST_QUERIES.labels(view).observe(counter.count)
+
+
+def _registry() -> CollectorRegistry:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return registry
+
+
+_domain_registry = CollectorRegistry(auto_describe=False)
+_domain_registry.register(DomainCollector())
+
+
+def metrics_view(request):
+    if not settings.METRICS.get("ENABLED"):
+        raise Http404
+    token = settings.METRICS.get("TOKEN")
+    if not token:
+        # never served unauthenticated: the domain gauges hit the database
+        raise Http404
+    provided = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not hmac.compare_digest(provided, token):
+        return HttpResponseForbidden()
+    body = generate_latest(_registry()) + generate_latest(_domain_registry)
+    return HttpResponse(body, content_type=CONTENT_TYPE_LATEST)
@@ -3,6 +3,8 @@ import logging
 import httpx
 from django.conf import settings
 
+from apps.core import tracing
+
 log = logging.getLogger(__name__)
 
 
@@ -18,9 +20,14 @@ async def _tg_send_async(text: str, chat_id: str):
         "disable_web_page_preview": True,
     }
     timeout = httpx.Timeout(connect=3.0, read=5.0)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        r = await client.post(url, json=payload)
-        r.raise_for_status()
+    with tracing.span(
+        "telegram.sendMessage", kind="client", **{"http.method": "POST"}
+    ) as sp:
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            r = await client.post(url, json=payload)
+            if sp is not None:
+                sp.attrs["http.status"] = r.status_code
+            r.raise_for_status()
 
 
 def notify_telegram_admin_sync(text: str):
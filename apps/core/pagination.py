@@ -0,0 +1,76 @@
+# apps/core/pagination.py
+from asgiref.sync import sync_to_async
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    # Keyset pagination on an indexed column: no OFFSET and no COUNT(*), so
+    # page 1000 costs the same as page 1. The trailing id only breaks ties.
+    ordering = ("-created_at", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class IdCursorPagination(CreatedAtCursorPagination):
+    ordering = ("id",)
+
+
+class OldestFirstCursorPagination(CreatedAtCursorPagination):
+    # Queues: the cursor stays on created_at, which never changes and is never
+    # NULL, so rows can't jump across a cursor (or vanish) between pages.
+    ordering = ("created_at", "id")
+
+
+def paginated_schema(pagination_class=CreatedAtCursorPagination):
+    """
+    For function views returning paginate(): sets the view's pagination_class,
+    so drf-spectacular wraps the `Serializer(many=True)` response in the
+    cursor envelope and lists the cursor / page_size params. Goes above
+    @api_view; AsyncAPIView subclasses set pagination_class themselves.
+    """
+
+    def decorator(view):
+        view.cls.pagination_class = pagination_class
+        return view
+
+    return decorator
+
+
+def paginate(
+    request,
+    queryset,
+    serializer_class,
+    *,
+    pagination_class=CreatedAtCursorPagination,
+    view=None,
+):
+    """Cursor-paginated response for function-based (@api_view) list views."""
+    paginator = pagination_class()
+    page = paginator.paginate_queryset(queryset, request, view=view)
+    data = serializer_class(page, many=True, context={"request": request}).data
+    return paginator.get_paginated_response(data)
+
+
+async def apaginate(
+    request,
+    queryset,
+    serializer_class,
+    *,
+    pagination_class=CreatedAtCursorPagination,
+):
+    """paginate() for AsyncAPIView handlers: the page query runs via sync_to_async."""
+    paginator = pagination_class()
+    page = await sync_to_async(paginator.paginate_queryset)(queryset, request)
+    data = serializer_class(page, many=True, context={"request": request}).data
+    return paginator.get_paginated_response(data)
+
+
+def clamp_limit(value: int) -> int:
+    """
+    Bounded section size for dashboards. 0/negative (or no value) gives
+    PAGE_SIZE; it used to mean "everything", which the paginated list
+    endpoints now serve.
+    """
+    if value <= 0:
+        return CreatedAtCursorPagination.page_size
+    return min(value, CreatedAtCursorPagination.max_page_size)
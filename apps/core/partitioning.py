@@ -0,0 +1,160 @@
+# apps/core/partitioning.py
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+# Range-partitioned tables (see the accounts/user_tests partitioning
+# migrations): one partition per day/month of created_at, named
+# <table>_pYYYY_MM[_DD], plus a <table>_default catch-all that should stay
+# empty as long as maintenance runs ahead of time.
+
+_bound_re = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass
+class PartitionSpec:
+    table: str
+    interval: str = "month"  # "day" | "month"
+    premake: int = 3  # future partitions to keep ready
+    retention: Optional[int] = None  # partitions (intervals) to keep; None = all
+    archive: str = "detach"  # "detach" keeps old partitions as plain tables
+
+    def floor(self, dt: datetime) -> datetime:
+        dt = dt.astimezone(dt_timezone.utc)
+        if self.interval == "day":
+            return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    def shift(self, start: datetime, n: int) -> datetime:
+        if self.interval == "day":
+            return start + timedelta(days=n)
+        month = start.month - 1 + n
+        return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+
+    def name(self, start: datetime) -> str:
+        fmt = "%Y_%m_%d" if self.interval == "day" else "%Y_%m"
+        return f"{self.table}_p{start.strftime(fmt)}"
+
+
+def specs() -> Dict[str, PartitionSpec]:
+    return {
+        table: PartitionSpec(
+            table=table,
+            interval=conf.get("INTERVAL", "month"),
+            premake=conf.get("PREMAKE", 3),
+            retention=conf.get("RETENTION"),
+            archive=conf.get("ARCHIVE", "detach"),
+        )
+        for table, conf in settings.PARTITIONS.items()
+    }
+
+
+def partitions(table: str) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+    """(name, from, to) of every attached partition; bounds are None for DEFAULT."""
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            ORDER BY c.relname
+            """,
+            [table],
+        )
+        rows = cur.fetchall()
+    result = []
+    for name, bound in rows:
+        m = _bound_re.search(bound)
+        if m:
+            lo, hi = (datetime.fromisoformat(v) for v in m.groups())
+            result.append((name, lo, hi))
+        else:
+            result.append((name, None, None))
+    return result
+
+
+def _create(spec: PartitionSpec, start: datetime, end: datetime, dry_run: bool) -> str:
+    qn = connection.ops.quote_name
+    name, parent, default = spec.name(start), spec.table, f"{spec.table}_default"
+    action = f"create {name} [{start:%Y-%m-%d}, {end:%Y-%m-%d})"
+    if dry_run:
+        return action
+    with transaction.atomic(), connection.cursor() as cur:
+        cur.execute(
+            f"SELECT count(*) FROM {qn(default)} "
+            f"WHERE created_at >= %s AND created_at < %s",
+            [start, end],
+        )
+        stray = cur.fetchone()[0]
+        if not stray:
+            cur.execute(
+                f"CREATE TABLE {qn(name)} PARTITION OF {qn(parent)} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+            return action
+        # Rows already landed in DEFAULT for this range; attaching would fail,
+        # so build the partition standalone and move them over first.
+        cur.execute(
+            f"CREATE TABLE {qn(name)} "
+            f"(LIKE {qn(parent)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cur.execute(
+            f"WITH moved AS (DELETE FROM {qn(default)} "
+            f"WHERE created_at >= %s AND created_at < %s RETURNING *) "
+            f"INSERT INTO {qn(name)} SELECT * FROM moved",
+            [start, end],
+        )
+        cur.execute(
+            f"ALTER TABLE {qn(parent)} ATTACH PARTITION {qn(name)} "
+            f"FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+    return f"{action}, moved {stray} row(s) from {default}"
+
+
+def _expire(spec: PartitionSpec, name: str, dry_run: bool) -> str:
+    qn = connection.ops.quote_name
+    drop = spec.archive == "drop"
+    action = f"{'drop' if drop else 'detach'} {name}"
+    if dry_run:
+        return action
+    with transaction.atomic(), connection.cursor() as cur:
+        cur.execute(f"ALTER TABLE {qn(spec.table)} DETACH PARTITION {qn(name)}")
+        if drop:
+            cur.execute(f"DROP TABLE {qn(name)}")
+    return action
+
+
+def maintain(
+    spec: PartitionSpec, *, now: Optional[datetime] = None, dry_run: bool = False
+) -> List[str]:
+    """
+    Creates the current and `premake` future partitions and detaches (or
+    drops) partitions that ended more than `retention` intervals ago.
+    Idempotent; meant to run daily from cron.
+    """
+    current = spec.floor(now or timezone.now())
+    existing = partitions(spec.table)
+    taken = [(lo, hi) for _, lo, hi in existing if lo is not None]
+    actions = []
+
+    for n in range(spec.premake + 1):
+        start, end = spec.shift(current, n), spec.shift(current, n + 1)
+        if any(lo < end and start < hi for lo, hi in taken):
+            continue  # already covered (possibly by an older, wider partition)
+        actions.append(_create(spec, start, end, dry_run))
+
+    if spec.retention is not None:
+        cutoff = spec.shift(current, -spec.retention)
+        for name, lo, hi in existing:
+            if hi is not None and hi <= cutoff:
+                actions.append(_expire(spec, name, dry_run))
+    return actions
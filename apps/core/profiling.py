@@ -0,0 +1,171 @@
+# apps/core/profiling.py
+from __future__ import annotations
+
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.serializers import BaseSerializer
+
+from apps.core import dbhooks
+
+logger = logging.getLogger("apps.profiling")
+
+_in_list_re = re.compile(r"\((?:%s, )+%s\)")
+_ws_re = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    # Params are already separated out (%s), only IN (...) lists vary in size.
+    return _ws_re.sub(" ", _in_list_re.sub("(%s...)", sql)).strip()
+
+
+@dataclass
+class RequestProfile:
+    queries: int = 0
+    db_ms: float = 0.0
+    serializer_ms: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+    _serializer_depth: int = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - start) * 1000
+            self.queries += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold: int):
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "request_profile", default=None
+)
+
+_original_data = BaseSerializer.data
+
+
+def _timed_data(self):
+    # Only the outermost .data is timed, nested serializers are part of it.
+    profile = _current.get()
+    if profile is None or profile._serializer_depth:  # noqa
+        return _original_data.fget(self)
+    profile._serializer_depth += 1  # noqa
+    start = time.perf_counter()
+    try:
+        return _original_data.fget(self)
+    finally:
+        profile.serializer_ms += (time.perf_counter() - start) * 1000
+        profile._serializer_depth -= 1  # noqa
+
+
+class QueryProfilerMiddleware:
+    """
+    Opt-in (settings.PROFILING["ENABLED"]) per-request SQL/serializer profiler.
+    A sampled request gets X-Query-* / Server-Timing headers and one
+    "apps.profiling" log record; repeated query fingerprints flag N+1s.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        conf = getattr(settings, "PROFILING", {})
+        if not conf.get("ENABLED"):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = float(conf.get("SAMPLE_RATE", 1.0))
+        self.duplicate_threshold = int(conf.get("DUPLICATE_THRESHOLD", 2))
+        self.headers = bool(conf.get("HEADERS", True))
+        BaseSerializer.data = property(_timed_data)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            with dbhooks.execute_wrapper(profile):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._report(request, response, profile, start)
+        return response
+
+    async def __acall__(self, request):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return await self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            with dbhooks.execute_wrapper(profile):
+                response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._report(request, response, profile, start)
+        return response
+
+    def _report(self, request, response, profile, start):
+        total_ms = (time.perf_counter() - start) * 1000
+
+        duplicates = profile.duplicates(self.duplicate_threshold)
+        if self.headers:
+            response["X-Query-Count"] = str(profile.queries)
+            response["X-Query-Time-Ms"] = f"{profile.db_ms:.1f}"
+            response["X-Query-Duplicates"] = str(sum(n - 1 for _, n in duplicates))
+            response["X-Serializer-Time-Ms"] = f"{profile.serializer_ms:.1f}"
+            response["Server-Timing"] = (
+                f"db;dur={profile.db_ms:.1f}, "
+                f"serializer;dur={profile.serializer_ms:.1f}, "
+                f"total;dur={total_ms:.1f}"
+            )
+
+        match = getattr(request, "resolver_match", None)
+        logger.log(
+            logging.WARNING if duplicates else logging.INFO,
+            "%s %s %s queries=%d db_ms=%.1f serializer_ms=%.1f total_ms=%.1f "
+            "duplicates=%d",
+            request.method,
+            request.path,
+            response.status_code,
+            profile.queries,
+            profile.db_ms,
+            profile.serializer_ms,
+            total_ms,
+            len(duplicates),
+            extra={
+                "profile": {
+                    "method": request.method,
+                    "path": request.path,
+                    "view": match.view_name if match else None,
+                    "status": response.status_code,
+                    "queries": profile.queries,
+                    "db_ms": round(profile.db_ms, 2),
+                    "serializer_ms": round(profile.serializer_ms, 2),
+                    "total_ms": round(total_ms, 2),
+                    "duplicates": [
+                        {"sql": fp[:500], "count": n} for fp, n in duplicates[:5]
+                    ],
+                }
+            },
+        )
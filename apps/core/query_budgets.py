@@ -0,0 +1,83 @@
+# apps/core/query_budgets.py
+from __future__ import annotations
+
+from typing import Dict, NamedTuple, Optional
+
+
+class QueryBudget(NamedTuple):
+    # Max SQL queries per request with the small fixture and with 10x the
+    # rows, the JWT auth state being cached as it is right after login.
+    # queries_10x=None means "must not grow".
+    queries: int
+    queries_10x: Optional[int] = None
+
+    @property
+    def max_10x(self) -> int:
+        return self.queries if self.queries_10x is None else self.queries_10x
+
+
+# URL name (config/urls.py, namespaced where the app sets app_name) -> budget.
+# Enforced by apps/core/tests.py; lower a number when a view gets cheaper,
+# never raise one without explaining why in the same change.
+QUERY_BUDGETS: Dict[str, QueryBudget] = {
+    # accounts
+    "register-start": QueryBudget(10),
+    # +1: the tokens carry the student profile id (cached auth state)
+    "register-verify": QueryBudget(10),
+    "login-verify": QueryBudget(8),
+    "otp-ingest": QueryBudget(4),
+    "otp-status": QueryBudget(1),
+    "token-refresh": QueryBudget(2),
+    # profiles
+    "student-me": QueryBudget(1),
+    "teacher-me": QueryBudget(1),
+    "student-topups": QueryBudget(1),
+    "student-topups-export": QueryBudget(1),
+    "student-approvals": QueryBudget(1),
+    # +1: the results carry percentiles (one histogram query)
+    "student-dashboard": QueryBudget(5),
+    "teacher-dashboard": QueryBudget(5),
+    # users
+    "users-me": QueryBudget(1),
+    "users-list": QueryBudget(1),
+    "users-detail": QueryBudget(1),
+    # +1 on deactivation: the user's tokens are revoked
+    "users-toggle-status": QueryBudget(3),
+    # user_tests
+    "all-tests": QueryBudget(1),
+    "purchase-test": QueryBudget(4),
+    "cart-quote": QueryBudget(1),
+    "cart-checkout": QueryBudget(4),
+    "my-tests": QueryBudget(1),
+    # +1: the results carry percentiles (one histogram query)
+    "my-results": QueryBudget(2),
+    "results-export": QueryBudget(1),
+    "item-stats": QueryBudget(1),
+    "leaderboard": QueryBudget(2),
+    # teacher_checking
+    "student-submit-writing": QueryBudget(7),
+    "all-writing": QueryBudget(1),
+    "my-checking": QueryBudget(1),
+    "my-checked": QueryBudget(1),
+    "claim-writing": QueryBudget(8),
+    # +1: the new overall_score moves the result between histogram buckets
+    "grade-writing": QueryBudget(11),
+    # tests
+    "tests-list": QueryBudget(1),
+    "tests-detail": QueryBudget(5),
+    "question-sets-list": QueryBudget(1),
+    "question-sets-detail": QueryBudget(2),
+    "content-search": QueryBudget(3),
+    # payments
+    "payments:create-topup": QueryBudget(2),
+    "payments:payment-status": QueryBudget(1),
+    "payments:export": QueryBudget(1),
+    # prepare: the payment row under SELECT ... FOR UPDATE, then its update
+    "payments:click-webhook": QueryBudget(4),
+    # speaking
+    "speaking-request": QueryBudget(6),
+    "speaking-my-requests": QueryBudget(1),
+}
+
+# Non-API routes under api/ that are not budgeted.
+EXEMPT = frozenset({"schema", "swagger-ui", "api-root"})
@@ -1,3 +1,527 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework.permissions import BasePermission
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.accounts import revocation
+from apps.accounts.models import VerificationCode
+from apps.payments.models import Payment
+from apps.profiles import bulk
+from apps.profiles.models import StudentApprovalLog, StudentTopUpLog
+from apps.speaking.models import SpeakingRequest
+from apps.teacher_checking.counters import rebuild_counters
+from apps.teacher_checking.models import TeacherSubmission
+from apps.tests.models import Question, QuestionSet, QuestionType, Test
+from apps.user_tests.item_stats import record_user_tests
+from apps.user_tests.models import TestResult, UserAnswer, UserTest
+from apps.user_tests.rankings import rebuild_histograms
+from apps.users.authentication import AuthRefreshToken
+from apps.users.models import User
+from .admin import EstimatedCountPaginator, estimate_count
+from .async_views import AsyncAPIView
+from .exports import _csv_rows
+from .profiling import RequestProfile
+from .query_budgets import EXEMPT, QUERY_BUDGETS
+
+N = 2
+SCALE = 10
+
+
+class Call(NamedTuple):
+    method: str
+    path: str
+    user: Optional[User] = None
+    data: Optional[Dict[str, Any]] = None
+    ok: Tuple[int, ...] = (200, 201)
+    extra: Dict[str, str] = {}
+
+
+_phone_seq = iter(range(10**6))
+
+
+def _user(role: str, **extra) -> User:
+    i = next(_phone_seq)
+    return User.objects.create_user(
+        fullname=f"{role} {i}",
+        phone_number=f"+99801{i:07d}",
+        role=role,
+        telegram_id=8_000_000_000 + i,
+        **extra,
+    )
+
+
+def _test(n: int, title: str) -> Test:
+    test = Test.objects.create(title=title, price=Decimal("1000.00"))
+    test.refresh_from_db()
+    owners = list(test.listening.sections.all()) + list(test.reading.passages.all())
+    for owner in owners:
+        qtype = (
+            QuestionType.L_MULTIPLE_CHOICE
+            if hasattr(owner, "mp3_file")
+            else QuestionType.R_YES_NO_NOT_GIVEN
+        )
+        qs = QuestionSet.objects.create(name=f"{title} set")
+        qs.questions.add(
+            *Question.objects.bulk_create(
+                Question(text=f"{title} question {k}", question_type=qtype)
+                for k in range(n)
+            )
+        )
+        owner.questions_set.add(qs)
+    return test
+
+
+def build_world(n: int) -> SimpleNamespace:
+    """Fixture where every per-user list / nested collection has ~n rows."""
+    w = SimpleNamespace()
+    w.admin = _user(User.Roles.SUPERADMIN, is_staff=True)
+    w.teacher = _user(User.Roles.TEACHER)
+    w.student = _user(User.Roles.STUDENT)
+    w.profile = w.student.student_profile
+    w.profile.balance = Decimal("10000000.00")
+    w.profile.save(update_fields=["balance"])
+    for _ in range(n):
+        _user(User.Roles.STUDENT)
+
+    w.tests = [_test(n, f"Test {i}") for i in range(n)]
+    w.unowned_test = _test(n, "Unowned")
+    w.user_tests = UserTest.objects.bulk_create(
+        UserTest(user=w.student, test=t, status=UserTest.Status.COMPLETED)
+        for t in w.tests
+    )
+    TestResult.objects.bulk_create(
+        TestResult(
+            user_test=ut,
+            listening_score=6.0,
+            reading_score=6.5,
+            overall_score=5.0 + i % 8 / 2,
+        )
+        for i, ut in enumerate(w.user_tests)
+    )
+    rebuild_histograms()
+    questions = list(Question.objects.order_by("pk").values_list("pk", flat=True))
+    UserAnswer.objects.bulk_create(
+        UserAnswer(
+            user_test=ut,
+            question_id=q,
+            raw_answer={"value": "AB"[(i + k) % 2]},
+            is_correct=(i + k) % 3 > 0,
+        )
+        for i, ut in enumerate(w.user_tests)
+        for k, q in enumerate(questions[: n * 5])
+    )
+    record_user_tests(ut.pk for ut in w.user_tests)
+    subs = []
+    for i, ut in enumerate(w.user_tests):
+        subs.append(TeacherSubmission(user_test=ut, task="task1", submitted_text="x"))
+        status = (
+            TeacherSubmission.Status.CHECKED
+            if i % 2
+            else TeacherSubmission.Status.IN_CHECKING
+        )
+        subs.append(
+            TeacherSubmission(
+                user_test=ut,
+                task="task2",
+                submitted_text="x",
+                status=status,
+                teacher=w.teacher,
+                score=6.0 if i % 2 else None,
+                checked_at=timezone.now() if i % 2 else None,
+            )
+        )
+    w.submissions = TeacherSubmission.objects.bulk_create(subs)
+    rebuild_counters()
+
+    StudentTopUpLog.objects.bulk_create(
+        StudentTopUpLog(student=w.profile, amount=1000, new_balance=1000, actor=w.admin)
+        for _ in range(n)
+    )
+    StudentApprovalLog.objects.bulk_create(
+        StudentApprovalLog(student=w.profile, approved=bool(i % 2), actor=w.admin)
+        for i in range(n)
+    )
+    w.payments = Payment.objects.bulk_create(
+        Payment(student=w.profile, amount=Decimal("5000.00")) for _ in range(n)
+    )
+    SpeakingRequest.objects.bulk_create(
+        SpeakingRequest(student=w.profile, fee_amount=Decimal("50000.00"))
+        for _ in range(n)
+    )
+    expires = timezone.now() + timezone.timedelta(minutes=5)
+    w.login_code = VerificationCode.objects.create(
+        telegram_id=w.student.telegram_id,
+        code="111111",
+        purpose=VerificationCode.Purpose.LOGIN,
+        expires_at=expires,
+    )
+    w.new_user = User.objects.create_user(
+        fullname="New", phone_number=f"+99802{n:07d}", role=User.Roles.STUDENT
+    )
+    VerificationCode.objects.create(
+        telegram_id=7_000_000_000 + n,
+        code="222222",
+        purpose=VerificationCode.Purpose.REGISTER,
+        expires_at=expires,
+    )
+    return w
+
+
+def _submission(w, status) -> TeacherSubmission:
+    return next(s for s in w.submissions if s.status == status)
+
+
+def _click_payload(payment: Payment) -> Dict[str, Any]:
+    payload = {
+        "click_trans_id": "1",
+        "service_id": str(settings.CLICK["SERVICE_ID"]),
+        "merchant_trans_id": str(payment.pk),
+        "amount": str(payment.amount),
+        "action": "prepare",
+        "sign_time": "2025-01-01 00:00:00",
+    }
+    raw = "".join(payload.values()) + settings.CLICK["SECRET_KEY"]
+    payload["sign_string"] = hashlib.sha256(raw.encode()).hexdigest()
+    return payload
+
+
+def _today() -> str:
+    return timezone.localdate().isoformat()
+
+
+# URL name -> request against a world built by build_world().
+ENDPOINTS: Dict[str, Callable[[SimpleNamespace], Call]] = {
+    "register-start": lambda w: Call(
+        "POST",
+        reverse("register-start"),
+        data={"fullname": "X", "phone_number": "+998031234567", "role": "student"},
+    ),
+    "register-verify": lambda w: Call(
+        "POST",
+        reverse("register-verify"),
+        data={"user_id": str(w.new_user.pk), "code": "222222"},
+    ),
+    "login-verify": lambda w: Call(
+        "POST", reverse("login-verify"), data={"code": "111111"}
+    ),
+    "otp-ingest": lambda w: Call(
+        "POST",
+        reverse("otp-ingest"),
+        data={
+            "telegram_id": 123,
+            "telegram_username": "bot_user",
+            "code": "333333",
+            "purpose": "login",
+        },
+        extra={"HTTP_X_BOT_TOKEN": "test-token"},
+    ),
+    "otp-status": lambda w: Call(
+        "GET",
+        reverse("otp-status") + f"?telegram_id={w.student.telegram_id}&purpose=login",
+        extra={"HTTP_X_BOT_TOKEN": "test-token"},
+    ),
+    "token-refresh": lambda w: Call(
+        "POST",
+        reverse("token-refresh"),
+        data={"refresh": str(AuthRefreshToken.for_user(w.student))},
+    ),
+    "student-me": lambda w: Call("GET", reverse("student-me"), w.student),
+    "teacher-me": lambda w: Call("GET", reverse("teacher-me"), w.teacher),
+    "student-topups": lambda w: Call("GET", reverse("student-topups"), w.student),
+    "student-topups-export": lambda w: Call(
+        "GET", reverse("student-topups-export") + f"?from={_today()}", w.admin
+    ),
+    "student-approvals": lambda w: Call("GET", reverse("student-approvals"), w.student),
+    "student-dashboard": lambda w: Call("GET", reverse("student-dashboard"), w.student),
+    "teacher-dashboard": lambda w: Call("GET", reverse("teacher-dashboard"), w.teacher),
+    "users-me": lambda w: Call("GET", reverse("users-me"), w.student),
+    "users-list": lambda w: Call("GET", reverse("users-list"), w.admin),
+    "users-detail": lambda w: Call(
+        "GET", reverse("users-detail", args=[w.student.pk]), w.admin
+    ),
+    "users-toggle-status": lambda w: Call(
+        "POST", reverse("users-toggle-status", args=[w.new_user.pk]), w.admin
+    ),
+    "all-tests": lambda w: Call("GET", reverse("all-tests"), w.student),
+    "purchase-test": lambda w: Call(
+        "POST", reverse("purchase-test", args=[w.unowned_test.pk]), w.student
+    ),
+    "cart-quote": lambda w: Call(
+        "POST",
+        reverse("cart-quote"),
+        w.student,
+        {"test_ids": [t.pk for t in w.tests[:9]] + [w.unowned_test.pk]},
+    ),
+    "cart-checkout": lambda w: Call(
+        "POST",
+        reverse("cart-checkout"),
+        w.student,
+        {"test_ids": [t.pk for t in w.tests[:9]] + [w.unowned_test.pk]},
+    ),
+    "my-tests": lambda w: Call("GET", reverse("my-tests"), w.student),
+    "my-results": lambda w: Call("GET", reverse("my-results"), w.student),
+    "results-export": lambda w: Call(
+        "GET", reverse("results-export") + "?fmt=jsonl", w.admin
+    ),
+    "item-stats": lambda w: Call("GET", reverse("item-stats"), w.teacher),
+    "leaderboard": lambda w: Call(
+        "GET", reverse("leaderboard") + f"?test={w.tests[0].pk}&limit=5", w.teacher
+    ),
+    "student-submit-writing": lambda w: Call(
+        "POST",
+        reverse("student-submit-writing"),
+        w.student,
+        {"user_test_id": str(w.user_tests[0].pk), "task": "task1", "text": "y"},
+    ),
+    "all-writing": lambda w: Call("GET", reverse("all-writing"), w.teacher),
+    "my-checking": lambda w: Call("GET", reverse("my-checking"), w.teacher),
+    "my-checked": lambda w: Call("GET", reverse("my-checked"), w.teacher),
+    "claim-writing": lambda w: Call(
+        "POST",
+        reverse("claim-writing"),
+        w.teacher,
+        {"submission_id": str(_submission(w, TeacherSubmission.Status.REQUESTED).pk)},
+    ),
+    "grade-writing": lambda w: Call(
+        "POST",
+        reverse("grade-writing"),
+        w.teacher,
+        {
+            "submission_id": str(
+                _submission(w, TeacherSubmission.Status.IN_CHECKING).pk
+            ),
+            "score": 7,
+        },
+    ),
+    "tests-list": lambda w: Call("GET", reverse("tests-list")),
+    "tests-detail": lambda w: Call(
+        "GET", reverse("tests-detail", args=[w.tests[0].pk])
+    ),
+    "question-sets-list": lambda w: Call("GET", reverse("question-sets-list")),
+    "question-sets-detail": lambda w: Call(
+        "GET",
+        reverse(
+            "question-sets-detail",
+            args=[QuestionSet.objects.values_list("pk", flat=True).first()],
+        ),
+    ),
+    "content-search": lambda w: Call(
+        "GET", reverse("content-search") + "?q=question", w.admin
+    ),
+    "payments:create-topup": lambda w: Call(
+        "POST", reverse("payments:create-topup"), w.student, {"amount": "10000"}
+    ),
+    "payments:payment-status": lambda w: Call(
+        "GET",
+        reverse("payments:payment-status") + f"?payment_id={w.payments[0].pk}",
+        w.student,
+    ),
+    "payments:export": lambda w: Call(
+        "GET",
+        reverse("payments:export") + f"?from={_today()}&to={_today()}",
+        w.admin,
+    ),
+    "payments:click-webhook": lambda w: Call(
+        "POST",
+        reverse("payments:click-webhook"),
+        data=_click_payload(w.payments[0]),
+        extra={"REMOTE_ADDR": "91.204.239.44"},
+    ),
+    "speaking-request": lambda w: Call("POST", reverse("speaking-request"), w.student),
+    "speaking-my-requests": lambda w: Call(
+        "GET", reverse("speaking-my-requests"), w.student
+    ),
+}
+
+
+def _api_url_names(resolver=None, prefix="", namespace=""):
+    resolver = resolver or get_resolver()
+    for p in resolver.url_patterns:
+        route = prefix + str(p.pattern)
+        if isinstance(p, URLResolver):
+            ns = f"{namespace}{p.namespace}:" if p.namespace else namespace
+            yield from _api_url_names(p, route, ns)
+        elif (
+            isinstance(p, URLPattern)
+            and p.name
+            and route.lstrip("^").startswith("api/")
+        ):
+            yield namespace + p.name
+
+
+@override_settings(TELEGRAM_BOT_TOKEN="", TELEGRAM_BOT_INGEST_TOKEN="test-token")
+class QueryBudgetTests(TestCase):
+    def test_every_api_view_has_a_budget(self):
+        names = set(_api_url_names()) - EXEMPT
+        self.assertEqual(names - set(QUERY_BUDGETS), set())
+        self.assertEqual(set(QUERY_BUDGETS) - names, set())
+        self.assertEqual(set(ENDPOINTS), set(QUERY_BUDGETS))
+
+    def _profile(self, name: str, n: int) -> RequestProfile:
+        with transaction.atomic():
+            call = ENDPOINTS[name](build_world(n))
+            cache.clear()  # throttling state
+            revocation.store().loaded.wait(5)  # in-memory, as in a warm worker
+            client = APIClient()
+            if call.user is not None:
+                # issued after the clear, like a login: auth state is cached
+                token = AuthRefreshToken.for_user(call.user).access_token
+                client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            profile = RequestProfile()
+            with connection.execute_wrapper(profile):
+                response = client.generic(
+                    call.method,
+                    call.path,
+                    data=json.dumps(call.data or {}),
+                    content_type="application/json",
+                    **call.extra,
+                )
+                # exports run their query while streaming
+                body = (
+                    b"".join(response.streaming_content)
+                    if response.streaming
+                    else response.content
+                )
+            self.assertIn(response.status_code, call.ok, f"{name}: {body}")
+            transaction.set_rollback(True)
+        return profile
+
+    def test_query_budgets(self):
+        for name, budget in QUERY_BUDGETS.items():
+            with self.subTest(name):
+                small = self._profile(name, N)
+                large = self._profile(name, N * SCALE)
+                # repeated statements are the usual N+1 suspects
+                hint = "; ".join(f"{c}x {sql[:120]}" for sql, c in large.duplicates(2))
+                self.assertLessEqual(small.queries, budget.queries, f"{name} at N")
+                self.assertLessEqual(large.queries, budget.max_10x, hint)
+                if budget.queries_10x is None:
+                    self.assertEqual(large.queries, small.queries, hint)
+
+
+class CsvExportTests(TestCase):
+    def _csv(self, *rows) -> str:
+        return "".join(_csv_rows(["phone_number", "amount"], rows)).lstrip("\ufeff")
+
+    def test_formula_cells_are_escaped(self):
+        lines = self._csv(("=1+2", "@SUM(A1)"), ("-x", "+y"), ("\t=cmd", "\rx")).split(
+            "\r\n"
+        )
+        self.assertEqual(lines[1], "'=1+2,'@SUM(A1)")
+        self.assertEqual(lines[2], "'-x,'+y")
+        self.assertEqual(lines[3], "'\t=cmd,\"'\rx\"")
+
+    def test_numbers_and_phones_are_kept(self):
+        lines = self._csv(("+998901234567", "-5.00"), ("-12", Decimal("-3"))).split(
+            "\r\n"
+        )
+        self.assertEqual(lines[1:], ["+998901234567,-5.00", "-12,-3", ""])
+
+    def test_export_reads_back_as_topup_sheet(self):
+        student = _user(User.Roles.STUDENT)
+        sheet = bulk.read_topup_csv(
+            io.StringIO(self._csv((student.phone_number, Decimal("5000.00"))))
+        )
+        self.assertEqual(sheet.errors, [])
+        self.assertEqual(
+            sheet.amounts, {str(student.student_profile.pk): Decimal("5000.00")}
+        )
+
+
+@override_settings(ADMIN_PAGINATION={"ESTIMATE_THRESHOLD": 0})
+class EstimatedCountTests(TestCase):
+    def test_only_plain_indexed_filters_are_estimated(self):
+        payments = Payment.objects.all()
+        since = timezone.now() - timedelta(days=7)
+        for qs in (
+            payments.filter(status="paid"),
+            payments.filter(status__in=["paid", "failed"], created_at__gte=since),
+        ):
+            self.assertIsNotNone(estimate_count(qs), qs.query)
+        for qs in (
+            payments.filter(provider="click"),  # no index
+            payments.filter(student__user__fullname="x"),  # joined table
+            payments.exclude(status="paid"),
+            # what the admin search builds
+            payments.filter(
+                Q(provider_txn_id__icontains="7") | Q(student__user__fullname="7")
+            ),
+        ):
+            self.assertIsNone(estimate_count(qs), qs.query)
+
+    def test_paginator_counts_searches_exactly(self):
+        student = _user(User.Roles.STUDENT).student_profile
+        Payment.objects.create(
+            student=student, amount=Decimal("1000.00"), provider_txn_id="1777"
+        )
+        searched = Payment.objects.filter(provider_txn_id__icontains="77")
+        self.assertEqual(EstimatedCountPaginator(searched, 20).count, 1)
+        filtered = Payment.objects.filter(status="paid")
+        self.assertEqual(
+            EstimatedCountPaginator(filtered, 20).count, estimate_count(filtered)
+        )
+
+
+class _RolePermission(BasePermission):
+    # reads the view, like most object-level permissions in the apps
+    def has_permission(self, request, view):
+        return getattr(request.user, "role", None) == view.role
+
+    def has_object_permission(self, request, view, obj):
+        return obj == request.user
+
+
+class _WhoAmIView(AsyncAPIView):
+    permission_classes = [_RolePermission]
+    role = User.Roles.STUDENT
+
+    async def get(self, request, pk):
+        user = await User.objects.aget(pk=pk)
+        await self.acheck_object_permissions(request, user)
+        return Response({"user": str(request.user.pk), "auth": bool(request.auth)})
+
+
+class AsyncAPIViewTests(TestCase):
+    def setUp(self):
+        self.student = _user(User.Roles.STUDENT)
+        self.teacher = _user(User.Roles.TEACHER)
+        self.view = _WhoAmIView.as_view()
+        self.tokens = {
+            u.pk: AuthRefreshToken.for_user(u).access_token
+            for u in (self.student, self.teacher)
+        }
+
+    def _get(self, user, pk):
+        request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {self.tokens[user.pk]}"
+        )
+        return self.view(request, pk=pk)
+
+    async def test_runs_drf_auth_and_permissions(self):
+        response = await self._get(self.student, self.student.pk)
+        response.render()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            json.loads(response.content), {"user": str(self.student.pk), "auth": True}
+        )
+
+        response = await self._get(self.teacher, self.teacher.pk)
+        self.assertEqual(response.status_code, 403)  # has_permission(view)
+        response = await self._get(self.student, self.teacher.pk)
+        self.assertEqual(response.status_code, 403)  # has_object_permission
+        response = await self.view(APIRequestFactory().get("/"), pk=self.student.pk)
+        self.assertEqual(response.status_code, 401)
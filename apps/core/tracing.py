@@ -0,0 +1,284 @@
+# apps/core/tracing.py
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from apps.core import dbhooks
+from apps.core.profiling import fingerprint
+
+log = logging.getLogger(__name__)
+
+# W3C Trace Context: "00-<trace_id:32 hex>-<parent span_id:16 hex>-<flags>".
+# The bot sends it with every backend call, so bot, API and Telegram spans of
+# one OTP/speaking flow share a trace_id.
+TRACEPARENT_HEADER = "traceparent"
+_traceparent_re = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+@dataclass
+class Span:
+    trace_id: str
+    name: str
+    kind: str = "internal"  # server | client | db | internal
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    parent_id: Optional[str] = None
+    service: str = "backend"
+    start: float = field(default_factory=time.time)
+    duration_ms: float = 0.0
+    status: str = "ok"
+    attrs: dict = field(default_factory=dict)
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+
+    def child(self, name: str, kind: str = "internal", **attrs) -> "Span":
+        return Span(
+            trace_id=self.trace_id,
+            parent_id=self.span_id,
+            name=name,
+            kind=kind,
+            service=self.service,
+            attrs=attrs,
+        )
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.duration_ms = round((time.perf_counter() - self._t0) * 1000, 3)
+        if error is not None:
+            self.status = "error"
+            self.attrs["error"] = f"{type(error).__name__}: {error}"[:300]
+        _export(self)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("_t0")
+        return data
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def parse_traceparent(value: str):
+    """Returns (trace_id, parent_span_id, sampled) or None."""
+    m = _traceparent_re.match((value or "").strip().lower())
+    if not m or m.group(1) == "0" * 32:
+        return None
+    return m.group(1), m.group(2), int(m.group(3), 16) & 1 == 1
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attrs):
+    """
+    Child span of the current one. Outside a sampled trace it is a no-op and
+    yields None, so call sites don't need to check whether tracing is on.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    sp = parent.child(name, kind, **attrs)
+    token = _current.set(sp)
+    try:
+        yield sp
+    except BaseException as e:
+        _current.reset(token)
+        sp.finish(e)
+        raise
+    _current.reset(token)
+    sp.finish()
+
+
+def inject(headers: dict) -> dict:
+    """Adds traceparent of the current span to outgoing request headers."""
+    sp = _current.get()
+    if sp is not None:
+        headers[TRACEPARENT_HEADER] = sp.traceparent
+    return headers
+
+
+# ------------------------------------------------------------------ exporters
+
+
+class _Exporter:
+    """
+    Spans are put on a bounded queue by request threads and written in
+    batches by a daemon thread: JSON lines to TRACING["FILE"] and/or a POST
+    of the batch to TRACING["ENDPOINT"] (collector).
+    """
+
+    def __init__(self, path: str = "", endpoint: str = "", maxsize: int = 10000):
+        self.path = path
+        self.endpoint = endpoint
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.dropped = 0
+        self._thread = threading.Thread(
+            target=self._run, name="trace-exporter", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def put(self, data: dict) -> None:
+        try:
+            self.queue.put_nowait(data)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < 512:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write(batch)
+                    return
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: list) -> None:
+        try:
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as fh:
+                    for data in batch:
+                        fh.write(json.dumps(data, ensure_ascii=False, default=str))
+                        fh.write("\n")
+            if self.endpoint:
+                import httpx
+
+                httpx.post(self.endpoint, json={"spans": batch}, timeout=2.0)
+        except Exception as e:  # noqa
+            log.warning("Trace export failed (%d spans): %s", len(batch), e)
+
+    def shutdown(self) -> None:
+        if self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join(timeout=5)
+
+
+_exporter: Optional[_Exporter] = None
+_exporter_lock = threading.Lock()
+
+
+def _export(sp: Span) -> None:
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                cfg = settings.TRACING
+                _exporter = _Exporter(cfg.get("FILE", ""), cfg.get("ENDPOINT", ""))
+    _exporter.put(sp.to_dict())
+
+
+# ----------------------------------------------------------------- middleware
+
+
+def _trace_query(execute, sql, params, many, context):
+    with span("db", kind="db", statement=fingerprint(sql)[:500], many=many):
+        return execute(sql, params, many, context)
+
+
+class TracingMiddleware:
+    """
+    Server span per request (continues the caller's trace from traceparent)
+    with a child span per SQL query. Configured by settings.TRACING.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        cfg = settings.TRACING
+        if not cfg.get("ENABLED"):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = cfg.get("SAMPLE_RATE", 1.0)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _start(self, request) -> Optional[Span]:
+        parent = parse_traceparent(request.headers.get(TRACEPARENT_HEADER, ""))
+        if parent:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+            sampled = random.random() < self.sample_rate
+        if not sampled:
+            return None
+        return Span(
+            trace_id=trace_id,
+            parent_id=parent_id,
+            name=f"{request.method} {request.path}",
+            kind="server",
+            attrs={"http.method": request.method, "http.path": request.path},
+        )
+
+    @staticmethod
+    def _finish(sp: Span, request, response) -> None:
+        match = getattr(request, "resolver_match", None)
+        if match and match.view_name:
+            sp.name = f"{request.method} {match.view_name}"
+        sp.attrs["http.status"] = response.status_code
+        if response.status_code >= 500:
+            sp.status = "error"
+        sp.finish()
+        response[TRACEPARENT_HEADER] = sp.traceparent
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sp = self._start(request)
+        if sp is None:
+            return self.get_response(request)
+        token = _current.set(sp)
+        try:
+            with dbhooks.execute_wrapper(_trace_query):
+                response = self.get_response(request)
+        except BaseException as e:
+            sp.finish(e)
+            raise
+        finally:
+            _current.reset(token)
+        self._finish(sp, request, response)
+        return response
+
+    async def __acall__(self, request):
+        sp = self._start(request)
+        if sp is None:
+            return await self.get_response(request)
+        token = _current.set(sp)
+        try:
+            with dbhooks.execute_wrapper(_trace_query):
+                response = await self.get_response(request)
+        except BaseException as e:
+            sp.finish(e)
+            raise
+        finally:
+            _current.reset(token)
+        self._finish(sp, request, response)
+        return response
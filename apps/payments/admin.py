@@ -4,6 +4,7 @@ from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
 from .models import Payment
+from .serializers import PAYMENT_EXPORT
 
 
 @admin.register(Payment)
@@ -43,6 +44,7 @@ class PaymentAdmin(admin.ModelAdmin):
     raw_id_fields = ("student",)
     list_per_page = 30
     ordering = ("-created_at",)
+    actions = PAYMENT_EXPORT.admin_actions()
 
     fieldsets = (
         (
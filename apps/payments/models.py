@@ -1,9 +1,9 @@
 # apps/payments/models.py
-import uuid
 
 from django.db import models
 from django.utils import timezone
 
+from apps.core.ids import uuid7
 from apps.profiles.models import StudentProfile
 
 
@@ -20,7 +20,7 @@ class PaymentStatus(models.TextChoices):
 
 
 class Payment(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     student = models.ForeignKey(
         StudentProfile, on_delete=models.CASCADE, related_name="payments"
@@ -2,6 +2,8 @@
 from django.conf import settings
 from rest_framework import serializers
 
+from apps.core.exports import Export
+
 from .models import Payment, PaymentStatus
 
 
@@ -46,7 +48,7 @@ class PaymentPublicSerializer(serializers.ModelSerializer):
 
 class PaymentDetailSerializer(serializers.ModelSerializer):
 
-    student = serializers.UUIDField(source="student.id", read_only=True)
+    student = serializers.UUIDField(source="student_id", read_only=True)
     is_paid = serializers.SerializerMethodField(
         help_text="To‘lov muvaffaqiyatli yakunlangani (true/false)"
     )
@@ -70,3 +72,23 @@ class PaymentDetailSerializer(serializers.ModelSerializer):
             "completed_at",
         ]
         read_only_fields = fields
+
+
+PAYMENT_EXPORT = Export(
+    "payments",
+    (
+        ("id", "id"),
+        ("student_id", "student_id"),
+        ("fullname", "student__user__fullname"),
+        ("phone_number", "student__user__phone_number"),
+        ("provider", "provider"),
+        ("status", "status"),
+        ("amount", "amount"),
+        ("currency", "currency"),
+        ("provider_invoice_id", "provider_invoice_id"),
+        ("provider_txn_id", "provider_txn_id"),
+        ("error_code", "error_code"),
+        ("created_at", "created_at"),
+        ("completed_at", "completed_at"),
+    ),
+)
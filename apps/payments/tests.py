@@ -1,3 +1,115 @@
+# apps/payments/tests.py
+import hashlib
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.profiles.models import StudentTopUpLog
+from apps.users.models import User
+from .models import Payment, PaymentStatus
+
+CLICK_IP = settings.CLICK["ALLOWED_IPS"][0]
+
+
+def _signed(payment: Payment, action: str, **extra) -> dict:
+    payload = {
+        "click_trans_id": "1",
+        "service_id": str(settings.CLICK["SERVICE_ID"]),
+        "merchant_trans_id": str(payment.pk),
+        "amount": str(payment.amount),
+        "action": action,
+        "sign_time": "2025-01-01 00:00:00",
+    }
+    raw = "".join(payload.values()) + settings.CLICK["SECRET_KEY"]
+    payload["sign_string"] = hashlib.sha256(raw.encode()).hexdigest()
+    return {**payload, **extra}
+
+
+class ClickWebhookTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(
+            fullname="student", phone_number="+998070000001", role=User.Roles.STUDENT
+        )
+        self.student = user.student_profile
+        self.payment = Payment.objects.create(
+            student=self.student, amount=Decimal("50000.00")
+        )
+        # Click sends no credentials
+        self.client = APIClient()
+
+    def _post(self, payload: dict, ip: str = CLICK_IP):
+        return self.client.post(
+            reverse("payments:click-webhook"),
+            payload,
+            format="json",
+            REMOTE_ADDR=ip,
+        )
+
+    def _balance(self) -> Decimal:
+        self.student.refresh_from_db(fields=["balance"])
+        return self.student.balance
+
+    def test_prepare_marks_pending(self):
+        response = self._post(_signed(self.payment, "prepare"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], "pending")
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, PaymentStatus.PENDING)
+        self.assertEqual(self.payment.provider_txn_id, "1")
+
+    def test_complete_tops_up_once(self):
+        self._post(_signed(self.payment, "prepare"))
+        for _ in range(2):  # Click retries a callback it got no answer for
+            response = self._post(_signed(self.payment, "complete", error="0"))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["status"], "paid")
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, PaymentStatus.PAID)
+        self.assertIsNotNone(self.payment.completed_at)
+        self.assertEqual(self._balance(), Decimal("50000.00"))
+        self.assertEqual(
+            StudentTopUpLog.objects.filter(student=self.student).count(), 1
+        )
+
+    def test_complete_with_provider_error_fails(self):
+        response = self._post(
+            _signed(self.payment, "complete", error="-5017", error_note="no funds")
+        )
+        self.assertEqual(response.data["status"], "failed")
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, PaymentStatus.FAILED)
+        self.assertEqual(self.payment.error_code, "-5017")
+        self.assertEqual(self._balance(), Decimal("0.00"))
+
+    def test_failed_top_up_marks_the_payment_failed(self):
+        with mock.patch(
+            "apps.payments.views.svc_mark_payment_paid_and_topup",
+            side_effect=RuntimeError("db down"),
+        ):
+            response = self._post(_signed(self.payment, "complete", error="0"))
+        self.assertEqual(response.status_code, 500)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, PaymentStatus.FAILED)
+
+    def test_bad_signature_is_rejected(self):
+        payload = _signed(self.payment, "complete", error="0")
+        payload["amount"] = "5000000.00"  # the signature covers the amount
+        response = self._post(payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"error": "Invalid signature"})
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, PaymentStatus.CREATED)
+        self.assertEqual(self._balance(), Decimal("0.00"))
 
-# Create your tests here.
+    def test_unknown_ip_is_rejected(self):
+        response = self._post(
+            _signed(self.payment, "complete", error="0"), ip="203.0.113.7"
+        )
+        self.assertEqual(response.status_code, 403)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, PaymentStatus.CREATED)
+        self.assertEqual(self._balance(), Decimal("0.00"))
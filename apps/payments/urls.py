@@ -7,6 +7,7 @@ app_name = "payments"
 
 urlpatterns = [
     path("topup/", views.create_topup, name="create-topup"),
-    path("status/", views.payment_status, name="payment-status"),
+    path("status/", views.PaymentStatusView.as_view(), name="payment-status"),
+    path("export/", views.export_payments, name="export"),
     path("click/webhook/", views.click_webhook, name="click-webhook"),
 ]
@@ -6,21 +6,31 @@ import logging
 from uuid import UUID
 
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import permissions, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
 from rest_framework.response import Response
 
+from apps.core.async_views import AsyncAPIView
+from apps.core.exports import export_schema
 from apps.profiles.models import StudentProfile
+from apps.users.permissions import IsSuperAdmin
 from .models import Payment, PaymentStatus, PaymentProvider
 from .serializers import (
     PaymentCreateSerializer,
     PaymentPublicSerializer,
     PaymentDetailSerializer,
+    PAYMENT_EXPORT,
 )
 
 log = logging.getLogger(__name__)
@@ -136,6 +146,9 @@ def create_topup(request):
 )
 @csrf_exempt
 @api_view(["POST"])
+# Click sends no credentials: requests are checked by IP and signature below
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
 def click_webhook(request):
     allowed_ips = set(settings.CLICK.get("ALLOWED_IPS", []))
     remote_ip = request.META.get("REMOTE_ADDR", "")
@@ -147,7 +160,11 @@ def click_webhook(request):
     payload = request.data.copy()
 
     if not verify_click_request(payload):
-        log.warning("❌ Click webhook invalid signature: %s", payload)
+        log.warning(
+            "❌ Click webhook invalid signature: txn=%s action=%s",
+            payload.get("merchant_trans_id"),
+            payload.get("action"),
+        )
         return Response(
             {"error": "Invalid signature"}, status=status.HTTP_400_BAD_REQUEST
         )
@@ -197,15 +214,20 @@ def click_webhook(request):
         if action in {"complete", "pay"}:
             if error != "0":
                 svc_mark_payment_failed(
-                    payment, payload, error_code=error, error_note=error_note  # noqa
-                )  # noqa
+                    payment=payment,
+                    webhook_payload=payload,
+                    error_code=error,
+                    error_note=error_note,
+                )
                 return Response({"status": "failed", "payment_id": str(payment.id)})
 
             try:
-                svc_mark_payment_paid_and_topup(payment, payload)
+                svc_mark_payment_paid_and_topup(
+                    payment=payment, webhook_payload=payload
+                )
             except Exception as exc:
                 log.exception("❌ Top-up failed for payment %s: %s", payment.id, exc)
-                svc_mark_payment_failed(payment, payload)  # noqa
+                svc_mark_payment_failed(payment=payment, webhook_payload=payload)
                 return Response(
                     {"error": "Top-up failed"},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -246,9 +268,26 @@ def click_webhook(request):
     ],
     responses={200: PaymentDetailSerializer},
 )
+class PaymentStatusView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    async def get(self, request, *args, **kwargs):
+        # Frontend polls this while the user is on the Click page.
+        pid = request.query_params.get("payment_id")
+        try:
+            payment = await Payment.objects.filter(
+                id=pid, student__user=request.user
+            ).afirst()
+        except ValidationError:  # not a UUID
+            payment = None
+        if payment is None:
+            raise Http404
+        await self.acheck_object_permissions(request, payment)
+        return Response(PaymentDetailSerializer(payment).data)
+
+
+@export_schema("Payments", "To‘lovlar eksporti (CSV / JSONL, superadmin)")
 @api_view(["GET"])
-@permission_classes([permissions.IsAuthenticated])
-def payment_status(request):
-    pid = request.query_params.get("payment_id")
-    payment = get_object_or_404(Payment, id=pid, student__user=request.user)
-    return Response(PaymentDetailSerializer(payment).data)
+@permission_classes([permissions.IsAuthenticated, IsSuperAdmin])
+def export_payments(request):
+    return PAYMENT_EXPORT.view_response(request, Payment.objects.all())
@@ -1,18 +1,28 @@
 # apps/profiles/admin.py
 from __future__ import annotations
 
+import io
+import logging
 from decimal import Decimal
 
+from django import forms
 from django.contrib import admin, messages
-from django.db import transaction
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.timezone import localtime
 
+from . import bulk
 from .models import (
     StudentProfile,
     TeacherProfile,
     StudentApprovalLog,
     StudentTopUpLog,
 )
+from .serializers import TOPUP_EXPORT
+
+logger = logging.getLogger(__name__)
 
 
 class StudentApprovalLogInline(admin.TabularInline):
@@ -41,8 +51,17 @@ class StudentTopUpLogInline(admin.TabularInline):
         return False
 
 
+class TopUpCsvForm(forms.Form):
+    file = forms.FileField(
+        help_text="Columns: amount and phone_number (or student_id). "
+        "Nothing is applied if any row is invalid."
+    )
+    note = forms.CharField(max_length=255, required=False)
+
+
 @admin.register(StudentProfile)
 class StudentProfileAdmin(admin.ModelAdmin):
+    change_list_template = "admin/profiles/studentprofile/change_list.html"
     inlines = [StudentApprovalLogInline, StudentTopUpLogInline]
 
     list_display = (
@@ -109,60 +128,47 @@ class StudentProfileAdmin(admin.ModelAdmin):
     def created_local(self, obj: StudentProfile) -> str:
         return localtime(obj.created_at).strftime("%Y-%m-%d %H:%M")
 
+    @staticmethod
+    def _progress(label: str):
+        def report(done: int, total: int):
+            if done < total:  # the final count goes into the result message
+                logger.info("%s: %d/%d students", label, done, total)
+
+        return report
+
     @admin.action(description="Approve selected students")
     def approve_selected(self, request, queryset):
-        updated = 0
-        with transaction.atomic():
-            for sp in queryset.select_for_update():
-                if not sp.is_approved:
-                    sp.is_approved = True
-                    sp.save(update_fields=["is_approved", "type", "updated_at"])
-                    StudentApprovalLog.objects.create(
-                        student=sp,
-                        approved=True,
-                        actor=request.user,
-                        note="Admin approve",
-                    )
-                    updated += 1
+        updated = bulk.set_approval(
+            queryset.values_list("pk", flat=True),
+            True,
+            actor=request.user,
+            note="Admin approve",
+            progress=self._progress("approve"),
+        )
         self.message_user(
             request, f"{updated} student(s) approved.", level=messages.SUCCESS
         )
 
     @admin.action(description="Disapprove selected students")
     def disapprove_selected(self, request, queryset):
-        updated = 0
-        with transaction.atomic():
-            for sp in queryset.select_for_update():
-                if sp.is_approved:
-                    sp.is_approved = False
-                    sp.save(update_fields=["is_approved", "type", "updated_at"])
-                    StudentApprovalLog.objects.create(
-                        student=sp,
-                        approved=False,
-                        actor=request.user,
-                        note="Admin disapprove",
-                    )
-                    updated += 1
+        updated = bulk.set_approval(
+            queryset.values_list("pk", flat=True),
+            False,
+            actor=request.user,
+            note="Admin disapprove",
+            progress=self._progress("disapprove"),
+        )
         self.message_user(
             request, f"{updated} student(s) disapproved.", level=messages.WARNING
         )
 
     def _bulk_topup(self, request, queryset, amount: Decimal):
-        updated = 0
-        with transaction.atomic():
-            for sp in queryset.select_for_update():
-                old = sp.balance
-                new_balance = (old + amount).quantize(Decimal("0.01"))
-                sp.balance = new_balance
-                sp.save(update_fields=["balance", "updated_at"])
-                StudentTopUpLog.objects.create(
-                    student=sp,
-                    amount=amount,
-                    new_balance=new_balance,
-                    actor=request.user,
-                    note=f"Admin bulk topup +{amount}",
-                )
-                updated += 1
+        updated = bulk.top_up(
+            {pk: amount for pk in queryset.values_list("pk", flat=True)},
+            actor=request.user,
+            note=f"Admin bulk topup +{amount}",
+            progress=self._progress("topup"),
+        )
         self.message_user(
             request,
             f"Topped up {updated} student(s) by {amount} UZS.",
@@ -177,6 +183,53 @@ class StudentProfileAdmin(admin.ModelAdmin):
     def topup_100k(self, request, queryset):
         self._bulk_topup(request, queryset, Decimal("100000.00"))
 
+    def get_urls(self):
+        urls = super().get_urls()
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path(
+                "topup-csv/",
+                self.admin_site.admin_view(self.topup_csv_view),
+                name="%s_%s_topup_csv" % info,
+            ),
+        ] + urls
+
+    def topup_csv_view(self, request):
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        form = TopUpCsvForm(request.POST or None, request.FILES or None)
+        errors = []
+        if request.method == "POST" and form.is_valid():
+            upload = io.TextIOWrapper(form.cleaned_data["file"], encoding="utf-8-sig")
+            sheet = bulk.read_topup_csv(upload)
+            errors = sheet.errors
+            if not errors:
+                note = form.cleaned_data["note"] or "Admin CSV topup"
+                updated = bulk.top_up(
+                    sheet.amounts,
+                    actor=request.user,
+                    note=note,
+                    progress=self._progress("csv topup"),
+                )
+                self.message_user(
+                    request,
+                    f"Topped up {updated} student(s) from {sheet.rows} row(s), "
+                    f"{sheet.total} UZS in total.",
+                    level=messages.SUCCESS,
+                )
+                return redirect("admin:profiles_studentprofile_changelist")
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Top up balances from CSV",
+            "form": form,
+            "errors": errors[:100],
+            "more_errors": max(len(errors) - 100, 0),
+        }
+        return TemplateResponse(
+            request, "admin/profiles/studentprofile/topup_csv.html", context
+        )
+
     actions = ("approve_selected", "disapprove_selected", "topup_50k", "topup_100k")
 
 
@@ -309,6 +362,7 @@ class StudentTopUpLogAdmin(admin.ModelAdmin):
         "updated_at",
     )
     date_hierarchy = "created_at"
+    actions = TOPUP_EXPORT.admin_actions()
 
     def get_queryset(self, request):
         return (
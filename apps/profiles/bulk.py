@@ -0,0 +1,219 @@
+# apps/profiles/bulk.py
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Dict, Iterable, List, Optional, TextIO
+from uuid import UUID
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.users.models import User
+from .models import StudentApprovalLog, StudentProfile, StudentTopUpLog
+
+# Set-based admin operations on many students: one UPDATE ... RETURNING and
+# one bulk_create of the log rows per chunk. `progress(done, total)` is
+# called after every chunk.
+#
+# set_approval commits chunk by chunk: re-running it after a failure only
+# touches the rows not yet in the target state. A top-up is not idempotent,
+# so top_up runs all of its chunks in one transaction: a failed upload
+# applies nothing and can simply be uploaded again.
+
+CHUNK_SIZE = 500
+
+Progress = Callable[[int, int], None]
+
+# type is derived from is_approved (studprof_type_matches_approval), so it is
+# set in the same statement; rows already in the target state are skipped
+# and get no log entry.
+_APPROVAL_SQL = """
+UPDATE {profiles}
+SET is_approved = %(approved)s,
+    type = CASE WHEN %(approved)s THEN %(offline)s ELSE %(online)s END,
+    updated_at = %(now)s
+WHERE id = ANY(%(ids)s::uuid[]) AND is_approved <> %(approved)s
+RETURNING id
+"""
+
+_TOPUP_SQL = """
+UPDATE {profiles} AS sp
+SET balance = sp.balance + v.amount, updated_at = %(now)s
+FROM unnest(%(ids)s::uuid[], %(amounts)s::numeric[]) AS v(id, amount)
+WHERE sp.id = v.id
+RETURNING sp.id, v.amount, sp.balance
+"""
+
+
+def _chunks(items: List, size: int):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def set_approval(
+    student_ids: Iterable,
+    approved: bool,
+    *,
+    actor: Optional[User] = None,
+    note: str = "",
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[Progress] = None,
+) -> int:
+    """Approves (or unapproves) students; returns how many changed."""
+    # sorted: concurrent bulk writes lock profile rows in the same order
+    ids = sorted({str(pk) for pk in student_ids})
+    sql = _APPROVAL_SQL.format(
+        profiles=connection.ops.quote_name(StudentProfile._meta.db_table)
+    )
+    changed = done = 0
+    for chunk in _chunks(ids, chunk_size):
+        now = timezone.now()
+        with transaction.atomic(), connection.cursor() as cur:
+            cur.execute(
+                sql,
+                {
+                    "approved": approved,
+                    "offline": StudentProfile.TYPE_OFFLINE,
+                    "online": StudentProfile.TYPE_ONLINE,
+                    "now": now,
+                    "ids": chunk,
+                },
+            )
+            rows = cur.fetchall()
+            StudentApprovalLog.objects.bulk_create(
+                StudentApprovalLog(
+                    student_id=pk,
+                    approved=approved,
+                    actor=actor,
+                    note=note,
+                    created_at=now,
+                )
+                for (pk,) in rows
+            )
+        changed += len(rows)
+        done += len(chunk)
+        if progress:
+            progress(done, len(ids))
+    return changed
+
+
+def top_up(
+    amounts: Dict,
+    *,
+    actor: Optional[User] = None,
+    note: str = "",
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[Progress] = None,
+) -> int:
+    """
+    Adds amounts[student_id] to each balance, all or nothing; returns the
+    number of students topped up.
+    """
+    items = sorted((str(pk), amount) for pk, amount in amounts.items())
+    sql = _TOPUP_SQL.format(
+        profiles=connection.ops.quote_name(StudentProfile._meta.db_table)
+    )
+    updated = done = 0
+    with transaction.atomic():
+        for chunk in _chunks(items, chunk_size):
+            now = timezone.now()
+            with connection.cursor() as cur:
+                cur.execute(
+                    sql,
+                    {
+                        "now": now,
+                        "ids": [pk for pk, _ in chunk],
+                        "amounts": [amount for _, amount in chunk],
+                    },
+                )
+                rows = cur.fetchall()
+            StudentTopUpLog.objects.bulk_create(
+                StudentTopUpLog(
+                    student_id=pk,
+                    amount=amount,
+                    new_balance=balance,
+                    actor=actor,
+                    note=note,
+                    created_at=now,
+                )
+                for pk, amount, balance in rows
+            )
+            updated += len(rows)
+            done += len(chunk)
+            if progress:
+                progress(done, len(items))
+    return updated
+
+
+# ---------------------------------------------------------------- CSV top-up
+
+
+@dataclass
+class TopUpSheet:
+    amounts: Dict[str, Decimal] = field(default_factory=dict)  # profile id -> sum
+    rows: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def total(self) -> Decimal:
+        return sum(self.amounts.values(), Decimal("0.00"))
+
+
+def read_topup_csv(fh: TextIO) -> TopUpSheet:
+    """
+    Reads a CSV with an `amount` column and either `phone_number` or
+    `student_id` (StudentProfile id). Amounts of repeated students are
+    summed. Phone numbers are resolved with one query; every problem is
+    reported as "line N: ..." and nothing should be applied if there is any.
+    """
+    sheet = TopUpSheet()
+    reader = csv.DictReader(fh)
+    columns = set(reader.fieldnames or ())
+    key = next((c for c in ("student_id", "phone_number") if c in columns), None)
+    if key is None or "amount" not in columns:
+        sheet.errors.append("header: need `amount` and `phone_number` or `student_id`")
+        return sheet
+
+    parsed = []  # (line, identifier, amount)
+    for line, row in enumerate(reader, start=2):
+        sheet.rows += 1
+        ident = (row.get(key) or "").strip().replace(" ", "").replace("-", "")
+        try:
+            amount = Decimal((row.get("amount") or "").strip().replace(" ", ""))
+        except InvalidOperation:
+            sheet.errors.append(f"line {line}: invalid amount {row.get('amount')!r}")
+            continue
+        if not amount.is_finite() or amount <= 0:
+            sheet.errors.append(f"line {line}: amount must be positive")
+            continue
+        if key == "student_id":
+            try:
+                ident = str(UUID(ident))
+            except ValueError:
+                sheet.errors.append(f"line {line}: invalid student_id {ident!r}")
+                continue
+        else:
+            try:
+                ident = User.objects._normalize_phone(ident)  # noqa
+            except ValidationError:
+                sheet.errors.append(f"line {line}: invalid phone {ident!r}")
+                continue
+        parsed.append((line, ident, amount.quantize(Decimal("0.01"))))
+
+    lookup = "id" if key == "student_id" else "user__phone_number"
+    known = dict(
+        StudentProfile.objects.filter(
+            **{f"{lookup}__in": {ident for _, ident, _ in parsed}}
+        ).values_list(lookup, "id")
+    )
+    for line, ident, amount in parsed:
+        pk = known.get(ident) if key == "phone_number" else known.get(UUID(ident))
+        if pk is None:
+            sheet.errors.append(f"line {line}: no student {ident}")
+            continue
+        pk = str(pk)
+        sheet.amounts[pk] = sheet.amounts.get(pk, Decimal("0.00")) + amount
+    return sheet
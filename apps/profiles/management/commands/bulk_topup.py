@@ -0,0 +1,57 @@
+# apps/profiles/management/commands/bulk_topup.py
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.profiles import bulk
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Top up student balances from a CSV (columns: amount and phone_number "
+        "or student_id). Nothing is applied if any row is invalid."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv", help="Path to the CSV file.")
+        parser.add_argument("--note", default="CSV topup")
+        parser.add_argument(
+            "--actor", help="Phone number of the admin recorded in the logs."
+        )
+        parser.add_argument("--chunk-size", type=int, default=bulk.CHUNK_SIZE)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only validate the file and print the totals.",
+        )
+
+    def handle(self, *args, **opts):
+        actor = None
+        if opts["actor"]:
+            actor = User.objects.filter(phone_number=opts["actor"]).first()
+            if actor is None:
+                raise CommandError(f"No user with phone {opts['actor']}")
+
+        with open(opts["csv"], encoding="utf-8-sig", newline="") as fh:
+            sheet = bulk.read_topup_csv(fh)
+        for error in sheet.errors:
+            self.stderr.write(error)
+        if sheet.errors:
+            raise CommandError(f"{len(sheet.errors)} invalid row(s), nothing applied.")
+        self.stdout.write(
+            f"{sheet.rows} row(s), {len(sheet.amounts)} student(s), "
+            f"{sheet.total} UZS in total"
+        )
+        if opts["dry_run"]:
+            return
+
+        def progress(done, total):
+            self.stdout.write(f"  {done}/{total}")
+
+        updated = bulk.top_up(
+            sheet.amounts,
+            actor=actor,
+            note=opts["note"],
+            chunk_size=max(opts["chunk_size"], 1),
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Topped up {updated} student(s)."))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="studenttopuplog",
+            index=models.Index(
+                fields=["student", "created_at"], name="studtopuplog_stud_cre_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:15
+
+import apps.core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0003_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="studentapprovallog",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="studentprofile",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="studenttopuplog",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="teacherprofile",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
@@ -10,6 +10,18 @@ from django.db.models import Q
 from apps.users.models import User, UUIDPrimaryKeyMixin, TimeStampedMixin
 
 
+class StudentProfileManager(models.Manager):
+    def id_for(self, user):
+        """
+        Student profile id of `user`; no query when the user came from the
+        cached JWT auth state (CachedUser.student_profile_id).
+        """
+        spid = getattr(user, "student_profile_id", None)
+        if spid is not None:
+            return spid
+        return self.filter(user=user).values_list("id", flat=True).first()
+
+
 class StudentProfile(UUIDPrimaryKeyMixin, TimeStampedMixin):
     TYPE_ONLINE = "online"
     TYPE_OFFLINE = "offline"
@@ -31,6 +43,8 @@ class StudentProfile(UUIDPrimaryKeyMixin, TimeStampedMixin):
         max_length=10, choices=TYPE_CHOICES, default=TYPE_ONLINE, db_index=True
     )
 
+    objects = StudentProfileManager()
+
     class Meta:
         db_table = "student_profiles"
         indexes = [
@@ -119,6 +133,9 @@ class StudentTopUpLog(UUIDPrimaryKeyMixin, TimeStampedMixin):
         db_table = "student_topup_logs"
         indexes = [
             models.Index(fields=["created_at"], name="studtopuplog_created_idx"),
+            models.Index(
+                fields=["student", "created_at"], name="studtopuplog_stud_cre_idx"
+            ),
         ]
 
     def __str__(self) -> str:
@@ -1,6 +1,7 @@
 # apps/profiles/serializers.py
 from rest_framework import serializers
 
+from apps.core.exports import Export
 from apps.users.models import User
 from .models import StudentProfile, TeacherProfile, StudentTopUpLog, StudentApprovalLog
 
@@ -92,6 +93,8 @@ class ResultItemSerializer(serializers.Serializer):
     reading_score = serializers.FloatField(allow_null=True)
     writing_score = serializers.FloatField(allow_null=True)
     overall_score = serializers.FloatField(allow_null=True)
+    percentile = serializers.FloatField(allow_null=True)
+    global_percentile = serializers.FloatField(allow_null=True)
     created_at = serializers.DateTimeField()
 
 
@@ -115,3 +118,19 @@ class SubmissionItemSerializer(serializers.Serializer):
 class TeacherDashboardResponseSerializer(serializers.Serializer):
     profile = TeacherProfileSerializer()
     sections = serializers.DictField(child=serializers.JSONField())
+
+
+TOPUP_EXPORT = Export(
+    "topups",
+    (
+        ("id", "id"),
+        ("student_id", "student_id"),
+        ("fullname", "student__user__fullname"),
+        ("phone_number", "student__user__phone_number"),
+        ("amount", "amount"),
+        ("new_balance", "new_balance"),
+        ("actor", "actor__fullname"),
+        ("note", "note"),
+        ("created_at", "created_at"),
+    ),
+)
@@ -1,8 +1,9 @@
 # apps/profiles/signals.py
 from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from apps.users.authentication import invalidate_user
 from apps.users.models import User
 from .models import StudentProfile, TeacherProfile
 
@@ -16,3 +17,11 @@ def create_role_profile(sender, instance: User, created: bool, **kwargs):
             StudentProfile.objects.get_or_create(user=instance)
         elif instance.role == User.Roles.TEACHER:
             TeacherProfile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+def drop_cached_profile_id(sender, instance: StudentProfile, **kwargs):
+    # the cached auth state carries the student profile id
+    if kwargs.get("created", True):
+        invalidate_user(instance.user_id)
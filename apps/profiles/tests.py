@@ -1,3 +1,120 @@
+# apps/profiles/tests.py
+import io
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from apps.users.models import User
+from . import bulk
+from .models import StudentApprovalLog, StudentProfile, StudentTopUpLog
+
+
+def _student(i: int) -> StudentProfile:
+    user = User.objects.create_user(
+        fullname=f"student {i}",
+        phone_number=f"+99805{i:07d}",
+        role=User.Roles.STUDENT,
+    )
+    return user.student_profile
+
+
+class TopUpCsvTests(TestCase):
+    def setUp(self):
+        self.a, self.b = _student(1), _student(2)
+
+    def _read(self, text: str) -> bulk.TopUpSheet:
+        return bulk.read_topup_csv(io.StringIO(text))
+
+    def test_repeated_students_are_summed(self):
+        sheet = self._read(
+            "phone_number,amount\n"
+            f"{self.a.user.phone_number},1000\n"
+            f"{self.b.user.phone_number},250.5\n"
+            f"{self.a.user.phone_number}, 2 000 \n"
+        )
+        self.assertEqual(sheet.errors, [])
+        self.assertEqual(sheet.rows, 3)
+        self.assertEqual(
+            sheet.amounts,
+            {str(self.a.pk): Decimal("3000.00"), str(self.b.pk): Decimal("250.50")},
+        )
+        self.assertEqual(sheet.total, Decimal("3250.50"))
+
+    def test_every_bad_row_is_reported(self):
+        sheet = self._read(
+            "student_id,amount\n"
+            f"{self.a.pk},abc\n"
+            f"{self.a.pk},0\n"
+            f"{self.a.pk},-5\n"
+            "not-a-uuid,10\n"
+            "00000000-0000-0000-0000-000000000000,10\n"
+            f"{self.b.pk},10\n"
+        )
+        self.assertEqual(
+            [e.split(":")[0] for e in sheet.errors],
+            ["line 2", "line 3", "line 4", "line 5", "line 6"],
+        )
+        self.assertEqual(sheet.amounts, {str(self.b.pk): Decimal("10.00")})
+
+    def test_header_and_phone_errors(self):
+        self.assertEqual(len(self._read("name,amount\nx,1\n").errors), 1)
+        sheet = self._read("phone_number,amount\n12,5\n+998990000000,5\n")
+        self.assertTrue(sheet.errors[0].startswith("line 2: invalid phone"))
+        self.assertTrue(sheet.errors[1].startswith("line 3: no student"))
+
+
+class BulkTopUpTests(TestCase):
+    def setUp(self):
+        self.students = [_student(10 + i) for i in range(3)]
+        self.amounts = {s.pk: Decimal("100.00") for s in self.students}
+
+    def _balances(self):
+        return sorted(
+            StudentProfile.objects.filter(
+                pk__in=[s.pk for s in self.students]
+            ).values_list("balance", flat=True)
+        )
+
+    def test_top_up_logs_every_student(self):
+        updated = bulk.top_up(self.amounts, note="csv", chunk_size=2)
+        self.assertEqual(updated, 3)
+        self.assertEqual(self._balances(), [Decimal("100.00")] * 3)
+        self.assertEqual(StudentTopUpLog.objects.filter(note="csv").count(), 3)
+
+    def test_failure_in_a_later_chunk_applies_nothing(self):
+        def progress(done, total):
+            if done < total:
+                raise RuntimeError("connection lost")
+
+        with self.assertRaises(RuntimeError):
+            bulk.top_up(self.amounts, chunk_size=2, progress=progress)
+        self.assertEqual(self._balances(), [Decimal("0.00")] * 3)
+        self.assertFalse(StudentTopUpLog.objects.exists())
+
+        # so the same sheet can be uploaded again without double credit
+        bulk.top_up(self.amounts, chunk_size=2)
+        self.assertEqual(self._balances(), [Decimal("100.00")] * 3)
+
+
+class SetApprovalTests(TestCase):
+    def test_type_follows_approval(self):
+        students = [_student(20 + i) for i in range(3)]
+        ids = [s.pk for s in students]
+
+        self.assertEqual(bulk.set_approval(ids, True, chunk_size=2), 3)
+        self.assertEqual(
+            set(
+                StudentProfile.objects.filter(pk__in=ids).values_list(
+                    "is_approved", "type"
+                )
+            ),
+            {(True, StudentProfile.TYPE_OFFLINE)},
+        )
+        # rows already approved are skipped and get no log entry
+        self.assertEqual(bulk.set_approval(ids, True), 0)
+        self.assertEqual(StudentApprovalLog.objects.count(), 3)
+
+        self.assertEqual(bulk.set_approval(ids[:1], False), 1)
+        students[0].refresh_from_db()
+        self.assertFalse(students[0].is_approved)
+        self.assertEqual(students[0].type, StudentProfile.TYPE_ONLINE)
@@ -6,6 +6,7 @@ from .views import (
     TeacherMeView,
     StudentTopUpLogListView,
     StudentApprovalLogListView,
+    export_topups,
     student_dashboard,
     teacher_dashboard,
 )
@@ -14,6 +15,7 @@ urlpatterns = [
     path("student/me/", StudentMeView.as_view(), name="student-me"),
     path("teacher/me/", TeacherMeView.as_view(), name="teacher-me"),
     path("student/topups/", StudentTopUpLogListView.as_view(), name="student-topups"),
+    path("student/topups/export/", export_topups, name="student-topups-export"),
     path(
         "student/approvals/",
         StudentApprovalLogListView.as_view(),
@@ -4,6 +4,7 @@ from __future__ import annotations
 from typing import Dict, Any, List
 
 from django.db.models import Exists, OuterRef
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
@@ -11,9 +12,14 @@ from rest_framework import generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
+from apps.core.exports import export_schema
+from apps.core.pagination import CreatedAtCursorPagination, clamp_limit
+from apps.teacher_checking.counters import submission_counts
 from apps.teacher_checking.models import TeacherSubmission
 from apps.tests.models.ielts import Test
 from apps.user_tests.models import UserTest, TestResult
+from apps.user_tests.rankings import histograms, percentile
+from apps.users.permissions import IsSuperAdmin
 from .models import (
     StudentProfile,
     TeacherProfile,
@@ -31,6 +37,7 @@ from .serializers import (
     ResultItemSerializer,
     StudentDashboardResponseSerializer,
     TeacherDashboardResponseSerializer,
+    TOPUP_EXPORT,
 )
 
 
@@ -41,6 +48,10 @@ def _qp_int(qp, key: str, default: int = 0) -> int:
         return default
 
 
+class TopUpLogPagination(CreatedAtCursorPagination):
+    page_size_query_param = "limit"
+
+
 def _sub_to_item(s: TeacherSubmission) -> Dict[str, Any]:
 
     ut = s.user_test
@@ -89,23 +100,27 @@ class TeacherMeView(generics.RetrieveAPIView):
             name="limit",
             type=OpenApiTypes.INT,
             location="query",
-            description="Qatorlar soni (ixtiyoriy).",
+            description="Sahifadagi qatorlar soni (ixtiyoriy, max 100).",
         )
     ],
 )
 class StudentTopUpLogListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsStudent]
     serializer_class = StudentTopUpLogSerializer
+    pagination_class = TopUpLogPagination
 
     def get_queryset(self):
-        sp = get_object_or_404(StudentProfile, user=self.request.user)
-        qs = (
-            StudentTopUpLog.objects.filter(student=sp)
-            .select_related("actor")
-            .order_by("-created_at")
-        )
-        limit = _qp_int(self.request.query_params, "limit")  # type: ignore[attr-defined]
-        return qs[:limit] if limit > 0 else qs
+        spid = StudentProfile.objects.id_for(self.request.user)
+        if spid is None:
+            raise Http404
+        return StudentTopUpLog.objects.filter(student_id=spid).select_related("actor")
+
+
+@export_schema("Profiles", "Top-up loglari eksporti (CSV / JSONL, superadmin)")
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated, IsSuperAdmin])
+def export_topups(request):
+    return TOPUP_EXPORT.view_response(request, StudentTopUpLog.objects.all())
 
 
 @extend_schema(
@@ -122,11 +137,11 @@ class StudentApprovalLogListView(generics.ListAPIView):
     serializer_class = StudentApprovalLogSerializer
 
     def get_queryset(self):
-        sp = get_object_or_404(StudentProfile, user=self.request.user)
-        return (
-            StudentApprovalLog.objects.filter(student=sp)
-            .select_related("actor")
-            .order_by("-created_at")
+        spid = StudentProfile.objects.id_for(self.request.user)
+        if spid is None:
+            raise Http404
+        return StudentApprovalLog.objects.filter(student_id=spid).select_related(
+            "actor"
         )
 
 
@@ -138,19 +153,28 @@ class StudentApprovalLogListView(generics.ListAPIView):
             name="all_limit",
             type=OpenApiTypes.INT,
             location="query",
-            description="All tests limit.",
+            description=(
+                "All tests limit (default 20, max 100; 0 also gives 20). "
+                "The full list is paginated at /api/user-tests/all-tests/."
+            ),
         ),
         OpenApiParameter(
             name="my_limit",
             type=OpenApiTypes.INT,
             location="query",
-            description="My tests limit.",
+            description=(
+                "My tests limit (default 20, max 100; 0 also gives 20). "
+                "The full list is paginated at /api/user-tests/my-tests/."
+            ),
         ),
         OpenApiParameter(
             name="res_limit",
             type=OpenApiTypes.INT,
             location="query",
-            description="Results limit.",
+            description=(
+                "Results limit (default 20, max 100; 0 also gives 20). "
+                "The full list is paginated at /api/user-tests/results/."
+            ),
         ),
     ],
     responses={200: StudentDashboardResponseSerializer},
@@ -165,9 +189,9 @@ def student_dashboard(request):
         user=user,
     )
 
-    all_limit = _qp_int(request.query_params, "all_limit")
-    my_limit = _qp_int(request.query_params, "my_limit")
-    res_limit = _qp_int(request.query_params, "res_limit")
+    all_limit = clamp_limit(_qp_int(request.query_params, "all_limit"))
+    my_limit = clamp_limit(_qp_int(request.query_params, "my_limit"))
+    res_limit = clamp_limit(_qp_int(request.query_params, "res_limit"))
 
     purchased_qs = UserTest.objects.filter(user=user, test=OuterRef("pk"))
     all_qs = (
@@ -175,8 +199,7 @@ def student_dashboard(request):
         .annotate(purchased=Exists(purchased_qs))
         .order_by("-created_at")
     )
-    if all_limit > 0:
-        all_qs = all_qs[:all_limit]
+    all_qs = all_qs[:all_limit]
 
     all_tests: List[Dict[str, Any]] = [
         {
@@ -194,8 +217,7 @@ def student_dashboard(request):
         .select_related("test")
         .order_by("-created_at")
     )
-    if my_limit > 0:
-        my_qs = my_qs[:my_limit]
+    my_qs = my_qs[:my_limit]
 
     my_tests: List[Dict[str, Any]] = [
         {
@@ -220,8 +242,8 @@ def student_dashboard(request):
         .select_related("user_test__test")
         .order_by("-created_at")
     )
-    if res_limit > 0:
-        res_qs = res_qs[:res_limit]
+    res_qs = list(res_qs[:res_limit])
+    hists = histograms({tr.user_test.test_id for tr in res_qs}) if res_qs else {}
 
     results: List[Dict[str, Any]] = [
         {
@@ -232,6 +254,8 @@ def student_dashboard(request):
             "reading_score": tr.reading_score,
             "writing_score": tr.writing_score,
             "overall_score": tr.overall_score,
+            "percentile": percentile(hists[tr.user_test.test_id], tr.overall_score),
+            "global_percentile": percentile(hists[None], tr.overall_score),
             "created_at": tr.created_at,
         }
         for tr in res_qs
@@ -258,19 +282,28 @@ def student_dashboard(request):
             name="all_limit",
             type=OpenApiTypes.INT,
             location="query",
-            description="All writing limit.",
+            description=(
+                "All writing limit (default 20, max 100; 0 also gives 20). "
+                "The full list is paginated at /api/teacher-checking/all/."
+            ),
         ),
         OpenApiParameter(
             name="chk_limit",
             type=OpenApiTypes.INT,
             location="query",
-            description="My checking limit.",
+            description=(
+                "My checking limit (default 20, max 100; 0 also gives 20). "
+                "The full list is paginated at /api/teacher-checking/in-progress/."
+            ),
         ),
         OpenApiParameter(
             name="done_limit",
             type=OpenApiTypes.INT,
             location="query",
-            description="My checked limit.",
+            description=(
+                "My checked limit (default 20, max 100; 0 also gives 20). "
+                "The full list is paginated at /api/teacher-checking/checked/."
+            ),
         ),
     ],
     responses={200: TeacherDashboardResponseSerializer},
@@ -285,42 +318,36 @@ def teacher_dashboard(request):
         user=user,
     )
 
-    all_limit = _qp_int(request.query_params, "all_limit")
-    chk_limit = _qp_int(request.query_params, "chk_limit")
-    done_limit = _qp_int(request.query_params, "done_limit")
+    all_limit = clamp_limit(_qp_int(request.query_params, "all_limit"))
+    chk_limit = clamp_limit(_qp_int(request.query_params, "chk_limit"))
+    done_limit = clamp_limit(_qp_int(request.query_params, "done_limit"))
 
     base_sel = ("user_test__user", "user_test__test", "teacher")
 
+    # Section totals come from the maintained counters (one query) instead of
+    # three COUNT(*) scans; each section is then a single indexed page fetch.
+    S = TeacherSubmission.Status
+    my_id = str(user.pk)
+    counts = submission_counts(user.pk)
+    all_count = counts.get((S.REQUESTED, None), 0)
+    chk_count = counts.get((S.IN_CHECKING, my_id), 0)
+    done_count = counts.get((S.CHECKED, my_id), 0)
+
     all_qs = (
-        TeacherSubmission.objects.filter(status=TeacherSubmission.Status.REQUESTED)
+        TeacherSubmission.objects.filter(status=S.REQUESTED)
         .select_related(*base_sel)
-        .order_by("submitted_at")
+        .order_by("created_at", "id")[:all_limit]
     )
-    all_count = all_qs.count()
-    if all_limit > 0:
-        all_qs = all_qs[:all_limit]
-
     chk_qs = (
-        TeacherSubmission.objects.filter(
-            status=TeacherSubmission.Status.IN_CHECKING, teacher=user
-        )
+        TeacherSubmission.objects.filter(status=S.IN_CHECKING, teacher=user)
         .select_related(*base_sel)
-        .order_by("-updated_at")
+        .order_by("-created_at", "-id")[:chk_limit]
     )
-    chk_count = chk_qs.count()
-    if chk_limit > 0:
-        chk_qs = chk_qs[:chk_limit]
-
     done_qs = (
-        TeacherSubmission.objects.filter(
-            status=TeacherSubmission.Status.CHECKED, teacher=user
-        )
+        TeacherSubmission.objects.filter(status=S.CHECKED, teacher=user)
         .select_related(*base_sel)
-        .order_by("-checked_at")
+        .order_by("-created_at", "-id")[:done_limit]
     )
-    done_count = done_qs.count()
-    if done_limit > 0:
-        done_qs = done_qs[:done_limit]
 
     return Response(
         {
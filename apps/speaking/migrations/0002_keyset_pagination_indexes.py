@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0003_keyset_pagination_indexes"),
+        ("speaking", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="speakingrequest",
+            index=models.Index(
+                fields=["student", "created_at"], name="spreq_student_created_idx"
+            ),
+        ),
+    ]
@@ -26,6 +26,9 @@ class SpeakingRequest(UUIDPrimaryKeyMixin, TimeStampedMixin):
         indexes = [
             models.Index(fields=["student", "status"], name="spreq_student_status_idx"),
             models.Index(fields=["created_at"], name="spreq_created_idx"),
+            models.Index(
+                fields=["student", "created_at"], name="spreq_student_created_idx"
+            ),
         ]
 
     def __str__(self) -> str:
@@ -8,7 +8,7 @@ class SpeakingRequestCreateSerializer(serializers.Serializer):
 
 
 class SpeakingRequestSerializer(serializers.ModelSerializer):
-    student_id = serializers.UUIDField(source="student.id", read_only=True)
+    student_id = serializers.UUIDField(read_only=True)
 
     class Meta:
         model = SpeakingRequest
@@ -3,8 +3,10 @@ from drf_spectacular.utils import extend_schema
 from rest_framework import permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 
+from apps.core.pagination import paginate, paginated_schema
 from apps.profiles.models import StudentProfile
 from .serializers import SpeakingRequestCreateSerializer, SpeakingRequestSerializer
 from .services import create_speaking_request
@@ -34,6 +36,7 @@ def request_speaking(request):
     return Response(SpeakingRequestSerializer(sr).data, status=201)
 
 
+@paginated_schema()
 @extend_schema(
     tags=["Speaking"],
     summary="Mening speaking so'rovlarim",
@@ -42,6 +45,8 @@ def request_speaking(request):
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def my_speaking_requests(request):
-    sp = get_object_or_404(StudentProfile, user=request.user)
-    qs = SpeakingRequest.objects.filter(student=sp).order_by("-created_at")
-    return Response(SpeakingRequestSerializer(qs, many=True).data)
+    spid = StudentProfile.objects.id_for(request.user)
+    if spid is None:
+        raise Http404
+    qs = SpeakingRequest.objects.filter(student_id=spid)
+    return paginate(request, qs, SpeakingRequestSerializer)
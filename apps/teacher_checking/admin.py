@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import TeacherSubmission
+from django.db import transaction
+
+from .counters import record_transition
+from .models import SubmissionCounter, TeacherSubmission
 
 
 @admin.register(TeacherSubmission)
@@ -19,3 +22,30 @@ class TeacherSubmissionAdmin(admin.ModelAdmin):
     list_filter = ("status", "task", "teacher")
     search_fields = ("user_test__id", "teacher__username", "task")
     readonly_fields = ("created_at", "updated_at", "submitted_at", "checked_at")
+
+    @transaction.atomic
+    def save_model(self, request, obj, form, change):
+        old_status = old_teacher_id = None
+        if change:
+            old_status = form.initial.get("status")
+            old_teacher_id = form.initial.get("teacher")
+        super().save_model(request, obj, form, change)
+        record_transition(
+            old_status=old_status,
+            old_teacher_id=old_teacher_id,
+            new_status=obj.status,
+            new_teacher_id=obj.teacher_id,
+        )
+
+
+@admin.register(SubmissionCounter)
+class SubmissionCounterAdmin(admin.ModelAdmin):
+    list_display = ("status", "teacher", "slot", "count")
+    list_filter = ("status",)
+    list_select_related = ("teacher",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TeacherCheckingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.teacher_checking"
+
+    def ready(self):
+        from . import signals  # noqa
@@ -0,0 +1,134 @@
+# apps/teacher_checking/counters.py
+from __future__ import annotations
+
+import random
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+
+from .models import SubmissionCounter, TeacherSubmission
+
+__all__ = (
+    "record_transition",
+    "submission_counts",
+    "release_teacher",
+    "rebuild_counters",
+)
+
+Key = Tuple[str, Optional[str]]  # (status, teacher_id or None for global)
+
+# Every submit and claim moves an unassigned submission, so a single
+# (status, NULL) row would serialize them all; each transition picks one of
+# these slots at random and readers sum them. A teacher's own rows are only
+# written by that teacher's actions. Global totals are not stored at all:
+# they are the sum over every row of the status.
+UNASSIGNED_SLOTS = 8
+
+_UPSERT_SQL = """
+INSERT INTO teacher_submission_counters (status, teacher_id, slot, count)
+VALUES {values}
+ON CONFLICT (status, teacher_id, slot)
+DO UPDATE SET count = teacher_submission_counters.count + EXCLUDED.count
+"""
+
+# A deleted teacher's submissions become unassigned (SET_NULL) while the
+# counter rows go with the user (CASCADE); their counts move over first.
+_RELEASE_SQL = """
+INSERT INTO teacher_submission_counters (status, teacher_id, slot, count)
+SELECT status, NULL, 0, count FROM teacher_submission_counters
+WHERE teacher_id = %s
+ORDER BY status
+ON CONFLICT (status, teacher_id, slot)
+DO UPDATE SET count = teacher_submission_counters.count + EXCLUDED.count
+"""
+
+_Row = Tuple[str, Optional[str], int]  # (status, teacher_id, slot)
+
+
+def _keys(status: Optional[str], teacher_id, slot: int) -> Iterable[_Row]:
+    if not status:
+        return ()
+    if teacher_id is None:
+        return ((status, None, slot),)
+    return ((status, str(teacher_id), 0),)
+
+
+def _apply(deltas: Counter) -> None:
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+    # Fixed key order -> concurrent transitions lock counter rows in the same
+    # order and cannot deadlock on each other.
+    items = sorted(deltas.items(), key=lambda kv: (kv[0][0], kv[0][1] or "", kv[0][2]))
+    values = ", ".join(["(%s, %s::uuid, %s, %s)"] * len(items))
+    params = [p for key, delta in items for p in (*key, delta)]
+    with connection.cursor() as cur:
+        cur.execute(_UPSERT_SQL.format(values=values), params)
+
+
+def record_transition(
+    *,
+    old_status: Optional[str] = None,
+    old_teacher_id=None,
+    new_status: Optional[str] = None,
+    new_teacher_id=None,
+) -> None:
+    """
+    Move one submission between counter buckets. old_status=None means it was
+    just created, new_status=None that it is being deleted. Must run inside the
+    transaction that changes the submission.
+    """
+    slot = random.randrange(UNASSIGNED_SLOTS)
+    deltas: Counter = Counter()
+    for key in _keys(old_status, old_teacher_id, slot):
+        deltas[key] -= 1
+    for key in _keys(new_status, new_teacher_id, slot):
+        deltas[key] += 1
+    _apply(deltas)
+
+
+def submission_counts(teacher_id=None) -> Dict[Key, int]:
+    """Global counters plus the given teacher's ones, in a single query."""
+    sums = {"total": Sum("count")}
+    if teacher_id is not None:
+        sums["own"] = Sum("count", filter=Q(teacher_id=teacher_id))
+    rows = SubmissionCounter.objects.order_by().values("status").annotate(**sums)
+    counts: Dict[Key, int] = {}
+    for row in rows:
+        counts[(row["status"], None)] = max(row["total"], 0)
+        if row.get("own") is not None:
+            counts[(row["status"], str(teacher_id))] = max(row["own"], 0)
+    return counts
+
+
+def release_teacher(teacher_id) -> None:
+    """Count the teacher's submissions as unassigned (before deleting them)."""
+    with connection.cursor() as cur:
+        cur.execute(_RELEASE_SQL, [str(teacher_id)])
+
+
+@transaction.atomic
+def rebuild_counters() -> int:
+    """Recompute every counter from teacher_submissions (repair/backfill)."""
+    # Writers upsert counters before they commit, so holding this lock makes
+    # the recount see a consistent snapshot of both tables.
+    with connection.cursor() as cur:
+        cur.execute(
+            "LOCK TABLE teacher_submission_counters IN SHARE ROW EXCLUSIVE MODE"
+        )
+    SubmissionCounter.objects.all().delete()
+    rows = (
+        TeacherSubmission.objects.order_by()
+        .values("status", "teacher_id")
+        .annotate(n=Count("pk"))
+    )
+    counters = [
+        SubmissionCounter(
+            status=row["status"], teacher_id=row["teacher_id"], count=row["n"]
+        )
+        for row in rows
+    ]
+    SubmissionCounter.objects.bulk_create(counters, batch_size=1000)
+    return len(counters)
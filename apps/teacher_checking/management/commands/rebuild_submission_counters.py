@@ -0,0 +1,15 @@
+# apps/teacher_checking/management/commands/rebuild_submission_counters.py
+from django.core.management.base import BaseCommand
+
+from apps.teacher_checking.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute teacher submission counters from teacher_submissions "
+        "(e.g. after raw SQL edits or bulk imports)."
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} counter row(s)."))
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BACKFILL = """
+INSERT INTO teacher_submission_counters (status, teacher_id, count)
+SELECT status, NULL, count(*) FROM teacher_submissions GROUP BY status
+UNION ALL
+SELECT status, teacher_id, count(*) FROM teacher_submissions
+WHERE teacher_id IS NOT NULL GROUP BY status, teacher_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teacher_checking", "0002_keyset_pagination_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubmissionCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("requested", "Requested"),
+                            ("in_checking", "In checking"),
+                            ("checked", "Checked"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "teacher",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "teacher_submission_counters",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("status", "teacher"),
+                        name="uniq_subcounter_status_teacher",
+                        nulls_distinct=False,
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(sql=BACKFILL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teacher_checking", "0004_uuid7_primary_keys"),
+        ("user_tests", "0008_user_answers_unique_trigger"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="teachersubmission",
+            name="ts_status_submitted_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="teachersubmission",
+            name="ts_teacher_status_upd_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="teachersubmission",
+            name="ts_teacher_status_chk_idx",
+        ),
+        migrations.AddIndex(
+            model_name="teachersubmission",
+            index=models.Index(
+                fields=["status", "created_at"], name="ts_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teachersubmission",
+            index=models.Index(
+                fields=["teacher", "status", "created_at"],
+                name="ts_teacher_status_crt_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+# The teacher=NULL rows held the global total per status and so were updated
+# by every transition; they now count only unassigned submissions and the
+# global total is summed on read. Subtract what the teachers' rows hold.
+UNASSIGNED_ONLY = """
+UPDATE teacher_submission_counters g
+SET count = g.count - t.count
+FROM (
+    SELECT status, sum(count) AS count FROM teacher_submission_counters
+    WHERE teacher_id IS NOT NULL GROUP BY status
+) t
+WHERE g.teacher_id IS NULL AND g.status = t.status
+"""
+
+# Reverse: fold the slots into slot 0, then add the teachers' rows back.
+GLOBAL_TOTALS = """
+INSERT INTO teacher_submission_counters (status, teacher_id, slot, count)
+SELECT status, NULL, 0, sum(count) FROM teacher_submission_counters
+WHERE teacher_id IS NULL AND slot <> 0 GROUP BY status
+ON CONFLICT (status, teacher_id, slot)
+DO UPDATE SET count = teacher_submission_counters.count + EXCLUDED.count;
+DELETE FROM teacher_submission_counters WHERE slot <> 0;
+INSERT INTO teacher_submission_counters (status, teacher_id, slot, count)
+SELECT status, NULL, 0, sum(count) FROM teacher_submission_counters
+WHERE teacher_id IS NOT NULL GROUP BY status
+ON CONFLICT (status, teacher_id, slot)
+DO UPDATE SET count = teacher_submission_counters.count + EXCLUDED.count;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teacher_checking", "0005_keyset_on_created_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="submissioncounter",
+            name="uniq_subcounter_status_teacher",
+        ),
+        migrations.AddField(
+            model_name="submissioncounter",
+            name="slot",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name="submissioncounter",
+            constraint=models.UniqueConstraint(
+                fields=("status", "teacher", "slot"),
+                name="uniq_subcounter_status_teacher",
+                nulls_distinct=False,
+            ),
+        ),
+        migrations.RunSQL(sql=UNASSIGNED_ONLY, reverse_sql=GLOBAL_TOTALS),
+    ]
@@ -1,9 +1,9 @@
 #  app/models/teacher_checking.py
-import uuid
 
 from django.db import models
 from django.utils import timezone
 
+from apps.core.ids import uuid7
 from apps.user_tests.models import UserTest
 from apps.users.models import User
 
@@ -18,7 +18,7 @@ class TeacherSubmission(models.Model):
         TASK1 = "task1", "Task 1"
         TASK2 = "task2", "Task 2"
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     user_test = models.ForeignKey(
         UserTest, on_delete=models.CASCADE, related_name="writing_submissions"
@@ -56,7 +56,49 @@ class TeacherSubmission(models.Model):
         indexes = [
             models.Index(fields=["status"], name="ts_status_idx"),
             models.Index(fields=["teacher", "status"], name="ts_teacher_status_idx"),
+            # keyset pagination of the teacher queues (on created_at, which
+            # unlike submitted/updated/checked_at never changes nor is NULL)
+            models.Index(fields=["status", "created_at"], name="ts_status_created_idx"),
+            models.Index(
+                fields=["teacher", "status", "created_at"],
+                name="ts_teacher_status_crt_idx",
+            ),
         ]
 
     def __str__(self):
         return f"{self.user_test_id} {self.task} {self.status}"  # type: ignore[attr-defined]
+
+
+class SubmissionCounter(models.Model):
+    """
+    Running number of submissions per status: teacher=<user> counts that
+    teacher's ones, teacher=NULL the unassigned ones, spread over a few slots
+    that are summed on read. Maintained by apps.teacher_checking.counters
+    inside the same transaction as the status change, so dashboards read them
+    instead of COUNT(*) over the queue.
+    """
+
+    status = models.CharField(max_length=20, choices=TeacherSubmission.Status.choices)  # type: ignore[attr-defined]
+    teacher = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    slot = models.PositiveSmallIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "teacher_submission_counters"
+        constraints = [
+            # one row per unassigned slot despite teacher being NULL
+            models.UniqueConstraint(
+                fields=["status", "teacher", "slot"],
+                name="uniq_subcounter_status_teacher",
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.status} {self.teacher_id or f'unassigned#{self.slot}'}: {self.count}"  # type: ignore[attr-defined]
@@ -1,27 +1,40 @@
 from __future__ import annotations
 
+from typing import Set
+
 from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.utils import timezone
 
 from apps.user_tests.models import UserTest, TestResult
 from apps.users.models import User
+from .counters import record_transition
 from .models import TeacherSubmission
 
 
 __all__ = ("submit_writing", "claim_submission", "grade_submission")
 
 
+def _required_tasks(test) -> Set[str]:
+    """Writing tasks that must be checked before a UserTest of `test` is done."""
+    return set(TeacherSubmission.Task.values) if test.writing_id else set()
+
+
 @transaction.atomic
 def submit_writing(*, user_test: UserTest, task: str, text: str) -> TeacherSubmission:
-    sub, created = TeacherSubmission.objects.get_or_create(
+    # Locked read: a claim or grade can't change the row between here and the
+    # counter transition computed from it below.
+    sub, created = TeacherSubmission.objects.select_for_update().get_or_create(
         user_test=user_test,
         task=task,
         defaults={"submitted_text": text, "status": TeacherSubmission.Status.REQUESTED},
     )
-    if not created:
+    if created:
+        record_transition(new_status=sub.status)
+    else:
         if sub.status == TeacherSubmission.Status.CHECKED:
             raise ValidationError("This task is already checked.")
+        old_status, old_teacher_id = sub.status, sub.teacher_id  # type: ignore[attr-defined]
         sub.submitted_text = text
         sub.status = TeacherSubmission.Status.REQUESTED
         sub.teacher = None
@@ -39,6 +52,11 @@ def submit_writing(*, user_test: UserTest, task: str, text: str) -> TeacherSubmi
                 "updated_at",
             ]
         )
+        record_transition(
+            old_status=old_status,
+            old_teacher_id=old_teacher_id,
+            new_status=sub.status,
+        )
     return sub
 
 
@@ -58,6 +76,11 @@ def claim_submission(*, submission_id, teacher: User) -> TeacherSubmission:
     sub.status = TeacherSubmission.Status.IN_CHECKING
     sub.teacher = teacher
     sub.save(update_fields=["status", "teacher", "updated_at"])
+    record_transition(
+        old_status=TeacherSubmission.Status.REQUESTED,
+        new_status=sub.status,
+        new_teacher_id=teacher.pk,
+    )
     return sub
 
 
@@ -66,14 +89,15 @@ def grade_submission(
     *, submission_id, teacher: User, score: float, feedback: str
 ) -> TeacherSubmission:
     sub = (
-        TeacherSubmission.objects.select_for_update()
-        .select_related("user_test")
+        TeacherSubmission.objects.select_for_update(of=("self", "user_test"))
+        .select_related("user_test__test")
         .get(id=submission_id)
     )
     if sub.teacher_id and sub.teacher_id != teacher.id:  # type: ignore[attr-defined]
         raise ValidationError("This submission is assigned to another teacher.")
     if sub.status != TeacherSubmission.Status.IN_CHECKING:
         raise ValidationError("Submission must be in 'in_checking' state to grade.")
+    old_teacher_id = sub.teacher_id  # type: ignore[attr-defined]
 
     sub.score = float(score)
     sub.feedback = feedback or ""
@@ -90,15 +114,23 @@ def grade_submission(
             "updated_at",
         ]
     )
+    record_transition(
+        old_status=TeacherSubmission.Status.IN_CHECKING,
+        old_teacher_id=old_teacher_id,
+        new_status=sub.status,
+        new_teacher_id=teacher.pk,
+    )
 
     ut = sub.user_test
     tr, _ = TestResult.objects.get_or_create(user_test=ut)
 
-    scores = list(
-        TeacherSubmission.objects.filter(
+    checked = {
+        task: score
+        for task, score in TeacherSubmission.objects.filter(
             user_test=ut, status=TeacherSubmission.Status.CHECKED
-        ).values_list("score", flat=True)
-    )
+        ).values_list("task", "score")
+    }
+    scores = list(checked.values())
     if scores:
         tr.writing_score = round(sum(scores) / len(scores), 1)
         comps = [
@@ -109,4 +141,9 @@ def grade_submission(
         tr.overall_score = round(sum(comps) / len(comps), 1) if comps else None
         tr.save(update_fields=["writing_score", "overall_score", "updated_at"])
 
+    # completed (and added to item stats) once every task of its writing part
+    # is checked, not just the ones submitted so far
+    if _required_tasks(ut.test) <= checked.keys():
+        ut.mark_completed()
+
     return sub
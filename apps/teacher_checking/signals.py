@@ -0,0 +1,23 @@
+# apps/teacher_checking/signals.py
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from apps.users.models import User
+from .counters import record_transition, release_teacher
+from .models import TeacherSubmission
+
+
+@receiver(post_delete, sender=TeacherSubmission)
+def release_submission_counters(sender, instance: TeacherSubmission, **kwargs):
+    # Also fires for cascades (UserTest/User deletion) inside their transaction.
+    record_transition(
+        old_status=instance.status,
+        old_teacher_id=instance.teacher_id,  # type: ignore[attr-defined]
+    )
+
+
+@receiver(pre_delete, sender=User)
+def release_teacher_counters(sender, instance: User, **kwargs):
+    # Runs before the cascade drops the teacher's counter rows; the
+    # submissions themselves stay, unassigned (SET_NULL).
+    release_teacher(instance.pk)
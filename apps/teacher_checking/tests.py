@@ -1,3 +1,170 @@
-from django.test import TestCase
+# apps/teacher_checking/tests.py
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.tests.models import Test
+from apps.user_tests.models import TestResult, UserTest
+from apps.users.models import User
+from .counters import rebuild_counters, submission_counts
+from .models import SubmissionCounter, TeacherSubmission
+from .services import claim_submission, grade_submission, submit_writing
+
+
+def _user(role: str, i: int) -> User:
+    return User.objects.create_user(
+        fullname=f"{role} {i}", phone_number=f"+99803{i:07d}", role=role
+    )
+
+
+@override_settings(ITEM_STATS={"LIVE": True, "BATCH_SIZE": 500})
+class CompletionTests(TestCase):
+    def setUp(self):
+        self.student = _user(User.Roles.STUDENT, 1)
+        self.teacher = _user(User.Roles.TEACHER, 2)
+        self.test = Test.objects.create(title="T")  # gets a writing part
+        self.test.refresh_from_db()
+        self.ut = UserTest.objects.create(
+            user=self.student, test=self.test, status=UserTest.Status.IN_PROGRESS
+        )
+
+    def _grade(self, task: str, score: float = 6.0):
+        sub = submit_writing(user_test=self.ut, task=task, text="essay")
+        claim_submission(submission_id=sub.pk, teacher=self.teacher)
+        grade_submission(
+            submission_id=sub.pk, teacher=self.teacher, score=score, feedback=""
+        )
+        self.ut.refresh_from_db()
+
+    def test_task1_alone_does_not_complete(self):
+        self._grade("task1")
+        self.assertEqual(self.ut.status, UserTest.Status.IN_PROGRESS)
+        self.assertIsNone(self.ut.items_analyzed_at)
+
+        self._grade("task2", 7.0)
+        self.assertEqual(self.ut.status, UserTest.Status.COMPLETED)
+        self.assertIsNotNone(self.ut.items_analyzed_at)
+        self.assertEqual(self.ut.result.writing_score, 6.5)
+
+    def test_scored_result_completes_test_without_writing(self):
+        Test.objects.filter(pk=self.test.pk).update(writing=None)
+        TestResult.objects.create(user_test=self.ut, reading_score=6.0)
+        self.ut.refresh_from_db()
+        self.assertEqual(self.ut.status, UserTest.Status.IN_PROGRESS)
+
+        result = self.ut.result
+        result.overall_score = 6.0
+        result.save()
+        self.ut.refresh_from_db()
+        self.assertEqual(self.ut.status, UserTest.Status.COMPLETED)
+        self.assertIsNotNone(self.ut.items_analyzed_at)
+
+    def test_scored_result_leaves_writing_to_grading(self):
+        TestResult.objects.create(user_test=self.ut, overall_score=6.0)
+        self.ut.refresh_from_db()
+        self.assertEqual(self.ut.status, UserTest.Status.IN_PROGRESS)
+
+
+class ResubmitTests(TestCase):
+    def setUp(self):
+        self.student = _user(User.Roles.STUDENT, 11)
+        self.teacher = _user(User.Roles.TEACHER, 12)
+        self.ut = UserTest.objects.create(
+            user=self.student, test=Test.objects.create(title="T")
+        )
+
+    def test_resubmit_moves_counters_from_current_state(self):
+        sub = submit_writing(user_test=self.ut, task="task1", text="v1")
+        claim_submission(submission_id=sub.pk, teacher=self.teacher)
+
+        sub = submit_writing(user_test=self.ut, task="task1", text="v2")
+        self.assertEqual(sub.status, TeacherSubmission.Status.REQUESTED)
+        self.assertIsNone(sub.teacher_id)
+        counts = submission_counts(self.teacher.pk)
+        requested, in_checking = (
+            TeacherSubmission.Status.REQUESTED,
+            TeacherSubmission.Status.IN_CHECKING,
+        )
+        self.assertEqual(counts[(requested, None)], 1)
+        self.assertEqual(counts[(in_checking, None)], 0)
+        self.assertEqual(counts[(in_checking, str(self.teacher.pk))], 0)
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.teacher = _user(User.Roles.TEACHER, 31)
+        test = Test.objects.create(title="T")
+        self.subs = [
+            submit_writing(
+                user_test=UserTest.objects.create(
+                    user=_user(User.Roles.STUDENT, 32 + i), test=test
+                ),
+                task="task1",
+                text="essay",
+            )
+            for i in range(3)
+        ]
+        for sub in self.subs[:2]:
+            claim_submission(submission_id=sub.pk, teacher=self.teacher)
+        grade_submission(
+            submission_id=self.subs[0].pk, teacher=self.teacher, score=6, feedback=""
+        )
+
+    def _expected(self):
+        S = TeacherSubmission.Status
+        return {
+            (S.REQUESTED, None): 1,
+            (S.IN_CHECKING, None): 1,
+            (S.CHECKED, None): 1,
+        }
+
+    def test_global_totals_are_summed_not_stored(self):
+        counts = submission_counts(self.teacher.pk)
+        my_id = str(self.teacher.pk)
+        S = TeacherSubmission.Status
+        self.assertEqual(
+            counts,
+            {
+                **self._expected(),
+                (S.IN_CHECKING, my_id): 1,
+                (S.CHECKED, my_id): 1,
+            },
+        )
+        # assigned submissions touch only their teacher's rows
+        self.assertFalse(
+            SubmissionCounter.objects.filter(
+                teacher__isnull=True, status__in=[S.IN_CHECKING, S.CHECKED]
+            ).exists()
+        )
+        rebuild_counters()
+        self.assertEqual(submission_counts(self.teacher.pk), counts)
+
+    def test_deleted_teacher_leaves_the_totals(self):
+        self.teacher.delete()
+        self.assertEqual(submission_counts(), self._expected())
+        self.assertFalse(
+            SubmissionCounter.objects.filter(teacher__isnull=False).exists()
+        )
+
+
+class PoolPaginationTests(TestCase):
+    def test_resubmitted_rows_keep_their_place(self):
+        teacher = _user(User.Roles.TEACHER, 21)
+        test = Test.objects.create(title="T")
+        subs = []
+        for i in range(3):
+            ut = UserTest.objects.create(
+                user=_user(User.Roles.STUDENT, 30 + i), test=test
+            )
+            subs.append(submit_writing(user_test=ut, task="task1", text="v1"))
+        client = APIClient()
+        client.force_authenticate(teacher)
+
+        first = client.get(reverse("all-writing"), {"page_size": 2}).json()
+        self.assertEqual(
+            [r["id"] for r in first["results"]], [str(s.pk) for s in subs[:2]]
+        )
+        submit_writing(user_test=subs[0].user_test, task="task1", text="v2")
+
+        second = client.get(first["next"]).json()
+        self.assertEqual([r["id"] for r in second["results"]], [str(subs[2].pk)])
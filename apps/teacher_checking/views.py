@@ -5,6 +5,10 @@ from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
+from apps.core.pagination import (
+    CreatedAtCursorPagination,
+    OldestFirstCursorPagination,
+)
 from apps.profiles.permissions import IsTeacherOrSuperAdmin
 from apps.user_tests.models import UserTest
 from .models import TeacherSubmission
@@ -40,43 +44,36 @@ def student_submit_writing(request):
 class AllWritingList(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsTeacherOrSuperAdmin]
     serializer_class = TeacherSubmissionSerializer
+    pagination_class = OldestFirstCursorPagination
 
     def get_queryset(self):
-        return (
-            TeacherSubmission.objects.filter(status=TeacherSubmission.Status.REQUESTED)
-            .select_related("user_test__user", "user_test__test", "teacher")
-            .order_by("submitted_at")
-        )
+        return TeacherSubmission.objects.filter(
+            status=TeacherSubmission.Status.REQUESTED
+        ).select_related("user_test__user", "user_test__test", "teacher")
 
 
 @extend_schema(tags=["Teacher Checking"], summary="My Checking — in_checking")
 class MyCheckingList(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsTeacherOrSuperAdmin]
     serializer_class = TeacherSubmissionSerializer
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
-        return (
-            TeacherSubmission.objects.filter(
-                status=TeacherSubmission.Status.IN_CHECKING, teacher=self.request.user
-            )
-            .select_related("user_test__user", "user_test__test", "teacher")
-            .order_by("-updated_at")
-        )
+        return TeacherSubmission.objects.filter(
+            status=TeacherSubmission.Status.IN_CHECKING, teacher=self.request.user
+        ).select_related("user_test__user", "user_test__test", "teacher")
 
 
 @extend_schema(tags=["Teacher Checking"], summary="Checked — by me")
 class MyCheckedList(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsTeacherOrSuperAdmin]
     serializer_class = TeacherSubmissionSerializer
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
-        return (
-            TeacherSubmission.objects.filter(
-                status=TeacherSubmission.Status.CHECKED, teacher=self.request.user
-            )
-            .select_related("user_test__user", "user_test__test", "teacher")
-            .order_by("-checked_at")
-        )
+        return TeacherSubmission.objects.filter(
+            status=TeacherSubmission.Status.CHECKED, teacher=self.request.user
+        ).select_related("user_test__user", "user_test__test", "teacher")
 
 
 @extend_schema(
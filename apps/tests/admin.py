@@ -1,6 +1,8 @@
 # apps/tests/admin.py
+from django import forms
 from django.contrib import admin
-from django.db.models import Count
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Q
 
 from .models import (
     Test,
@@ -14,22 +16,152 @@ from .models import (
     QuestionSet,
     Question,
 )
+from .search import search_filter
+from .validators import (
+    LISTENING_SECTIONS,
+    READING_PASSAGES,
+    SECTION_QUESTION_SETS,
+    PASSAGE_QUESTION_SETS,
+    relation_limit_errors,
+    validate_relation_size,
+)
+
+
+# Structure limits are checked against the submitted form data, so saving a
+# change form costs no extra COUNT queries; the DB triggers are the backstop.
+def _alive_forms(formset):
+    return [
+        f
+        for f in formset.forms
+        if f.cleaned_data and not f.cleaned_data.get("DELETE", False)
+    ]
+
+
+class RelationLimitFormSet(forms.BaseInlineFormSet):
+    relation_limit = None
+
+    def clean(self):
+        super().clean()
+        validate_relation_size(self.relation_limit, len(_alive_forms(self)))
+
+
+class ListeningSectionFormSet(RelationLimitFormSet):
+    relation_limit = LISTENING_SECTIONS
+
+
+class ReadingPassageFormSet(RelationLimitFormSet):
+    relation_limit = READING_PASSAGES
+
+
+class QuestionFormSet(forms.BaseInlineFormSet):
+    def clean(self):
+        super().clean()
+        types = {
+            f.cleaned_data["question"].question_type
+            for f in _alive_forms(self)
+            if f.cleaned_data.get("question")
+        }
+        if types:
+            QuestionSet._validate_uniform_question_type_from_types(types)  # noqa
+
+
+class RelationLimitForm(forms.ModelForm):
+    relation_limits = {}
+
+    def clean(self):
+        cleaned = super().clean()
+        for name, rule in self.relation_limits.items():
+            if cleaned.get(name) is None:
+                continue
+            try:
+                validate_relation_size(rule, len(cleaned[name]))
+            except ValidationError as e:
+                self.add_error(name, e)
+        return cleaned
+
+
+class ListeningSectionForm(RelationLimitForm):
+    relation_limits = {"questions_set": SECTION_QUESTION_SETS}
+
+    class Meta:
+        model = ListeningSection
+        fields = "__all__"
+
+
+class ReadingPassageForm(RelationLimitForm):
+    relation_limits = {"questions_set": PASSAGE_QUESTION_SETS}
+
+    class Meta:
+        model = ReadingPassage
+        fields = "__all__"
+
+
+class RelationLimitAdminMixin:
+    # Forms and formsets above check the limits first; if the triggers still
+    # reject the through rows (a concurrent edit), the whole save is rolled
+    # back and the submitted form is rendered again with the error on it.
+    def save_related(self, request, form, formsets, change):
+        with relation_limit_errors():
+            super().save_related(request, form, formsets, change)
+
+    def changeform_view(self, request, *args, **kwargs):
+        try:
+            return super().changeform_view(request, *args, **kwargs)
+        except ValidationError as e:
+            # the second pass validates the same POST data, fails on the
+            # error below and so renders the form without saving anything
+            request.relation_limit_error = e
+            return super().changeform_view(request, *args, **kwargs)
+
+    def get_form(self, request, obj=None, **kwargs):
+        form = super().get_form(request, obj, **kwargs)
+        error = getattr(request, "relation_limit_error", None)
+        if error is None:
+            return form
+
+        class RejectedForm(form):
+            def clean(self):
+                cleaned = super().clean()
+                self.add_error(None, error)
+                return cleaned
+
+        return RejectedForm
+
+
+class FullTextSearchAdminMixin:
+    # Large text columns are matched through the GIN-indexed tsvector columns
+    # instead of `icontains`; short name-like fields can stay in plain lookups.
+    search_vector_lookups = ("search_vector",)
+    search_plain_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return super().get_search_results(request, queryset, search_term)
+        cond = search_filter(self.search_vector_lookups, term)
+        for field in self.search_plain_fields:
+            cond |= Q(**{f"{field}__icontains": term})
+        lookups = (*self.search_vector_lookups, *self.search_plain_fields)
+        return queryset.filter(cond), any("__" in x for x in lookups)
 
 
 class ListeningSectionInline(admin.TabularInline):
     model = Listening.sections.through
+    formset = ListeningSectionFormSet
     extra = 0
     show_change_link = True
 
 
 class ReadingPassageInline(admin.TabularInline):
     model = Reading.passages.through
+    formset = ReadingPassageFormSet
     extra = 0
     show_change_link = True
 
 
 class QuestionInline(admin.TabularInline):
     model = QuestionSet.questions.through
+    formset = QuestionFormSet
     extra = 0
     show_change_link = True
 
@@ -58,7 +190,7 @@ class TestAdmin(admin.ModelAdmin):
 
 
 @admin.register(Listening)
-class ListeningAdmin(admin.ModelAdmin):
+class ListeningAdmin(RelationLimitAdminMixin, admin.ModelAdmin):
     list_display = ("title", "sections_count", "created_at", "updated_at")
     search_fields = ("title", "sections__name")
     date_hierarchy = "created_at"
@@ -79,9 +211,14 @@ class ListeningAdmin(admin.ModelAdmin):
 
 
 @admin.register(ListeningSection)
-class ListeningSectionAdmin(admin.ModelAdmin):
+class ListeningSectionAdmin(
+    RelationLimitAdminMixin, FullTextSearchAdminMixin, admin.ModelAdmin
+):
+    form = ListeningSectionForm
     list_display = ("name", "id", "questions_count")
     search_fields = ("name", "questions_set__name", "questions_set__questions__text")
+    search_vector_lookups = ("questions_set__questions__search_vector",)
+    search_plain_fields = ("name", "questions_set__name")
     filter_horizontal = ("questions_set",)
     ordering = ("name",)
     list_per_page = 50
@@ -97,7 +234,7 @@ class ListeningSectionAdmin(admin.ModelAdmin):
 
 
 @admin.register(Reading)
-class ReadingAdmin(admin.ModelAdmin):
+class ReadingAdmin(RelationLimitAdminMixin, admin.ModelAdmin):
     list_display = ("title", "passages_count", "created_at", "updated_at")
     search_fields = ("title", "passages__name")
     date_hierarchy = "created_at"
@@ -118,9 +255,17 @@ class ReadingAdmin(admin.ModelAdmin):
 
 
 @admin.register(ReadingPassage)
-class ReadingPassageAdmin(admin.ModelAdmin):
+class ReadingPassageAdmin(
+    RelationLimitAdminMixin, FullTextSearchAdminMixin, admin.ModelAdmin
+):
+    form = ReadingPassageForm
     list_display = ("name", "id", "questions_count")
     search_fields = ("name", "questions_set__name", "questions_set__questions__text")
+    search_vector_lookups = (
+        "search_vector",
+        "questions_set__questions__search_vector",
+    )
+    search_plain_fields = ("name", "questions_set__name")
     filter_horizontal = ("questions_set",)
     ordering = ("name",)
     list_per_page = 50
@@ -144,16 +289,17 @@ class WritingAdmin(admin.ModelAdmin):
 
 
 @admin.register(TaskOne)
-class TaskOneAdmin(admin.ModelAdmin):
+class TaskOneAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ("topic", "image_title")
     search_fields = ("topic", "image_title")
+    search_plain_fields = ("image_title",)
     ordering = ("topic",)
     list_per_page = 50
     save_on_top = True
 
 
 @admin.register(TaskTwo)
-class TaskTwoAdmin(admin.ModelAdmin):
+class TaskTwoAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ("topic",)
     search_fields = ("topic",)
     ordering = ("topic",)
@@ -162,7 +308,7 @@ class TaskTwoAdmin(admin.ModelAdmin):
 
 
 @admin.register(Question)
-class QuestionAdmin(admin.ModelAdmin):
+class QuestionAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ("id", "short_text", "question_type")
     list_filter = ("question_type",)
     search_fields = ("text",)
@@ -176,18 +322,19 @@ class QuestionAdmin(admin.ModelAdmin):
 
 
 @admin.register(QuestionSet)
-class QuestionSetAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "questions_count")
+class QuestionSetAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
+    list_display = ("id", "name", "question_type", "questions_count")
+    list_filter = ("question_type",)
     search_fields = ("name", "questions__text")
+    search_vector_lookups = ("questions__search_vector",)
+    search_plain_fields = ("name",)
+    readonly_fields = ("question_type", "questions_count")
     inlines = [QuestionInline]
     ordering = ("id",)
     list_per_page = 50
     save_on_top = True
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.annotate(_q_count=Count("questions"))
-
-    @admin.display(description="Questions")
-    def questions_count(self, obj):
-        return getattr(obj, "_q_count", 0)
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # The inline writes through-rows directly, which sends no m2m_changed.
+        QuestionSet.objects.filter(pk=form.instance.pk).refresh_stats()
@@ -0,0 +1,28 @@
+# apps/tests/management/commands/refresh_question_set_stats.py
+from django.core.management.base import BaseCommand
+
+from apps.tests.models.question import QuestionSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill/repair QuestionSet.questions_count and question_type "
+        "(e.g. after raw bulk imports into the through table)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Question sets updated per statement.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        ids = list(QuestionSet.objects.order_by("pk").values_list("pk", flat=True))
+        updated = 0
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start : start + batch_size]
+            updated += QuestionSet.objects.filter(pk__in=chunk).refresh_stats()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {updated} question set(s)."))
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+# (through table, parent column, max rows per parent)
+LIMITS = (
+    ("listening_sections", "listening_id", 4),
+    ("listening_section_questions_set", "listeningsection_id", 4),
+    ("reading_passages", "reading_id", 3),
+    ("reading_passage_questions_set", "readingpassage_id", 3),
+)
+
+CREATE_FUNCTION = """
+CREATE OR REPLACE FUNCTION tests_m2m_limit() RETURNS trigger AS $$
+DECLARE
+    parent_col text := TG_ARGV[0];
+    max_rows integer := TG_ARGV[1]::integer;
+    parent_id bigint;
+    n integer;
+BEGIN
+    EXECUTE format('SELECT ($1).%I', parent_col) INTO parent_id USING NEW;
+    EXECUTE format(
+        'SELECT count(*) FROM %I.%I WHERE %I = $1',
+        TG_TABLE_SCHEMA, TG_TABLE_NAME, parent_col
+    ) INTO n USING parent_id;
+    IF n > max_rows THEN
+        RAISE EXCEPTION '%: maximum % rows per % (got %)',
+            TG_TABLE_NAME, max_rows, parent_col, n
+            USING ERRCODE = 'check_violation';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def _create_triggers():
+    return "\n".join(
+        f"CREATE TRIGGER {table}_limit AFTER INSERT ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION tests_m2m_limit('{column}', '{limit}');"
+        for table, column, limit in LIMITS
+    )
+
+
+def _drop_triggers():
+    return "\n".join(
+        f"DROP TRIGGER IF EXISTS {table}_limit ON {table};" for table, _, _ in LIMITS
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests", "0009_alter_listeningsection_name"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=CREATE_FUNCTION,
+            reverse_sql="DROP FUNCTION IF EXISTS tests_m2m_limit();",
+        ),
+        migrations.RunSQL(sql=_create_triggers(), reverse_sql=_drop_triggers()),
+    ]
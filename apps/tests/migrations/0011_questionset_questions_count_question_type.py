@@ -0,0 +1,69 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:21
+
+from django.db import migrations, models
+
+BACKFILL = """
+UPDATE tests_questionset s
+SET questions_count = (
+        SELECT count(*) FROM tests_questionset_questions l
+        WHERE l.questionset_id = s.id
+    ),
+    question_type = (
+        SELECT q.question_type
+        FROM tests_questionset_questions l
+        JOIN questions q ON q.id = l.question_id
+        WHERE l.questionset_id = s.id
+        ORDER BY l.id
+        LIMIT 1
+    );
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests", "0010_content_structure_triggers"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="questionset",
+            name="question_type",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("R_YES_NO_NOT_GIVEN", "Reading: Yes/No/Not Given"),
+                    ("R_TRUE_FALSE_NOT_GIVEN", "Reading: True/False/Not Given"),
+                    ("R_MULTIPLE_CHOICE", "Reading: Multiple Choice"),
+                    ("R_MATCHING_INFORMATION", "Reading: Matching Information"),
+                    ("R_MATCHING_HEADINGS", "Reading: Matching Headings"),
+                    ("R_MATCHING_FEATURES", "Reading: Matching Features"),
+                    (
+                        "R_MATCHING_SENTENCE_ENDINGS",
+                        "Reading: Matching Sentence Endings",
+                    ),
+                    ("R_SENTENCE_COMPLETION", "Reading: Sentence Completion"),
+                    ("R_SUMMARY_COMPLETION", "Reading: Summary Completion"),
+                    ("R_SHORT_ANSWER", "Reading: Short Answer"),
+                    ("R_DIAGRAM_COMPLETION", "Reading: Diagram Completion"),
+                    ("L_MULTIPLE_CHOICE", "Listening: Multiple Choice"),
+                    ("L_MATCHING_HEADINGS", "Listening: Matching Headings"),
+                    ("L_DIAGRAM_LABELLING", "Listening: Diagram Labelling"),
+                    ("L_FORM_COMPLETION", "Listening: Form Completion"),
+                    ("L_SENTENCE_COMPLETION", "Listening: Sentence Completion"),
+                    ("L_SHORT_ANSWER", "Listening: Short Answer"),
+                ],
+                db_index=True,
+                editable=False,
+                help_text="Type of the first question in the set.",
+                max_length=50,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="questionset",
+            name="questions_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(sql=BACKFILL, reverse_sql=migrations.RunSQL.noop),
+    ]
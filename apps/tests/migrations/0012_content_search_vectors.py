@@ -0,0 +1,73 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:22
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests", "0011_questionset_questions_count_question_type"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="question",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector(
+                    "text", config="english"
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name="readingpassage",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.SearchVector(
+                        "name", config="english", weight="A"
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "passage", config="english", weight="B"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("english"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name="tasktwo",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector(
+                    "topic", config="english"
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="question",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="questions_search_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="readingpassage",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="reading_passage_search_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tasktwo",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="task_two_search_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests", "0012_content_search_vectors"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="test",
+            index=models.Index(fields=["created_at"], name="test_created_idx"),
+        ),
+    ]
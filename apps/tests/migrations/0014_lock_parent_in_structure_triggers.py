@@ -0,0 +1,68 @@
+from django.db import migrations
+
+# (through table, parent column, parent table, max rows per parent)
+LIMITS = (
+    ("listening_sections", "listening_id", "listening", 4),
+    ("listening_section_questions_set", "listeningsection_id", "listening_section", 4),
+    ("reading_passages", "reading_id", "reading", 3),
+    ("reading_passage_questions_set", "readingpassage_id", "reading_passage", 3),
+)
+
+# The count in 0010 ran without a lock: two transactions adding rows to the
+# same parent each saw only their own and both committed. Locking the parent
+# row first serializes them; under READ COMMITTED the count that follows
+# takes a fresh snapshot and so sees the rows of the transaction it waited
+# for. NO KEY UPDATE is enough to exclude other writers of this trigger and
+# does not conflict with the KEY SHARE locks taken by foreign key checks.
+CREATE_FUNCTION = """
+CREATE OR REPLACE FUNCTION tests_m2m_limit() RETURNS trigger AS $$
+DECLARE
+    parent_col text := TG_ARGV[0];
+    max_rows integer := TG_ARGV[1]::integer;
+    parent_table text := TG_ARGV[2];
+    parent_id bigint;
+    n integer;
+BEGIN
+    EXECUTE format('SELECT ($1).%I', parent_col) INTO parent_id USING NEW;
+    IF parent_table IS NOT NULL THEN
+        EXECUTE format(
+            'SELECT 1 FROM %I.%I WHERE id = $1 FOR NO KEY UPDATE',
+            TG_TABLE_SCHEMA, parent_table
+        ) USING parent_id;
+    END IF;
+    EXECUTE format(
+        'SELECT count(*) FROM %I.%I WHERE %I = $1',
+        TG_TABLE_SCHEMA, TG_TABLE_NAME, parent_col
+    ) INTO n USING parent_id;
+    IF n > max_rows THEN
+        RAISE EXCEPTION '%: maximum % rows per % (got %)',
+            TG_TABLE_NAME, max_rows, parent_col, n
+            USING ERRCODE = 'check_violation';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def _triggers(with_parent: bool):
+    return "\n".join(
+        f"DROP TRIGGER IF EXISTS {table}_limit ON {table};\n"
+        f"CREATE TRIGGER {table}_limit AFTER INSERT ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION tests_m2m_limit('{column}', '{limit}'"
+        + (f", '{parent}');" if with_parent else ");")
+        for table, column, parent, limit in LIMITS
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests", "0013_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        # the function keeps working with the old two-argument triggers
+        migrations.RunSQL(sql=CREATE_FUNCTION, reverse_sql=migrations.RunSQL.noop),
+        migrations.RunSQL(sql=_triggers(True), reverse_sql=_triggers(False)),
+    ]
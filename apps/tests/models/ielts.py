@@ -36,6 +36,7 @@ class Test(models.Model):
         verbose_name_plural = _("Tests")
         verbose_name = _("Test")
         ordering = ["created_at"]
+        indexes = [models.Index(fields=["created_at"], name="test_created_idx")]
 
     def __str__(self):
         return self.title
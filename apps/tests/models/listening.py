@@ -1,5 +1,4 @@
 #  apps/tests/models/listening.py
-from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -15,14 +14,6 @@ class ListeningSection(models.Model):
     )
     questions_set = models.ManyToManyField(QuestionSet)
 
-    def clean(self):
-        if not self.pk:
-            return
-        if self.questions_set.count() > 4:
-            raise ValidationError(
-                f"Maximum 4 question set allowed in section {self.pk}"
-            )
-
     class Meta:
         verbose_name = _("Listening section")
         verbose_name_plural = _("Listening sections")
@@ -41,12 +32,6 @@ class Listening(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    def clean(self):
-        if not self.pk:
-            return
-        if self.sections.count() > 4:
-            raise ValidationError(f"Maximum 4 section allowed in listening {self.pk}")
-
     class Meta:
         verbose_name = _("Listening")
         verbose_name_plural = _("Listenings")
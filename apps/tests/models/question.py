@@ -1,8 +1,11 @@
 #  apps/tests/models/question.py
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from django.db.models import JSONField
+from django.db.models import Count, JSONField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 
 
 class QuestionType(models.TextChoices):
@@ -32,6 +35,11 @@ class QuestionType(models.TextChoices):
     L_SHORT_ANSWER = "L_SHORT_ANSWER", _("Listening: Short Answer")
 
 
+# Text search configuration used by the generated tsvector columns and by
+# apps/tests/search.py; changing it requires a migration of those columns.
+SEARCH_CONFIG = "english"
+
+
 def is_reading_type(t: str) -> bool:
     return t.startswith("R_")
 
@@ -65,15 +73,43 @@ class Question(models.Model):
         default=list, help_text=_("Answer key data."), null=True, blank=True
     )
 
+    search_vector = models.GeneratedField(
+        expression=SearchVector("text", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
     class Meta:
         verbose_name = _("Question")
         verbose_name_plural = _("Questions")
         db_table = "questions"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="questions_search_gin"),
+        ]
 
     def __str__(self):
         return f"{self.question_type}: {self.text[:48]}"
 
 
+class QuestionSetQuerySet(models.QuerySet):
+    def refresh_stats(self) -> int:
+        """Recompute questions_count/question_type in a single UPDATE."""
+        links = QuestionSet.questions.through.objects.filter(  # noqa
+            questionset_id=OuterRef("pk")
+        )
+        count_sq = (
+            links.order_by()
+            .values("questionset_id")
+            .annotate(n=Count("pk"))
+            .values("n")
+        )
+        type_sq = links.order_by("pk").values("question__question_type")[:1]
+        return self.update(
+            questions_count=Coalesce(Subquery(count_sq), Value(0)),
+            question_type=Subquery(type_sq),
+        )
+
+
 class QuestionSet(models.Model):
     name = models.CharField(
         max_length=127,
@@ -85,12 +121,29 @@ class QuestionSet(models.Model):
         help_text=_("Questions included in this set (aim for 10–15)."),
     )
 
+    # Denormalised from `questions`; maintained by apps/tests/signals_m2m.py
+    questions_count = models.PositiveIntegerField(default=0, editable=False)
+    question_type = models.CharField(
+        max_length=50,
+        choices=QuestionType.choices,  # type: ignore[attr-defined]
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text=_("Type of the first question in the set."),
+    )
+
+    objects = QuestionSetQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Question set")
         verbose_name_plural = _("Question sets")
 
     def __str__(self):
-        return f"{self.name} {self.questions.first().question_type}"
+        return f"{self.name} {self.question_type or ''}".rstrip()
+
+    def _prefetched_questions(self):
+        return getattr(self, "_prefetched_objects_cache", {}).get("questions")
 
     @staticmethod
     def _validate_uniform_question_type_from_types(type_values: set):
@@ -102,7 +155,13 @@ class QuestionSet(models.Model):
             )
 
     def validate_uniform_question_type(self):
-        types = set(self.questions.values_list("question_type", flat=True))
+        prefetched = self._prefetched_questions()
+        if prefetched is not None:
+            types = {q.question_type for q in prefetched}
+        else:
+            types = set(
+                self.questions.values_list("question_type", flat=True).distinct()
+            )
         self._validate_uniform_question_type_from_types(types)
 
     def clean(self):
@@ -1,9 +1,10 @@
 #  apps/tests/models/reading.py
-from django.core.exceptions import ValidationError
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
-from .question import QuestionSet
+from .question import QuestionSet, SEARCH_CONFIG
 
 
 class ReadingPassage(models.Model):
@@ -11,18 +12,22 @@ class ReadingPassage(models.Model):
     passage = models.TextField()
     questions_set = models.ManyToManyField(QuestionSet)
 
-    def clean(self):
-        if not self.pk:
-            return
-        if self.questions_set.count() > 3:
-            raise ValidationError(
-                f"Maximum 3 question sets allowed in passage {self.pk}"
-            )
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("name", weight="A", config=SEARCH_CONFIG)
+            + SearchVector("passage", weight="B", config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = _("Reading passage")
         verbose_name_plural = _("Reading passages")
         db_table = "reading_passage"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="reading_passage_search_gin"),
+        ]
 
     def __str__(self):
         return self.name
@@ -35,12 +40,6 @@ class Reading(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    def clean(self):
-        if not self.pk:
-            return
-        if self.passages.count() > 3:
-            raise ValidationError(f"Maximum 3 passages allowed in reading {self.pk}")
-
     class Meta:
         verbose_name = _("Reading")
         verbose_name_plural = _("Readings")
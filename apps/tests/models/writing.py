@@ -1,11 +1,21 @@
 # apps/tests/models/writing.py
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from .question import SEARCH_CONFIG
+
 
 class TaskTwo(models.Model):
     topic = models.CharField(max_length=255)
 
+    search_vector = models.GeneratedField(
+        expression=SearchVector("topic", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
     def __str__(self):
         return f"WT2 {self.topic}"
 
@@ -13,6 +23,9 @@ class TaskTwo(models.Model):
         verbose_name = _("Task Two")
         verbose_name_plural = _("Task Two")
         db_table = "task_two"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="task_two_search_gin"),
+        ]
 
 
 class TaskOne(TaskTwo):
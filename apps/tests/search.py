@@ -0,0 +1,87 @@
+# apps/tests/search.py
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, NamedTuple
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import models
+from django.db.models import F, Q
+
+from .models.question import Question, SEARCH_CONFIG
+from .models.reading import ReadingPassage
+from .models.writing import TaskTwo
+
+MAX_LIMIT = 50
+HEADLINE_OPTIONS = {
+    "start_sel": "<mark>",
+    "stop_sel": "</mark>",
+    "max_words": 35,
+    "min_words": 15,
+    "max_fragments": 2,
+}
+
+
+class SearchTarget(NamedTuple):
+    model: type[models.Model]
+    text_field: str
+    title_field: str
+
+
+TARGETS: Dict[str, SearchTarget] = {
+    "question": SearchTarget(Question, "text", "question_type"),
+    "passage": SearchTarget(ReadingPassage, "passage", "name"),
+    "topic": SearchTarget(TaskTwo, "topic", "topic"),
+}
+
+
+def build_search_query(term: str) -> SearchQuery:
+    # websearch syntax: "quoted phrases", OR, -excluded
+    return SearchQuery(term, search_type="websearch", config=SEARCH_CONFIG)
+
+
+def search_queryset(kind: str, term: str, *, highlight: bool = True):
+    target = TARGETS[kind]
+    query = build_search_query(term)
+    qs = (
+        target.model.objects.filter(search_vector=query)  # noqa
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "pk")
+    )
+    if highlight:
+        # Postgres evaluates ts_headline after ORDER BY/LIMIT, so only the
+        # returned page pays for it.
+        qs = qs.annotate(
+            headline=SearchHeadline(
+                target.text_field, query, config=SEARCH_CONFIG, **HEADLINE_OPTIONS
+            )
+        )
+    return qs.only("pk", target.title_field)
+
+
+def search_content(
+    term: str, *, kinds: Iterable[str] | None = None, limit: int = 20
+) -> Dict[str, List[Dict[str, Any]]]:
+    limit = max(1, min(limit, MAX_LIMIT))
+    kinds = [k for k in (kinds or TARGETS) if k in TARGETS]
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    for kind in kinds:
+        title_field = TARGETS[kind].title_field
+        results[kind] = [
+            {
+                "id": obj.pk,
+                "title": getattr(obj, title_field),
+                "rank": round(obj.rank, 6),
+                "headline": obj.headline,
+            }
+            for obj in search_queryset(kind, term)[:limit]
+        ]
+    return results
+
+
+def search_filter(lookups: Iterable[str], term: str) -> Q:
+    """OR of ``<lookup>=<query>`` conditions for the given tsvector lookups."""
+    query = build_search_query(term)
+    cond = Q()
+    for lookup in lookups:
+        cond |= Q(**{lookup: query})
+    return cond
@@ -22,11 +22,9 @@ class QuestionSerializer(serializers.ModelSerializer):
 
 
 class QuestionSetSummarySerializer(serializers.ModelSerializer):
-    questions_count = serializers.IntegerField(read_only=True)
-
     class Meta:
         model = QuestionSet
-        fields = ["id", "name", "questions_count"]
+        fields = ["id", "name", "question_type", "questions_count"]
 
 
 class QuestionSetDetailSerializer(serializers.ModelSerializer):
@@ -117,3 +115,21 @@ class TestDetailSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+
+
+class ContentSearchHitSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    rank = serializers.FloatField()
+    headline = serializers.CharField()
+
+
+class ContentSearchResultsSerializer(serializers.Serializer):
+    question = ContentSearchHitSerializer(many=True, required=False)
+    passage = ContentSearchHitSerializer(many=True, required=False)
+    topic = ContentSearchHitSerializer(many=True, required=False)
+
+
+class ContentSearchResponseSerializer(serializers.Serializer):
+    q = serializers.CharField()
+    results = ContentSearchResultsSerializer()
@@ -1,6 +1,6 @@
 # apps/tests/signals.py
 from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_delete, post_delete
 from django.dispatch import receiver
 
 from .models import (
@@ -12,6 +12,8 @@ from .models import (
     Writing,
     TaskOne,
     TaskTwo,
+    Question,
+    QuestionSet,
 )
 
 
@@ -48,3 +50,24 @@ def create_sections_for_test(sender, instance: Test, created, **kwargs):
         Test.objects.filter(pk=instance.pk).update(
             listening=listening, reading=reading, writing=writing
         )
+
+
+@receiver(post_save, sender=Question)
+def refresh_sets_on_question_change(sender, instance: Question, created, **kwargs):
+    update_fields = kwargs.get("update_fields")
+    if created or (update_fields and "question_type" not in update_fields):
+        return
+    QuestionSet.objects.filter(questions=instance).refresh_stats()
+
+
+@receiver(pre_delete, sender=Question)
+def remember_sets_of_deleted_question(sender, instance: Question, **kwargs):
+    # The through rows are removed by the cascade, which sends no m2m_changed.
+    instance._deleted_set_ids = list(instance.sets.values_list("pk", flat=True))  # noqa
+
+
+@receiver(post_delete, sender=Question)
+def refresh_sets_on_question_delete(sender, instance: Question, **kwargs):
+    set_ids = getattr(instance, "_deleted_set_ids", None)
+    if set_ids:
+        QuestionSet.objects.filter(pk__in=set_ids).refresh_stats()
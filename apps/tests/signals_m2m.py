@@ -1,51 +1,36 @@
 # apps/tests/signals_m2m.py
-from django.core.exceptions import ValidationError
 from django.db.models.signals import m2m_changed
 from django.dispatch import receiver
 
-from .models.listening import Listening, ListeningSection
-from .models.reading import Reading, ReadingPassage
-
-
-@receiver(m2m_changed, sender=Listening.sections.through)
-def limit_listening_sections(sender, instance: Listening, action, pk_set, **kwargs):
-    if action == "pre_add":
-        incoming = len(pk_set or [])
-        if instance.sections.count() + incoming > 4:
-            raise ValidationError(
-                "Listening ichida maksimal 4 ta section bo‘lishi mumkin."
-            )
-
-
-@receiver(m2m_changed, sender=ListeningSection.questions_set.through)
-def limit_section_question_sets(
-    sender, instance: ListeningSection, action, pk_set, **kwargs
-):
-    if action == "pre_add":
-        incoming = len(pk_set or [])
-        if instance.questions_set.count() + incoming > 4:
-            raise ValidationError(
-                "Section ichida maksimal 4 ta question set bo‘lishi mumkin."
-            )
-
-
-@receiver(m2m_changed, sender=Reading.passages.through)
-def limit_reading_passages(sender, instance: Reading, action, pk_set, **kwargs):
-    if action == "pre_add":
-        incoming = len(pk_set or [])
-        if instance.passages.count() + incoming > 3:
-            raise ValidationError(
-                "Reading ichida maksimal 3 ta passage bo‘lishi mumkin."
-            )
-
-
-@receiver(m2m_changed, sender=ReadingPassage.questions_set.through)
-def limit_passage_question_sets(
-    sender, instance: ReadingPassage, action, pk_set, **kwargs
-):
-    if action == "pre_add":
-        incoming = len(pk_set or [])
-        if instance.questions_set.count() + incoming > 3:
-            raise ValidationError(
-                "Passage ichida maksimal 3 ta question set bo‘lishi mumkin."
-            )
+from .models.question import QuestionSet
+from .validators import LIMITS_BY_THROUGH, validate_relation_size
+
+
+@receiver(m2m_changed)
+def limit_content_relations(sender, action, pk_set, reverse, **kwargs):
+    # Only the incoming batch is checked here (no query); the total per parent
+    # is enforced by the database triggers in 0010_content_structure_triggers.
+    rule = LIMITS_BY_THROUGH.get(sender)
+    if rule is None or action != "pre_add" or reverse:
+        return
+    validate_relation_size(rule, len(pk_set or ()))
+
+
+@receiver(m2m_changed, sender=QuestionSet.questions.through)
+def refresh_question_set_stats(sender, instance, action, reverse, pk_set, **kwargs):
+    # Runs inside the atomic block of add()/remove()/clear(), so the counters
+    # commit or roll back together with the relation change.
+    if not reverse:
+        set_ids = {instance.pk}
+    elif action == "pre_clear":
+        instance._cleared_set_ids = list(  # noqa
+            instance.sets.values_list("pk", flat=True)
+        )
+        return
+    elif action == "post_clear":
+        set_ids = set(getattr(instance, "_cleared_set_ids", ()))
+    else:
+        set_ids = set(pk_set or ())
+
+    if action in {"post_add", "post_remove", "post_clear"} and set_ids:
+        QuestionSet.objects.filter(pk__in=set_ids).refresh_stats()
@@ -1,3 +1,130 @@
-from django.test import TestCase
+# apps/tests/tests.py
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from apps.users.models import User
+from .models import Question, QuestionSet, QuestionType, Reading, ReadingPassage
+from .validators import (
+    PASSAGE_QUESTION_SETS,
+    READING_PASSAGES,
+    relation_limit_errors,
+    validate_content_graph,
+    validate_question_set_graph,
+)
+
+
+def _passages(n: int):
+    return [
+        ReadingPassage.objects.create(name=f"P{i}", passage="text") for i in range(n)
+    ]
+
+
+def _question_set(qtype: str) -> QuestionSet:
+    qs = QuestionSet.objects.create(name=qtype)
+    qs.questions.add(Question.objects.create(text="q", question_type=qtype))
+    return qs
+
+
+class ContentGraphTests(TestCase):
+    def test_batch_is_checked_against_existing_rows(self):
+        reading = Reading.objects.create()
+        passages = _passages(4)
+        reading.passages.add(*passages[:2])
+
+        with self.assertNumQueries(1):
+            validate_content_graph({READING_PASSAGES: {reading.pk: [passages[2].pk]}})
+        with self.assertNumQueries(1), self.assertRaises(ValidationError):
+            validate_content_graph(
+                {READING_PASSAGES: {reading.pk: [p.pk for p in passages[2:]]}}
+            )
+        # a new parent has nothing linked yet
+        with self.assertNumQueries(0):
+            validate_content_graph(
+                {PASSAGE_QUESTION_SETS: {None: [1, 2, 3]}},
+            )
+
+    def test_question_types_must_stay_uniform(self):
+        tfng = _question_set(QuestionType.R_TRUE_FALSE_NOT_GIVEN)
+        other = Question.objects.create(
+            text="q", question_type=QuestionType.R_MULTIPLE_CHOICE
+        )
+        same = Question.objects.create(
+            text="q", question_type=QuestionType.R_TRUE_FALSE_NOT_GIVEN
+        )
+        validate_question_set_graph({tfng.pk: [same.pk]})
+        with self.assertRaises(ValidationError):
+            validate_question_set_graph({tfng.pk: [other.pk]})
+        # replace: the incoming questions are the whole new content
+        validate_question_set_graph({tfng.pk: [other.pk]}, replace=True)
+
+
+class RelationLimitAdminTests(TestCase):
+    def setUp(self):
+        admin_user = User.objects.create_superuser(
+            fullname="admin", phone_number="+998060000001", password="x"
+        )
+        self.client.force_login(admin_user)
+        self.passage = ReadingPassage.objects.create(name="P", passage="text")
+        self.sets = [_question_set(QuestionType.R_SHORT_ANSWER) for _ in range(4)]
+        self.passage.questions_set.add(*self.sets[:2])
+
+    def test_trigger_rejection_renders_the_submitted_form(self):
+        url = reverse("admin:tests_readingpassage_change", args=[self.passage.pk])
+        data = {
+            "name": "Renamed",
+            "passage": "text",
+            "questions_set": [s.pk for s in self.sets],
+        }
+        # as if another admin linked the sets after the form check passed
+        with mock.patch("apps.tests.admin.validate_relation_size"):
+            response = self.client.post(url, data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, PASSAGE_QUESTION_SETS.message)
+        self.assertContains(response, "Renamed")  # the input is kept
+        self.passage.refresh_from_db()
+        self.assertEqual(self.passage.name, "P")
+        self.assertEqual(self.passage.questions_set.count(), 2)
+
+
+class StructureTriggerLockTests(TransactionTestCase):
+    def test_concurrent_adds_cannot_exceed_the_limit(self):
+        reading = Reading.objects.create()
+        passages = _passages(4)
+        reading.passages.add(*passages[:2])
+        inserted = threading.Event()
+        errors = []
+
+        def first():
+            try:
+                with transaction.atomic():
+                    reading.passages.add(passages[2])
+                    inserted.set()
+                    time.sleep(0.3)  # the second insert is waiting meanwhile
+            finally:
+                connection.close()
+
+        def second():
+            inserted.wait(5)
+            try:
+                with relation_limit_errors():
+                    reading.passages.add(passages[3])
+            except ValidationError as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual([e.messages for e in errors], [[READING_PASSAGES.message]])
+        self.assertEqual(reading.passages.count(), 3)
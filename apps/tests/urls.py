@@ -1,10 +1,19 @@
 # apps/tests/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TestViewSet, QuestionSetViewSet
+from .views import (
+    TestViewSet,
+    QuestionSetViewSet,
+    ContentSearchView,
+    TestDetailView,
+)
 
 router = DefaultRouter()
 router.register(r"", TestViewSet, basename="tests")
 router.register(r"question-sets", QuestionSetViewSet, basename="question-sets")
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("search/", ContentSearchView.as_view(), name="content-search"),
+    path("<int:pk>/", TestDetailView.as_view(), name="tests-detail"),
+    path("", include(router.urls)),
+]
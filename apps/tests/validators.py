@@ -0,0 +1,190 @@
+# apps/tests/validators.py
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional, Set
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+
+from .models.listening import Listening, ListeningSection
+from .models.question import Question, QuestionSet
+from .models.reading import Reading, ReadingPassage
+
+
+class RelationLimit(NamedTuple):
+    field: models.ManyToManyField
+    limit: int
+    message: str
+
+    @property
+    def through(self):
+        return self.field.remote_field.through
+
+    @property
+    def source_column(self) -> str:
+        return self.field.m2m_column_name()
+
+    @property
+    def target_column(self) -> str:
+        return self.field.m2m_reverse_name()
+
+
+# Same limits are enforced in the database by the triggers from
+# migrations 0010/0014 (content structure triggers); keep both in sync.
+LISTENING_SECTIONS = RelationLimit(
+    Listening._meta.get_field("sections"),  # noqa
+    4,
+    "Listening ichida maksimal 4 ta section bo‘lishi mumkin.",
+)
+SECTION_QUESTION_SETS = RelationLimit(
+    ListeningSection._meta.get_field("questions_set"),  # noqa
+    4,
+    "Section ichida maksimal 4 ta question set bo‘lishi mumkin.",
+)
+READING_PASSAGES = RelationLimit(
+    Reading._meta.get_field("passages"),  # noqa
+    3,
+    "Reading ichida maksimal 3 ta passage bo‘lishi mumkin.",
+)
+PASSAGE_QUESTION_SETS = RelationLimit(
+    ReadingPassage._meta.get_field("questions_set"),  # noqa
+    3,
+    "Passage ichida maksimal 3 ta question set bo‘lishi mumkin.",
+)
+
+RELATION_LIMITS = (
+    LISTENING_SECTIONS,
+    SECTION_QUESTION_SETS,
+    READING_PASSAGES,
+    PASSAGE_QUESTION_SETS,
+)
+LIMITS_BY_THROUGH = {rule.through: rule for rule in RELATION_LIMITS}
+LIMITS_BY_TABLE = {rule.through._meta.db_table: rule for rule in RELATION_LIMITS}
+
+
+def validate_relation_size(rule: RelationLimit, size: int) -> None:
+    if size > rule.limit:
+        raise ValidationError(rule.message)
+
+
+def existing_children(
+    rule: RelationLimit, source_ids: Iterable
+) -> Dict[object, Set[object]]:
+    """One query over the through table for all parents at once."""
+    source_ids = set(source_ids)
+    if not source_ids:
+        return {}
+    rows = rule.through.objects.filter(  # noqa
+        **{f"{rule.source_column}__in": source_ids}
+    ).values_list(rule.source_column, rule.target_column)
+    children: Dict[object, Set[object]] = defaultdict(set)
+    for source_id, target_id in rows:
+        children[source_id].add(target_id)
+    return children
+
+
+def validate_relation_graph(
+    rule: RelationLimit,
+    candidate: Mapping[object, Iterable],
+    *,
+    replace: bool = False,
+) -> None:
+    """
+    ``candidate`` maps parent pk -> child pks that are about to be linked.
+    With ``replace=True`` the candidate sets are the complete new contents
+    (admin form / ``set()`` semantics) and no query is made at all.
+    """
+    candidate = {pk: set(ids) for pk, ids in candidate.items()}
+    if replace:
+        for ids in candidate.values():
+            validate_relation_size(rule, len(ids))
+        return
+
+    current = existing_children(rule, [pk for pk in candidate if pk is not None])
+    for pk, ids in candidate.items():
+        validate_relation_size(rule, len(current.get(pk, set()) | ids))
+
+
+def question_types_for(question_ids: Iterable) -> Dict[object, str]:
+    question_ids = set(question_ids)
+    if not question_ids:
+        return {}
+    return dict(
+        Question.objects.filter(pk__in=question_ids).values_list(  # noqa
+            "pk", "question_type"
+        )
+    )
+
+
+def validate_question_set_graph(
+    candidate: Mapping[object, Iterable], *, replace: bool = False
+) -> None:
+    """
+    Uniform ``question_type`` check for many question sets: one query for the
+    already linked types (skipped when ``replace``) and one for the incoming
+    questions.
+    """
+    candidate = {pk: set(ids) for pk, ids in candidate.items()}
+    incoming_types = question_types_for(
+        q_id for ids in candidate.values() for q_id in ids
+    )
+
+    existing: Dict[object, Set[str]] = defaultdict(set)
+    saved_pks = [pk for pk in candidate if pk is not None]
+    if not replace and saved_pks:
+        rows = (
+            QuestionSet.questions.through.objects.filter(  # noqa
+                questionset_id__in=saved_pks
+            )
+            .values_list("questionset_id", "question__question_type")
+            .distinct()
+        )
+        for set_id, q_type in rows:
+            existing[set_id].add(q_type)
+
+    for pk, ids in candidate.items():
+        types = existing[pk] | {incoming_types[q] for q in ids if q in incoming_types}
+        QuestionSet._validate_uniform_question_type_from_types(types)  # noqa
+
+
+def validate_content_graph(graph: Mapping[RelationLimit, Mapping]) -> None:
+    """
+    Validate a whole import batch up front, e.g.::
+
+        validate_content_graph({
+            LISTENING_SECTIONS: {listening.pk: section_pks},
+            SECTION_QUESTION_SETS: {section.pk: set_pks, ...},
+        })
+
+    Costs one query per relation kind regardless of the number of parents.
+    """
+    for rule, candidate in graph.items():
+        validate_relation_graph(rule, candidate)
+
+
+def _violated_limit(exc: IntegrityError) -> Optional[RelationLimit]:
+    # the trigger raises check_violation with "<through table>: maximum ..."
+    cause = exc.__cause__
+    if getattr(cause, "sqlstate", None) != "23514":
+        return None
+    message = getattr(cause.diag, "message_primary", None) or ""
+    return LIMITS_BY_TABLE.get(message.partition(":")[0])
+
+
+@contextmanager
+def relation_limit_errors():
+    """
+    Wraps m2m writes: a limit rejected by the structure triggers (e.g. two admins
+    adding sections at once) is re-raised as the same ValidationError the
+    form checks raise, instead of an IntegrityError.
+    """
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError as exc:
+        rule = _violated_limit(exc)
+        if rule is None:
+            raise
+        raise ValidationError(rule.message) from exc
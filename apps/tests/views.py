@@ -1,18 +1,24 @@
 # apps/tests/views.py
-from django.db.models import Count, Prefetch
+from django.db.models import Prefetch
+from django.http import Http404
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
-from rest_framework import viewsets, mixins, permissions, filters
+from rest_framework import viewsets, mixins, permissions, filters, generics, status
+from rest_framework.response import Response
 
+from apps.core.async_views import AsyncAPIView
+from apps.core.pagination import IdCursorPagination
 from apps.tests.models.ielts import Test
 from apps.tests.models.listening import ListeningSection
 from apps.tests.models.question import QuestionSet
 from apps.tests.models.reading import ReadingPassage
+from apps.tests.search import TARGETS, search_content
 from apps.tests.serializers import (
     TestListSerializer,
     TestDetailSerializer,
     QuestionSetSummarySerializer,
     QuestionSetDetailSerializer,
+    ContentSearchResponseSerializer,
 )
 
 LISTENING_PREFETCH = Prefetch(
@@ -29,6 +35,16 @@ READING_PREFETCH = Prefetch(
 )
 
 
+def test_detail_queryset():
+    return (
+        Test.objects.all()  # noqa
+        .select_related(
+            "writing__task_one", "writing__task_two", "listening", "reading"
+        )
+        .prefetch_related(LISTENING_PREFETCH, READING_PREFETCH)
+    )
+
+
 @extend_schema(
     tags=["Tests"],
     summary="IELTS testlari ro'yxati",
@@ -48,29 +64,16 @@ READING_PREFETCH = Prefetch(
         200: OpenApiResponse(response=TestListSerializer(many=True), description="OK"),
     },
 )
-class TestViewSet(
-    mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
-):
+class TestViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    # detail: the async TestDetailView below
     permission_classes = [permissions.AllowAny]
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ["created_at", "title"]
     ordering = ["-created_at"]
-    lookup_value_regex = r"\d+"
+    serializer_class = TestListSerializer
 
     def get_queryset(self):
-        base = Test.objects.all()  # noqa
-        if getattr(self, "action", None) == "list":
-            return base.only("id", "title", "price", "created_at")
-        return base.select_related(
-            "writing__task_one", "writing__task_two", "listening", "reading"
-        ).prefetch_related(LISTENING_PREFETCH, READING_PREFETCH)
-
-    def get_serializer_class(self):
-        return (
-            TestListSerializer
-            if getattr(self, "action", None) == "list"
-            else TestDetailSerializer
-        )
+        return Test.objects.only("id", "title", "price", "created_at")  # noqa
 
     @extend_schema(
         responses={
@@ -82,14 +85,26 @@ class TestViewSet(
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
-    @extend_schema(
-        responses={
-            200: OpenApiResponse(response=TestDetailSerializer, description="OK"),
-            404: OpenApiResponse(description="Not Found"),
-        }
-    )
-    def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+
+@extend_schema(
+    tags=["Tests"],
+    summary="IELTS testi (listening, reading, writing bilan)",
+    responses={
+        200: OpenApiResponse(response=TestDetailSerializer, description="OK"),
+        404: OpenApiResponse(description="Not Found"),
+    },
+)
+class TestDetailView(AsyncAPIView):
+    permission_classes = [permissions.AllowAny]
+
+    async def get(self, request, pk: int):
+        # Select/prefetch run inside afirst(), so the serializer below never
+        # touches the database.
+        test = await test_detail_queryset().filter(pk=pk).afirst()
+        if test is None:
+            raise Http404
+        await self.acheck_object_permissions(request, test)
+        return Response(TestDetailSerializer(test, context={"request": request}).data)
 
 
 @extend_schema(
@@ -111,11 +126,12 @@ class QuestionSetViewSet(
     mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
 ):
     permission_classes = [permissions.AllowAny]
+    pagination_class = IdCursorPagination
 
     def get_queryset(self):
         base = QuestionSet.objects.all()  # noqa
         if getattr(self, "action", None) == "list":
-            return base.annotate(questions_count=Count("questions")).only("id", "name")
+            return base.only("id", "name", "questions_count", "question_type")
         return base.prefetch_related("questions")
 
     def get_serializer_class(self):
@@ -146,3 +162,61 @@ class QuestionSetViewSet(
     def retrieve(self, request, *args, **kwargs):
 
         return super().retrieve(request, *args, **kwargs)
+
+
+@extend_schema(
+    tags=["Tests"],
+    summary="Kontent qidiruvi (savollar, passage'lar, writing topic'lar)",
+    description=(
+        "⚠️ FRONTEND uchun emas — kontent mualliflari (staff) uchun.\n\n"
+        "Postgres full-text search: natijalar `rank` bo'yicha tartiblanadi, "
+        "`headline` ichida topilgan so'zlar `<mark>` bilan belgilanadi. "
+        "`q` websearch sintaksisini qo'llaydi (\"ibora\", OR, -so'z)."
+    ),
+    parameters=[
+        OpenApiParameter(
+            name="q",
+            type=OpenApiTypes.STR,
+            location="query",
+            required=True,
+            description="Qidiruv matni",
+        ),
+        OpenApiParameter(
+            name="type",
+            type=OpenApiTypes.STR,
+            location="query",
+            enum=list(TARGETS),
+            description="Faqat bitta tur bo'yicha qidirish (ixtiyoriy).",
+        ),
+        OpenApiParameter(
+            name="limit",
+            type=OpenApiTypes.INT,
+            location="query",
+            description="Har bir tur uchun natijalar soni (default 20, max 50).",
+        ),
+    ],
+    responses={200: ContentSearchResponseSerializer},
+)
+class ContentSearchView(generics.GenericAPIView):
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = ContentSearchResponseSerializer
+
+    def get(self, request, *args, **kwargs):
+        term = (request.query_params.get("q") or "").strip()
+        if not term:
+            return Response(
+                {"detail": "q is required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        kind = request.query_params.get("type")
+        if kind and kind not in TARGETS:
+            return Response(
+                {"detail": f"type must be one of: {', '.join(TARGETS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except (TypeError, ValueError):
+            limit = 20
+
+        results = search_content(term, kinds=[kind] if kind else None, limit=limit)
+        return Response(self.get_serializer({"q": term, "results": results}).data)
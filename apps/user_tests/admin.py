@@ -1,5 +1,9 @@
 from django.contrib import admin
-from .models import UserTest, UserAnswer, TestResult, AllTestsProxy
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, NullIf
+
+from .models import UserTest, UserAnswer, TestResult, AllTestsProxy, QuestionStat
+from .serializers import RESULT_EXPORT
 
 
 @admin.register(AllTestsProxy)
@@ -38,3 +42,51 @@ class TestResultAdmin(admin.ModelAdmin):
     )
     list_filter = ("created_at",)
     raw_id_fields = ("user_test",)
+    actions = RESULT_EXPORT.admin_actions()
+
+
+@admin.register(QuestionStat)
+class QuestionStatAdmin(admin.ModelAdmin):
+    list_display = (
+        "question",
+        "question_type",
+        "attempts",
+        "difficulty_display",
+        "discrimination",
+        "top_choices",
+        "updated_at",
+    )
+    list_filter = ("question__question_type",)
+    search_fields = ("question__text",)
+    list_select_related = ("question",)
+    ordering = ("-attempts",)
+
+    def get_queryset(self, request):
+        # p-value as a column, so the changelist can sort by it
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(p_value=Cast("correct", FloatField()) / NullIf(F("attempts"), 0))
+        )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Type", ordering="question__question_type")
+    def question_type(self, obj: QuestionStat) -> str:
+        return obj.question.question_type
+
+    @admin.display(description="Difficulty (p)", ordering="p_value")
+    def difficulty_display(self, obj: QuestionStat):
+        return obj.difficulty
+
+    @admin.display(description="Top choices")
+    def top_choices(self, obj: QuestionStat) -> str:
+        picks = sorted((obj.choices or {}).items(), key=lambda kv: -kv[1])[:4]
+        return ", ".join(f"{k}: {v}" for k, v in picks) or "—"
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class UserTestsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.user_tests"
+
+    def ready(self):
+        from . import signals  # noqa
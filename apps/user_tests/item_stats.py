@@ -0,0 +1,180 @@
+# apps/user_tests/item_stats.py
+from __future__ import annotations
+
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.tests.models.question import Question
+from .models import QuestionStat, UserAnswer, UserTest
+
+__all__ = (
+    "record_user_tests",
+    "user_test_completed",
+    "update_pending",
+    "rebuild_item_stats",
+)
+
+# Item analysis (difficulty, discrimination, distractor counts) is kept as
+# running sums in question_stats, one row per question. Each completed
+# UserTest is added exactly once: its items_analyzed_at is set by the same
+# transaction that adds its answers, either right when it is completed
+# (ITEM_STATS["LIVE"]) or by `manage.py update_item_stats`, which picks up
+# the completed tests that were not counted yet (ut_items_pending_idx).
+
+_MARK_SQL = """
+UPDATE {user_tests}
+SET items_analyzed_at = %(now)s
+WHERE id = ANY(%(ids)s::uuid[])
+  AND status = %(completed)s
+  AND items_analyzed_at IS NULL
+RETURNING id
+"""
+
+# score: the test's share of correct answers. Distractors are counted for
+# questions with options only; the answer is raw_answer->'value' or a plain
+# JSON string. Should a question still have two answers in one test (rows
+# older than the user_answers_unique trigger), the latest one counts.
+_ADD_SQL = """
+WITH a AS (
+    SELECT DISTINCT ON (ua.user_test_id, ua.question_id)
+           ua.user_test_id, ua.question_id, ua.is_correct,
+           left(coalesce(
+               ua.raw_answer ->> 'value',
+               CASE WHEN jsonb_typeof(ua.raw_answer) = 'string'
+                    THEN ua.raw_answer #>> '{{}}' END
+           ), 64) AS choice
+    FROM {answers} ua
+    WHERE ua.user_test_id = ANY(%(ids)s::uuid[]) AND ua.is_correct IS NOT NULL
+    ORDER BY ua.user_test_id, ua.question_id, ua.created_at DESC, ua.id DESC
+), t AS (
+    SELECT user_test_id, avg(is_correct::int)::float8 AS score
+    FROM a GROUP BY user_test_id
+), q AS (
+    SELECT a.question_id,
+           count(*) AS attempts,
+           count(*) FILTER (WHERE a.is_correct) AS correct,
+           sum(t.score) AS score_sum,
+           sum(t.score * t.score) AS score_sq_sum,
+           coalesce(sum(t.score) FILTER (WHERE a.is_correct), 0) AS correct_score_sum
+    FROM a JOIN t USING (user_test_id)
+    GROUP BY a.question_id
+), c AS (
+    SELECT question_id, jsonb_object_agg(choice, n) AS choices
+    FROM (
+        SELECT a.question_id, a.choice, count(*) AS n
+        FROM a JOIN {questions} qq ON qq.id = a.question_id
+        WHERE a.choice IS NOT NULL
+          AND jsonb_typeof(qq.options) = 'array'
+          AND jsonb_array_length(qq.options) > 0
+        GROUP BY a.question_id, a.choice
+    ) picks
+    GROUP BY question_id
+)
+INSERT INTO {stats} AS s (
+    question_id, attempts, correct, score_sum, score_sq_sum,
+    correct_score_sum, choices, updated_at
+)
+SELECT q.question_id, q.attempts, q.correct, q.score_sum, q.score_sq_sum,
+       q.correct_score_sum, coalesce(c.choices, '{{}}'::jsonb), %(now)s
+FROM q LEFT JOIN c USING (question_id)
+ORDER BY q.question_id
+ON CONFLICT (question_id) DO UPDATE SET
+    attempts = s.attempts + EXCLUDED.attempts,
+    correct = s.correct + EXCLUDED.correct,
+    score_sum = s.score_sum + EXCLUDED.score_sum,
+    score_sq_sum = s.score_sq_sum + EXCLUDED.score_sq_sum,
+    correct_score_sum = s.correct_score_sum + EXCLUDED.correct_score_sum,
+    choices = (
+        SELECT coalesce(jsonb_object_agg(key, total), '{{}}'::jsonb)
+        FROM (
+            SELECT key, sum(value::bigint) AS total
+            FROM (
+                SELECT * FROM jsonb_each_text(s.choices)
+                UNION ALL
+                SELECT * FROM jsonb_each_text(EXCLUDED.choices)
+            ) merged
+            GROUP BY key
+        ) totals
+    ),
+    updated_at = EXCLUDED.updated_at
+"""
+
+
+def _sql(template: str) -> str:
+    qn = connection.ops.quote_name
+    return template.format(
+        user_tests=qn(UserTest._meta.db_table),
+        answers=qn(UserAnswer._meta.db_table),
+        questions=qn(Question._meta.db_table),
+        stats=qn(QuestionStat._meta.db_table),
+    )
+
+
+@transaction.atomic
+def record_user_tests(user_test_ids: Iterable) -> int:
+    """
+    Adds the answers of completed, not yet counted UserTests to the question
+    statistics; returns how many tests were added. Safe to call twice.
+    """
+    ids = sorted({str(pk) for pk in user_test_ids})
+    if not ids:
+        return 0
+    now = timezone.now()
+    with connection.cursor() as cur:
+        cur.execute(
+            _sql(_MARK_SQL),
+            {"now": now, "ids": ids, "completed": UserTest.Status.COMPLETED},
+        )
+        marked = [pk for (pk,) in cur.fetchall()]
+        if marked:
+            cur.execute(_sql(_ADD_SQL), {"now": now, "ids": marked})
+    return len(marked)
+
+
+def user_test_completed(user_test_id) -> None:
+    """Called by UserTest.mark_completed, inside its transaction."""
+    if settings.ITEM_STATS["LIVE"]:
+        record_user_tests([user_test_id])
+
+
+def update_pending(
+    batch_size: Optional[int] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Counts every completed UserTest that is not in the statistics yet."""
+    batch_size = max(batch_size or settings.ITEM_STATS["BATCH_SIZE"], 1)
+    pending = UserTest.objects.filter(
+        status=UserTest.Status.COMPLETED, items_analyzed_at__isnull=True
+    ).order_by("completed_at")
+    total = 0
+    while True:
+        ids = list(pending.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return total
+        # 0 only if other workers counted the whole batch meanwhile
+        total += record_user_tests(ids)
+        if progress:
+            progress(total)
+
+
+def rebuild_item_stats(
+    batch_size: Optional[int] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Drops the statistics and recounts every completed UserTest."""
+    with transaction.atomic():
+        # writers update their user_tests row first and upsert question_stats
+        # after it, in one transaction; locking the tables in the same order
+        # waits for the ones half-way through instead of deadlocking with
+        # them, and holds off new ones until the marks are reset
+        with connection.cursor() as cur:
+            for table in ("{user_tests}", "{stats}"):
+                cur.execute(f"LOCK TABLE {_sql(table)} IN SHARE ROW EXCLUSIVE MODE")
+        QuestionStat.objects.all().delete()
+        UserTest.objects.filter(items_analyzed_at__isnull=False).update(
+            items_analyzed_at=None
+        )
+    return update_pending(batch_size, progress)
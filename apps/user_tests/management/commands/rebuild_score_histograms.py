@@ -0,0 +1,15 @@
+# apps/user_tests/management/commands/rebuild_score_histograms.py
+from django.core.management.base import BaseCommand
+
+from apps.user_tests.rankings import rebuild_histograms
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the band-score histograms from test_results (e.g. after "
+        "bulk imports or raw SQL edits of overall_score)."
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild_histograms()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} histogram row(s)."))
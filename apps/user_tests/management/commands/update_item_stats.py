@@ -0,0 +1,33 @@
+# apps/user_tests/management/commands/update_item_stats.py
+from django.core.management.base import BaseCommand
+
+from apps.user_tests.item_stats import rebuild_item_stats, update_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Add completed user tests that are not counted yet to the question "
+        "statistics (nightly when ITEM_STATS['LIVE'] is off). --rebuild "
+        "recounts everything."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="User tests per transaction (default ITEM_STATS['BATCH_SIZE']).",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Drop the statistics and recount every completed user test.",
+        )
+
+    def handle(self, *args, **options):
+        run = rebuild_item_stats if options["rebuild"] else update_pending
+        added = run(
+            options["batch_size"],
+            progress=lambda n: self.stdout.write(f"  {n} user test(s) counted"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Counted {added} user test(s)."))
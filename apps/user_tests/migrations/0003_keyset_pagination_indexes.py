@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests", "0013_keyset_pagination_indexes"),
+        ("user_tests", "0002_alltestsproxy_alter_testresult_options_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="usertest",
+            index=models.Index(
+                fields=["user", "created_at"], name="ut_user_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# user_answers -> range-partitioned by created_at (monthly partitions covering
+# all existing rows). Further partitions: `manage.py maintain_partitions`.
+PARTITION = """
+ALTER TABLE user_answers RENAME TO user_answers_old;
+
+CREATE TABLE user_answers
+    (LIKE user_answers_old INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+    PARTITION BY RANGE (created_at);
+CREATE TABLE user_answers_default PARTITION OF user_answers DEFAULT;
+
+DO $$
+DECLARE
+    m timestamptz := date_trunc(
+        'month', coalesce((SELECT min(created_at) FROM user_answers_old), now()), 'UTC'
+    );
+    stop timestamptz := date_trunc('month', now(), 'UTC') + interval '4 months';
+BEGIN
+    WHILE m < stop LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF user_answers FOR VALUES FROM (%L) TO (%L)',
+            'user_answers_p' || to_char(m AT TIME ZONE 'UTC', 'YYYY_MM'),
+            m, m + interval '1 month'
+        );
+        m := m + interval '1 month';
+    END LOOP;
+END $$;
+
+INSERT INTO user_answers SELECT * FROM user_answers_old;
+DROP TABLE user_answers_old;
+
+-- a primary key on a partitioned table must include the partition key
+ALTER TABLE user_answers ADD PRIMARY KEY (id, created_at);
+ALTER TABLE user_answers
+    ADD CONSTRAINT user_answers_user_test_id_e2e2d449_fk_user_tests_id
+    FOREIGN KEY (user_test_id) REFERENCES user_tests (id) DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE user_answers
+    ADD CONSTRAINT user_answers_question_id_ec2a95cc_fk_questions_id
+    FOREIGN KEY (question_id) REFERENCES questions (id) DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX ua_user_test_question_idx ON user_answers (user_test_id, question_id);
+CREATE INDEX ua_question_idx ON user_answers (question_id);
+"""
+
+UNPARTITION = """
+ALTER TABLE user_answers RENAME TO user_answers_part;
+CREATE TABLE user_answers
+    (LIKE user_answers_part INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+INSERT INTO user_answers SELECT * FROM user_answers_part;
+DROP TABLE user_answers_part;
+
+ALTER TABLE user_answers ADD PRIMARY KEY (id);
+ALTER TABLE user_answers
+    ADD CONSTRAINT user_answers_user_test_id_e2e2d449_fk_user_tests_id
+    FOREIGN KEY (user_test_id) REFERENCES user_tests (id) DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE user_answers
+    ADD CONSTRAINT user_answers_question_id_ec2a95cc_fk_questions_id
+    FOREIGN KEY (question_id) REFERENCES questions (id) DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE user_answers
+    ADD CONSTRAINT uniq_answer_per_question UNIQUE (user_test_id, question_id);
+CREATE INDEX ua_user_test_idx ON user_answers (user_test_id);
+CREATE INDEX ua_question_idx ON user_answers (question_id);
+CREATE INDEX user_answers_user_test_id_e2e2d449 ON user_answers (user_test_id);
+CREATE INDEX user_answers_question_id_ec2a95cc ON user_answers (question_id);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests", "0013_keyset_pagination_indexes"),
+        ("user_tests", "0003_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(PARTITION, reverse_sql=UNPARTITION),
+            ],
+            state_operations=[
+                migrations.RemoveConstraint(
+                    model_name="useranswer",
+                    name="uniq_answer_per_question",
+                ),
+                migrations.RemoveIndex(
+                    model_name="useranswer",
+                    name="ua_user_test_idx",
+                ),
+                migrations.AlterField(
+                    model_name="useranswer",
+                    name="question",
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="answers",
+                        to="tests.question",
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="useranswer",
+                    name="user_test",
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="answers",
+                        to="user_tests.usertest",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="useranswer",
+                    index=models.Index(
+                        fields=["user_test", "question"],
+                        name="ua_user_test_question_idx",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests", "0013_keyset_pagination_indexes"),
+        ("user_tests", "0005_uuid7_primary_keys"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuestionStat",
+            fields=[
+                (
+                    "question",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="tests.question",
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("correct", models.PositiveIntegerField(default=0)),
+                ("score_sum", models.FloatField(default=0.0)),
+                ("score_sq_sum", models.FloatField(default=0.0)),
+                ("correct_score_sum", models.FloatField(default=0.0)),
+                ("choices", models.JSONField(blank=True, default=dict)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Question statistics",
+                "verbose_name_plural": "Question statistics",
+                "db_table": "question_stats",
+            },
+        ),
+        migrations.AddField(
+            model_name="usertest",
+            name="items_analyzed_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="usertest",
+            index=models.Index(
+                condition=models.Q(
+                    ("items_analyzed_at__isnull", True), ("status", "completed")
+                ),
+                fields=["completed_at"],
+                name="ut_items_pending_idx",
+            ),
+        ),
+    ]
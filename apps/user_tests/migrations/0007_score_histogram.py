@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests", "0013_keyset_pagination_indexes"),
+        ("user_tests", "0006_item_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScoreBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.PositiveSmallIntegerField()),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "test",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="tests.test",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "score_histogram",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("test", "bucket"),
+                        name="uniq_scorehist_test_bucket",
+                        nulls_distinct=False,
+                    )
+                ],
+            },
+        ),
+    ]
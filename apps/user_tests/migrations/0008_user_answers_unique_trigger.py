@@ -0,0 +1,58 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:15
+
+from django.db import migrations
+
+# user_answers is partitioned by created_at, so UNIQUE (user_test_id,
+# question_id) cannot be declared on it any more. The trigger keeps the old
+# uniq_answer_per_question invariant: concurrent writers of the same pair are
+# serialised by a transaction-level advisory lock, and a duplicate raises
+# unique_violation, i.e. the same IntegrityError the constraint used to raise.
+CREATE_FUNCTION = """
+CREATE OR REPLACE FUNCTION user_answers_unique() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(
+        hashtextextended(NEW.user_test_id::text || NEW.question_id::text, 0)
+    );
+    IF EXISTS (
+        SELECT 1 FROM user_answers
+        WHERE user_test_id = NEW.user_test_id
+          AND question_id = NEW.question_id
+          AND id <> NEW.id
+    ) THEN
+        RAISE EXCEPTION
+            'duplicate key value violates unique constraint "uniq_answer_per_question"'
+            USING ERRCODE = 'unique_violation',
+                  CONSTRAINT = 'uniq_answer_per_question',
+                  DETAIL = format(
+                      'Key (user_test_id, question_id)=(%s, %s) already exists.',
+                      NEW.user_test_id, NEW.question_id
+                  );
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_TRIGGER = """
+CREATE TRIGGER user_answers_unique
+    BEFORE INSERT OR UPDATE OF user_test_id, question_id ON user_answers
+    FOR EACH ROW EXECUTE FUNCTION user_answers_unique();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user_tests", "0007_score_histogram"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=CREATE_FUNCTION,
+            reverse_sql="DROP FUNCTION IF EXISTS user_answers_unique();",
+        ),
+        migrations.RunSQL(
+            sql=CREATE_TRIGGER,
+            reverse_sql="DROP TRIGGER IF EXISTS user_answers_unique ON user_answers;",
+        ),
+    ]
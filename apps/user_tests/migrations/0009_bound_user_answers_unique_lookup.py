@@ -0,0 +1,78 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:55
+
+from django.db import migrations
+
+# The 0008 lookup had no created_at condition, so every insert probed the
+# (user_test_id, question_id) index of every monthly partition and got slower
+# as history grew. Answers of a UserTest can't predate it, so the lookup is
+# bounded below by user_tests.created_at (or the new row's created_at, if
+# earlier); with that bound in a parameter, runtime partition pruning skips
+# all older partitions and an insert touches the last few months only.
+CREATE_FUNCTION = """
+CREATE OR REPLACE FUNCTION user_answers_unique() RETURNS trigger AS $$
+DECLARE
+    since timestamptz;
+BEGIN
+    PERFORM pg_advisory_xact_lock(
+        hashtextextended(NEW.user_test_id::text || NEW.question_id::text, 0)
+    );
+    SELECT LEAST(created_at, NEW.created_at) INTO since
+    FROM user_tests WHERE id = NEW.user_test_id;
+    IF EXISTS (
+        SELECT 1 FROM user_answers
+        WHERE user_test_id = NEW.user_test_id
+          AND question_id = NEW.question_id
+          AND created_at >= COALESCE(since, NEW.created_at)
+          AND id <> NEW.id
+    ) THEN
+        RAISE EXCEPTION
+            'duplicate key value violates unique constraint "uniq_answer_per_question"'
+            USING ERRCODE = 'unique_violation',
+                  CONSTRAINT = 'uniq_answer_per_question',
+                  DETAIL = format(
+                      'Key (user_test_id, question_id)=(%s, %s) already exists.',
+                      NEW.user_test_id, NEW.question_id
+                  );
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# 0008's body, restored on reverse
+UNBOUNDED_FUNCTION = """
+CREATE OR REPLACE FUNCTION user_answers_unique() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(
+        hashtextextended(NEW.user_test_id::text || NEW.question_id::text, 0)
+    );
+    IF EXISTS (
+        SELECT 1 FROM user_answers
+        WHERE user_test_id = NEW.user_test_id
+          AND question_id = NEW.question_id
+          AND id <> NEW.id
+    ) THEN
+        RAISE EXCEPTION
+            'duplicate key value violates unique constraint "uniq_answer_per_question"'
+            USING ERRCODE = 'unique_violation',
+                  CONSTRAINT = 'uniq_answer_per_question',
+                  DETAIL = format(
+                      'Key (user_test_id, question_id)=(%s, %s) already exists.',
+                      NEW.user_test_id, NEW.question_id
+                  );
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user_tests", "0008_user_answers_unique_trigger"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=CREATE_FUNCTION, reverse_sql=UNBOUNDED_FUNCTION),
+    ]
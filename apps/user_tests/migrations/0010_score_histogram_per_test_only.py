@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The all-tests rows (test_id NULL) were upserted by every saved result and
+# serialized all writers; rankings.histograms() now sums the per-test rows.
+# Reverse: rebuild them from that same sum.
+DROP_GLOBAL_ROWS = "DELETE FROM score_histogram WHERE test_id IS NULL"
+
+RESTORE_GLOBAL_ROWS = """
+INSERT INTO score_histogram (test_id, bucket, count)
+SELECT NULL, bucket, sum(count) FROM score_histogram GROUP BY bucket
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests", "0014_lock_parent_in_structure_triggers"),
+        ("user_tests", "0009_bound_user_answers_unique_lookup"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=DROP_GLOBAL_ROWS, reverse_sql=RESTORE_GLOBAL_ROWS),
+        migrations.RemoveConstraint(
+            model_name="scorebucket",
+            name="uniq_scorehist_test_bucket",
+        ),
+        migrations.AlterField(
+            model_name="scorebucket",
+            name="test",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="+",
+                to="tests.test",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="scorebucket",
+            constraint=models.UniqueConstraint(
+                fields=("test", "bucket"), name="uniq_scorehist_test_bucket"
+            ),
+        ),
+    ]
@@ -1,11 +1,13 @@
 # apps/user_tests/models.py
-import uuid
+import math
 from decimal import Decimal
+from typing import Optional
 
 from django.core.validators import MinValueValidator
 from django.db import models, transaction
 from django.utils import timezone
 
+from apps.core.ids import uuid7
 from apps.tests.models.ielts import Test
 from apps.tests.models.ielts import Test as RealTest
 from apps.tests.models.question import Question
@@ -18,7 +20,7 @@ class UserTest(models.Model):
         IN_PROGRESS = "in_progress", "In progress"
         COMPLETED = "completed", "Completed"
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="user_tests")
     test = models.ForeignKey(Test, on_delete=models.CASCADE, related_name="user_tests")
 
@@ -30,6 +32,8 @@ class UserTest(models.Model):
     )
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    # set once its answers are counted in QuestionStat (apps.user_tests.item_stats)
+    items_analyzed_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     price_paid = models.DecimalField(
         max_digits=12,
@@ -51,6 +55,13 @@ class UserTest(models.Model):
         indexes = [
             models.Index(fields=["user", "status"], name="ut_user_status_idx"),
             models.Index(fields=["created_at"], name="ut_created_idx"),
+            models.Index(fields=["user", "created_at"], name="ut_user_created_idx"),
+            # completed tests whose answers are not in the item statistics yet
+            models.Index(
+                fields=["completed_at"],
+                name="ut_items_pending_idx",
+                condition=models.Q(status="completed", items_analyzed_at__isnull=True),
+            ),
         ]
 
     def __str__(self):
@@ -69,15 +80,19 @@ class UserTest(models.Model):
             self.status = self.Status.COMPLETED
             self.completed_at = timezone.now()
             self.save(update_fields=["status", "completed_at", "updated_at"])
+            from .item_stats import user_test_completed
+
+            user_test_completed(self.pk)
 
 
 class UserAnswer(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # indexed by the Meta indexes below
     user_test = models.ForeignKey(
-        UserTest, on_delete=models.CASCADE, related_name="answers"
+        UserTest, on_delete=models.CASCADE, related_name="answers", db_index=False
     )
     question = models.ForeignKey(
-        Question, on_delete=models.CASCADE, related_name="answers"
+        Question, on_delete=models.CASCADE, related_name="answers", db_index=False
     )
 
     raw_answer = models.JSONField(null=True, blank=True)
@@ -88,13 +103,13 @@ class UserAnswer(models.Model):
         db_table = "user_answers"
         verbose_name = "Answer"
         verbose_name_plural = "Answers"
-        constraints = [
-            models.UniqueConstraint(
-                fields=["user_test", "question"], name="uniq_answer_per_question"
-            )
-        ]
+        # Partitioned by created_at (monthly), so a unique constraint would
+        # have to include created_at; one answer per question is enforced by
+        # the user_answers_unique trigger instead (migrations 0008, 0009).
         indexes = [
-            models.Index(fields=["user_test"], name="ua_user_test_idx"),
+            models.Index(
+                fields=["user_test", "question"], name="ua_user_test_question_idx"
+            ),
             models.Index(fields=["question"], name="ua_question_idx"),
         ]
 
@@ -103,7 +118,7 @@ class UserAnswer(models.Model):
 
 
 class TestResult(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user_test = models.OneToOneField(
         UserTest, on_delete=models.CASCADE, related_name="result"
     )
@@ -131,6 +146,14 @@ class TestResult(models.Model):
     def __str__(self):
         return f"TestResult<{self.user_test_id}> overall={self.overall_score}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "overall_score" in instance.__dict__:
+            # old score for the histogram update in apps.user_tests.signals
+            instance._saved_overall = instance.overall_score
+        return instance
+
 
 class AllTestsProxy(RealTest):
     class Meta:
@@ -138,3 +161,87 @@ class AllTestsProxy(RealTest):
         app_label = "user_tests"
         verbose_name = "All test"
         verbose_name_plural = "All tests"
+
+
+class QuestionStat(models.Model):
+    """
+    Running item-analysis sums for one question over every completed UserTest
+    that answered it, maintained by apps.user_tests.item_stats. `score` is
+    the test's share of correctly answered questions; the sums give the
+    difficulty (p-value) and point-biserial discrimination without touching
+    user_answers.
+    """
+
+    question = models.OneToOneField(
+        Question, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0.0)
+    score_sq_sum = models.FloatField(default=0.0)
+    correct_score_sum = models.FloatField(default=0.0)  # over correct attempts
+    # choice questions only: answer -> how many picked it
+    choices = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "question_stats"
+        verbose_name = "Question statistics"
+        verbose_name_plural = "Question statistics"
+
+    def __str__(self):
+        return f"QuestionStat<{self.question_id}> p={self.difficulty}"
+
+    @property
+    def difficulty(self) -> Optional[float]:
+        """Share of correct answers (classical p-value; higher is easier)."""
+        if not self.attempts:
+            return None
+        return round(self.correct / self.attempts, 4)
+
+    @property
+    def discrimination(self) -> Optional[float]:
+        """Point-biserial correlation of this item with the test score."""
+        n, c = self.attempts, self.correct
+        if not n or c in (0, n):
+            return None
+        mean = self.score_sum / n
+        var = self.score_sq_sum / n - mean * mean
+        if var <= 1e-12:
+            return None
+        mean_correct = self.correct_score_sum / c
+        mean_wrong = (self.score_sum - self.correct_score_sum) / (n - c)
+        p = c / n
+        r = (mean_correct - mean_wrong) / math.sqrt(var) * math.sqrt(p * (1 - p))
+        return round(r, 4)
+
+
+class ScoreBucket(models.Model):
+    """
+    Number of results of one test with overall_score in one band bucket (0,
+    0.5 ... 9). Maintained by apps.user_tests.rankings whenever a result's
+    overall_score changes, so percentiles and leaderboard cut-offs never scan
+    test_results; the all-tests histogram is their sum. No database FK: a
+    deleted test's rows are left behind until the next rebuild.
+    """
+
+    test = models.ForeignKey(
+        Test,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    bucket = models.PositiveSmallIntegerField()  # band * 2
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "score_histogram"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["test", "bucket"],
+                name="uniq_scorehist_test_bucket",
+            )
+        ]
+
+    def __str__(self):
+        return f"ScoreBucket<{self.test_id}> {self.bucket / 2}: {self.count}"
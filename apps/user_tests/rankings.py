@@ -0,0 +1,158 @@
+# apps/user_tests/rankings.py
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .models import ScoreBucket, TestResult, UserTest
+
+__all__ = (
+    "BUCKETS",
+    "bucket",
+    "record_score",
+    "histograms",
+    "percentile",
+    "cutoff",
+    "leaderboard",
+    "rebuild_histograms",
+)
+
+# Band-score histograms: overall_score rounded to the nearest half band
+# (x.25 -> x.5, x.75 -> x+1), 19 buckets from 0 to 9. One row per (test,
+# bucket); a result moving between buckets is two deltas upserted in the
+# transaction that saves it. There is no stored all-tests row: every saved
+# result would update it, serializing all writers on 19 rows, so it is summed
+# from the per-test rows when read. Percentiles and the score cut-off of a
+# top-N list are then a walk over 19 counts.
+
+BUCKETS = 19
+
+Histogram = List[int]  # count per bucket
+
+_UPSERT_SQL = """
+INSERT INTO {histogram} AS h (test_id, bucket, count)
+SELECT ut.test_id, d.bucket, d.delta
+FROM (VALUES {values}) AS d(bucket, delta)
+CROSS JOIN (SELECT test_id FROM {user_tests} WHERE id = %s) AS ut
+ORDER BY 2
+ON CONFLICT (test_id, bucket) DO UPDATE SET count = h.count + EXCLUDED.count
+"""
+
+_HISTOGRAMS_SQL = """
+SELECT NULL, bucket, sum(count) FROM {histogram} GROUP BY bucket
+UNION ALL
+SELECT test_id, bucket, count FROM {histogram} WHERE test_id = ANY(%s)
+"""
+
+
+def bucket(score: Optional[float]) -> Optional[int]:
+    if score is None or math.isnan(score):
+        return None
+    return min(max(math.floor(score * 2 + 0.5), 0), BUCKETS - 1)
+
+
+def record_score(user_test_id, old: Optional[float], new: Optional[float]) -> None:
+    """
+    Moves one result between buckets (old=None: new result, new=None: result
+    deleted or its score cleared). Must run inside the saving transaction.
+    """
+    deltas: Dict[int, int] = {}
+    for b, d in ((bucket(old), -1), (bucket(new), 1)):
+        if b is not None:
+            deltas[b] = deltas.get(b, 0) + d
+    items = sorted((b, d) for b, d in deltas.items() if d)
+    if not items:
+        return
+    qn = connection.ops.quote_name
+    sql = _UPSERT_SQL.format(
+        histogram=qn(ScoreBucket._meta.db_table),
+        user_tests=qn(UserTest._meta.db_table),
+        values=", ".join(["(%s::smallint, %s::int)"] * len(items)),
+    )
+    with connection.cursor() as cur:
+        cur.execute(sql, [p for item in items for p in item] + [str(user_test_id)])
+
+
+def histograms(test_ids: Iterable = ()) -> Dict[Optional[int], Histogram]:
+    """Global histogram (key None) plus one per test id, in a single query."""
+    test_ids = {int(pk) for pk in test_ids}
+    result: Dict[Optional[int], Histogram] = {
+        key: [0] * BUCKETS for key in (None, *test_ids)
+    }
+    sql = _HISTOGRAMS_SQL.format(
+        histogram=connection.ops.quote_name(ScoreBucket._meta.db_table)
+    )
+    with connection.cursor() as cur:
+        cur.execute(sql, [list(test_ids)])
+        for test_id, b, count in cur.fetchall():
+            if b < BUCKETS:
+                result[test_id][b] = max(int(count), 0)
+    return result
+
+
+def percentile(hist: Histogram, score: Optional[float]) -> Optional[float]:
+    """Share of results below `score`, counting its own bucket as half (0-100)."""
+    b = bucket(score)
+    total = sum(hist)
+    if b is None or not total:
+        return None
+    below = sum(hist[:b])
+    return round(100.0 * (below + hist[b] / 2) / total, 1)
+
+
+def cutoff(hist: Histogram, n: int) -> Optional[float]:
+    """Lowest score that can still be in the top `n` (None: any score)."""
+    seen = 0
+    for b in range(BUCKETS - 1, 0, -1):
+        seen += hist[b]
+        if seen >= n:
+            return b / 2 - 0.25
+    return None
+
+
+def leaderboard(test_id=None, limit: int = 10) -> Tuple[Histogram, List[TestResult]]:
+    """Histogram and the best `limit` results, of one test or of all tests."""
+    hist = histograms([test_id] if test_id is not None else ())[test_id]
+    if not sum(hist):
+        return hist, []
+    # the cut-off keeps the tr_overall_idx range to about `limit` rows
+    results = TestResult.objects.filter(overall_score__isnull=False)
+    low = cutoff(hist, limit)
+    if low is not None:
+        results = results.filter(overall_score__gte=low)
+    if test_id is not None:
+        results = results.filter(user_test__test_id=test_id)
+    results = results.select_related("user_test__user").order_by(
+        "-overall_score", "created_at"
+    )
+    return hist, list(results[:limit])
+
+
+@transaction.atomic
+def rebuild_histograms() -> int:
+    """Recompute every histogram row from test_results (repair/backfill)."""
+    # writers upsert before they commit; the lock gives a consistent recount
+    with connection.cursor() as cur:
+        cur.execute(
+            f"LOCK TABLE {connection.ops.quote_name(ScoreBucket._meta.db_table)} "
+            "IN SHARE ROW EXCLUSIVE MODE"
+        )
+    ScoreBucket.objects.all().delete()
+    counts: Dict[Tuple[int, int], int] = {}
+    rows = (
+        TestResult.objects.filter(overall_score__isnull=False)
+        .order_by()
+        .values("user_test__test_id", "overall_score")
+        .annotate(n=Count("pk"))
+    )
+    for row in rows.iterator(chunk_size=5000):
+        key = (row["user_test__test_id"], bucket(row["overall_score"]))
+        counts[key] = counts.get(key, 0) + row["n"]
+    ScoreBucket.objects.bulk_create(
+        (ScoreBucket(test_id=t, bucket=b, count=n) for (t, b), n in counts.items()),
+        batch_size=1000,
+    )
+    return len(counts)
@@ -1,8 +1,13 @@
 #  apps/user_tests/serializers.py
+from typing import Optional
+
+from django.conf import settings
 from rest_framework import serializers
 
+from apps.core.exports import Export
 from apps.tests.models.ielts import Test
-from .models import UserTest, TestResult
+from . import rankings
+from .models import QuestionStat, UserTest, TestResult
 
 
 class TestListItemSerializer(serializers.ModelSerializer):
@@ -36,12 +41,30 @@ class UserTestSerializer(serializers.ModelSerializer):
         ]
 
 
+class _RankedResultListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        results = list(data.all() if hasattr(data, "all") else data)
+        if results:
+            # the page's test histograms and the global one in one query
+            self.context["histograms"] = rankings.histograms(
+                {tr.user_test.test_id for tr in results}
+            )
+        return super().to_representation(results)
+
+
 class TestResultSerializer(serializers.ModelSerializer):
 
     user_test = UserTestSerializer(read_only=True)
+    percentile = serializers.SerializerMethodField(
+        help_text="Shu test natijalarining necha foizidan yuqori (0–100)"
+    )
+    global_percentile = serializers.SerializerMethodField(
+        help_text="Barcha testlar natijalarining necha foizidan yuqori (0–100)"
+    )
 
     class Meta:
         model = TestResult
+        list_serializer_class = _RankedResultListSerializer
         fields = [
             "id",
             "user_test",
@@ -49,7 +72,122 @@ class TestResultSerializer(serializers.ModelSerializer):
             "reading_score",
             "writing_score",
             "overall_score",
+            "percentile",
+            "global_percentile",
             "feedback",
             "errors_analysis",
             "created_at",
         ]
+
+    def _histograms(self, obj: TestResult):
+        hists = self.context.get("histograms")
+        if hists is None or obj.user_test.test_id not in hists:
+            hists = self.context["histograms"] = rankings.histograms(
+                [obj.user_test.test_id]
+            )
+        return hists
+
+    def get_percentile(self, obj: TestResult) -> Optional[float]:
+        hist = self._histograms(obj)[obj.user_test.test_id]
+        return rankings.percentile(hist, obj.overall_score)
+
+    def get_global_percentile(self, obj: TestResult) -> Optional[float]:
+        return rankings.percentile(self._histograms(obj)[None], obj.overall_score)
+
+
+class LeaderboardEntrySerializer(serializers.Serializer):
+    rank = serializers.IntegerField()
+    user_test_id = serializers.UUIDField()
+    user_id = serializers.UUIDField()
+    fullname = serializers.CharField()
+    overall_score = serializers.FloatField()
+    created_at = serializers.DateTimeField()
+
+
+class ScoreBucketSerializer(serializers.Serializer):
+    band = serializers.FloatField()
+    count = serializers.IntegerField()
+
+
+class LeaderboardSerializer(serializers.Serializer):
+    test_id = serializers.IntegerField(allow_null=True)
+    total = serializers.IntegerField(help_text="overall_score bor natijalar soni")
+    histogram = ScoreBucketSerializer(many=True)
+    top = LeaderboardEntrySerializer(many=True)
+
+
+class QuestionStatSerializer(serializers.ModelSerializer):
+    question_type = serializers.CharField(
+        source="question.question_type", read_only=True
+    )
+    difficulty = serializers.FloatField(
+        read_only=True, allow_null=True, help_text="To‘g‘ri javoblar ulushi (p-value)"
+    )
+    discrimination = serializers.FloatField(
+        read_only=True,
+        allow_null=True,
+        help_text="Point-biserial korrelyatsiya (savol ↔ test natijasi)",
+    )
+    choices = serializers.DictField(
+        child=serializers.IntegerField(),
+        read_only=True,
+        help_text="Variant → necha marta tanlangan (faqat variantli savollar)",
+    )
+
+    class Meta:
+        model = QuestionStat
+        fields = [
+            "question_id",
+            "question_type",
+            "attempts",
+            "correct",
+            "difficulty",
+            "discrimination",
+            "choices",
+            "updated_at",
+        ]
+        read_only_fields = fields
+
+
+class CartSerializer(serializers.Serializer):
+    test_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=settings.BUNDLES["MAX_ITEMS"],
+    )
+
+
+class CartQuoteSerializer(serializers.Serializer):
+    tests = TestSerializer(many=True)
+    already_owned = serializers.ListField(child=serializers.IntegerField())
+    not_found = serializers.ListField(child=serializers.IntegerField())
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
+    discount_percent = serializers.IntegerField()
+    discount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    balance = serializers.DecimalField(max_digits=12, decimal_places=2, allow_null=True)
+    sufficient = serializers.BooleanField()
+
+
+class CheckoutSerializer(CartQuoteSerializer):
+    purchased = UserTestSerializer(many=True)
+    new_balance = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+RESULT_EXPORT = Export(
+    "results",
+    (
+        ("id", "id"),
+        ("user_test_id", "user_test_id"),
+        ("user_id", "user_test__user_id"),
+        ("fullname", "user_test__user__fullname"),
+        ("phone_number", "user_test__user__phone_number"),
+        ("test_id", "user_test__test_id"),
+        ("test_title", "user_test__test__title"),
+        ("listening_score", "listening_score"),
+        ("reading_score", "reading_score"),
+        ("writing_score", "writing_score"),
+        ("overall_score", "overall_score"),
+        ("created_at", "created_at"),
+    ),
+)
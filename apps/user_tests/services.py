@@ -1,38 +1,343 @@
 #  apps/user_tests/services.py
+import enum
+from dataclasses import dataclass, field
 from decimal import Decimal
+from typing import Dict, List, Optional
+from uuid import UUID
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.utils import timezone
 
+from apps.core.ids import uuid7
 from apps.profiles.models import StudentProfile
 from apps.tests.models.ielts import Test
 from .models import UserTest
 
 
-@transaction.atomic
+class PurchaseOutcome(str, enum.Enum):
+    CREATED = "created"
+    ALREADY_OWNED = "already_owned"
+    INSUFFICIENT_FUNDS = "insufficient_funds"
+    NO_PROFILE = "no_profile"
+
+
+PURCHASE_ERRORS = {
+    PurchaseOutcome.ALREADY_OWNED: "Already purchased",
+    PurchaseOutcome.INSUFFICIENT_FUNDS: "Balance yetarli emas!",
+    PurchaseOutcome.NO_PROFILE: "Student profile mavjud emas",
+}
+
+
+@dataclass
+class PurchaseResult:
+    outcome: PurchaseOutcome
+    user_test: Optional[UserTest] = None  # CREATED only, built in memory
+    user_test_id: Optional[UUID] = None  # CREATED / ALREADY_OWNED (if known)
+    price: Decimal = Decimal("0.00")
+    balance: Optional[Decimal] = None  # balance after the debit
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome is PurchaseOutcome.CREATED
+
+
+# One statement. The UserTest insert goes first: ON CONFLICT waits for a
+# concurrent purchase of the same test and then skips, so a lost race is
+# reported as ALREADY_OWNED. The debit runs only if the insert happened; its
+# conditional UPDATE re-checks the balance under the profile row lock.
+_PURCHASE_SQL = """
+WITH sp AS (
+    SELECT
+        id,
+        balance,
+        CASE WHEN type = %(online)s THEN %(price)s::numeric ELSE 0 END AS price
+    FROM {profiles}
+    WHERE user_id = %(user)s
+),
+owned AS (
+    SELECT id FROM {user_tests} WHERE user_id = %(user)s AND test_id = %(test)s
+),
+ins AS (
+    INSERT INTO {user_tests}
+        (id, user_id, test_id, status, price_paid, created_at, updated_at)
+    SELECT %(id)s, %(user)s, %(test)s, %(status)s, sp.price, %(now)s, %(now)s
+    FROM sp
+    WHERE sp.balance >= sp.price AND NOT EXISTS (SELECT 1 FROM owned)
+    ON CONFLICT (user_id, test_id) DO NOTHING
+    RETURNING id
+),
+debit AS (
+    UPDATE {profiles} p
+    SET balance = p.balance - sp.price, updated_at = %(now)s
+    FROM sp
+    WHERE p.id = sp.id
+      AND sp.price > 0
+      AND p.balance >= sp.price
+      AND EXISTS (SELECT 1 FROM ins)
+    RETURNING p.balance
+)
+SELECT
+    (SELECT price FROM sp),
+    (SELECT balance FROM sp),
+    (SELECT id FROM owned),
+    (SELECT id FROM ins),
+    (SELECT balance FROM debit)
+"""
+
+
+def purchase(*, user, test: Test) -> PurchaseResult:
+    """
+    Buys `test` for `user` from the student balance in a single statement.
+    Offline (approved) students get tests for free, as before.
+    """
+    qn = connection.ops.quote_name
+    sql = _PURCHASE_SQL.format(
+        profiles=qn(StudentProfile._meta.db_table),
+        user_tests=qn(UserTest._meta.db_table),
+    )
+    params = {
+        "online": StudentProfile.TYPE_ONLINE,
+        "price": Decimal(getattr(test, "price", 0) or 0),
+        "user": user.pk,
+        "test": test.pk,
+        "id": uuid7(),
+        "status": UserTest.Status.NOT_STARTED,
+        "now": timezone.now(),
+    }
+    with transaction.atomic(), connection.cursor() as cur:
+        cur.execute(sql, params)
+        price, balance, owned_id, created_id, new_balance = cur.fetchone()
+        if price is None:
+            return PurchaseResult(PurchaseOutcome.NO_PROFILE)
+        if owned_id is not None:
+            return PurchaseResult(
+                PurchaseOutcome.ALREADY_OWNED, user_test_id=owned_id, price=price
+            )
+        if created_id is None:
+            if balance < price:
+                return PurchaseResult(PurchaseOutcome.INSUFFICIENT_FUNDS, price=price)
+            # bought by a concurrent request after our snapshot was taken
+            return PurchaseResult(PurchaseOutcome.ALREADY_OWNED, price=price)
+        if price > 0 and new_balance is None:
+            # balance was spent by a concurrent purchase: drop the insert
+            transaction.set_rollback(True)
+            return PurchaseResult(PurchaseOutcome.INSUFFICIENT_FUNDS, price=price)
+
+    ut = UserTest(
+        id=created_id,
+        user=user,
+        test=test,
+        status=params["status"],
+        price_paid=price,
+        created_at=params["now"],
+        updated_at=params["now"],
+    )
+    return PurchaseResult(
+        PurchaseOutcome.CREATED,
+        user_test=ut,
+        user_test_id=created_id,
+        price=price,
+        balance=new_balance if new_balance is not None else balance,
+    )
+
+
 def purchase_test(*, user, test: Test) -> UserTest:
-    sp = getattr(user, "student_profile", None)
-    if not sp:
-        raise ValidationError("Student profile mavjud emas")
-
-    price = (
-        Decimal(getattr(test, "price", 0))
-        if sp.type == StudentProfile.TYPE_ONLINE
-        else Decimal("0.00")
+    """purchase() for callers that want the UserTest or a ValidationError."""
+    result = purchase(user=user, test=test)
+    if result.ok:
+        return result.user_test
+    if result.outcome is PurchaseOutcome.ALREADY_OWNED:
+        return UserTest.objects.get(user=user, test=test)  # allaqachon sotib olingan
+    raise ValidationError(PURCHASE_ERRORS[result.outcome])
+
+
+# --- cart / bundle checkout ---------------------------------------------------
+
+
+@dataclass
+class CartQuote:
+    tests: List[Test]  # tests that would be bought, in request order
+    already_owned: List[int]
+    not_found: List[int]
+    prices: Dict[int, Decimal]  # test id -> price_paid after the discount
+    subtotal: Decimal = Decimal("0.00")
+    discount_percent: int = 0
+    discount: Decimal = Decimal("0.00")
+    total: Decimal = Decimal("0.00")
+    balance: Optional[Decimal] = None  # None: no student profile
+
+    @property
+    def sufficient(self) -> bool:
+        return self.balance is not None and self.balance >= self.total
+
+
+@dataclass
+class CheckoutResult:
+    outcome: PurchaseOutcome
+    quote: CartQuote
+    user_tests: List[UserTest] = field(default_factory=list)  # built in memory
+    balance: Optional[Decimal] = None  # after the debit
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome is PurchaseOutcome.CREATED
+
+
+_CENT = Decimal("0.01")
+
+
+def bundle_discount(count: int) -> int:
+    """Percent off for buying `count` tests at once (settings.BUNDLES)."""
+    rules = settings.BUNDLES.get("DISCOUNTS", {})
+    return max((pct for n, pct in rules.items() if count >= n), default=0)
+
+
+def quote_cart(*, user, test_ids: List[int]) -> CartQuote:
+    """
+    Prices the not yet owned tests of a cart without taking locks. Tests,
+    ownership and the balance come from one statement (one snapshot).
+    """
+    ids = list(dict.fromkeys(test_ids))
+    profiles = StudentProfile.objects.filter(user=user)
+    found = (
+        Test.objects.only("id", "title", "created_at", "price")
+        .annotate(
+            owned=Exists(UserTest.objects.filter(user=user, test=OuterRef("pk"))),
+            balance=Subquery(profiles.values("balance")),
+            student_type=Subquery(profiles.values("type")),
+        )
+        .in_bulk(ids)
+    )
+    if found:
+        t = next(iter(found.values()))
+        profile = {"balance": t.balance, "type": t.student_type}
+        if t.student_type is None:
+            profile = None
+    else:
+        profile = profiles.values("balance", "type").first()
+    quote = CartQuote(
+        tests=[found[i] for i in ids if i in found and not found[i].owned],
+        already_owned=[i for i in ids if i in found and found[i].owned],
+        not_found=[i for i in ids if i not in found],
+        prices={},
+        balance=profile["balance"] if profile else None,
     )
+    online = profile is not None and profile["type"] == StudentProfile.TYPE_ONLINE
+    base = {
+        t.pk: Decimal(t.price or 0) if online else Decimal("0.00") for t in quote.tests
+    }
+    quote.subtotal = sum(base.values(), Decimal("0.00"))
+    quote.discount_percent = bundle_discount(len(quote.tests))
+    quote.discount = (quote.subtotal * quote.discount_percent / 100).quantize(_CENT)
+    quote.total = quote.subtotal - quote.discount
+
+    # spread the discount over the items so that sum(price_paid) == total
+    left = quote.total
+    for n, t in enumerate(quote.tests, 1):
+        price = base[t.pk] * (100 - quote.discount_percent) / 100
+        price = left if n == len(quote.tests) else min(price.quantize(_CENT), left)
+        quote.prices[t.pk] = price
+        left -= price
+    return quote
+
+
+# All items are inserted (ON CONFLICT DO NOTHING) and the balance debited
+# once, only if every item was inserted; otherwise the caller rolls back.
+_CHECKOUT_SQL = """
+WITH sp AS (
+    SELECT id FROM {profiles} WHERE user_id = %(user)s AND balance >= %(total)s
+),
+ins AS (
+    INSERT INTO {user_tests}
+        (id, user_id, test_id, status, price_paid, created_at, updated_at)
+    SELECT c.id, %(user)s, c.test_id, %(status)s, c.price, %(now)s, %(now)s
+    FROM unnest(%(ids)s::uuid[], %(tests)s::bigint[], %(prices)s::numeric[])
+        AS c(id, test_id, price)
+    WHERE EXISTS (SELECT 1 FROM sp)
+    ORDER BY c.test_id  -- same lock order for overlapping carts
+    ON CONFLICT (user_id, test_id) DO NOTHING
+    RETURNING test_id
+),
+debit AS (
+    UPDATE {profiles} p
+    SET balance = p.balance - %(total)s, updated_at = %(now)s
+    FROM sp
+    WHERE p.id = sp.id
+      AND %(total)s > 0
+      AND p.balance >= %(total)s
+      AND (SELECT count(*) FROM ins) = %(count)s
+    RETURNING p.balance
+)
+SELECT
+    EXISTS (SELECT 1 FROM sp),
+    (SELECT count(*) FROM ins),
+    (SELECT balance FROM debit)
+"""
 
-    ut, created = UserTest.objects.get_or_create(
-        user=user, test=test, defaults={"price_paid": price}
+
+def checkout(*, user, test_ids: List[int], attempts: int = 3) -> CheckoutResult:
+    """
+    Buys every not yet owned test of the cart with one debit. If a
+    concurrent purchase changes the cart or the balance in between, the
+    statement is rolled back and the cart re-quoted (up to `attempts` times).
+    """
+    qn = connection.ops.quote_name
+    sql = _CHECKOUT_SQL.format(
+        profiles=qn(StudentProfile._meta.db_table),
+        user_tests=qn(UserTest._meta.db_table),
     )
-    if not created:
-        return ut  # allaqachon sotib olingan
-
-    if price > 0:
-        # concurrency-safe balansni tekshirish
-        sp = StudentProfile.objects.select_for_update().get(pk=sp.pk)
-        if sp.balance < price:
-            raise ValidationError("Balance yetarli emas!")
-        sp.balance -= price
-        sp.save(update_fields=["balance"])
-
-    return ut
+    for _ in range(attempts):
+        quote = quote_cart(user=user, test_ids=test_ids)
+        if quote.balance is None:
+            return CheckoutResult(PurchaseOutcome.NO_PROFILE, quote)
+        if not quote.tests:
+            return CheckoutResult(PurchaseOutcome.ALREADY_OWNED, quote)
+        if not quote.sufficient:
+            return CheckoutResult(PurchaseOutcome.INSUFFICIENT_FUNDS, quote)
+
+        now = timezone.now()
+        ids = [uuid7() for _ in quote.tests]
+        params = {
+            "user": user.pk,
+            "total": quote.total,
+            "ids": ids,
+            "tests": [t.pk for t in quote.tests],
+            "prices": [quote.prices[t.pk] for t in quote.tests],
+            "count": len(quote.tests),
+            "status": UserTest.Status.NOT_STARTED,
+            "now": now,
+        }
+        with transaction.atomic(), connection.cursor() as cur:
+            cur.execute(sql, params)
+            funded, inserted, balance = cur.fetchone()
+            if not funded or inserted != len(quote.tests):
+                transaction.set_rollback(True)
+                continue
+            if quote.total > 0 and balance is None:
+                transaction.set_rollback(True)
+                continue
+
+        user_tests = [
+            UserTest(
+                id=pk,
+                user=user,
+                test=t,
+                status=params["status"],
+                price_paid=quote.prices[t.pk],
+                created_at=now,
+                updated_at=now,
+            )
+            for pk, t in zip(ids, quote.tests)
+        ]
+        if balance is None:  # free for this student, nothing was debited
+            balance = quote.balance
+        return CheckoutResult(PurchaseOutcome.CREATED, quote, user_tests, balance)
+
+    # still racing after several attempts: report the latest state
+    quote = quote_cart(user=user, test_ids=test_ids)
+    if not quote.tests:
+        return CheckoutResult(PurchaseOutcome.ALREADY_OWNED, quote)
+    return CheckoutResult(PurchaseOutcome.INSUFFICIENT_FUNDS, quote)
@@ -0,0 +1,42 @@
+# apps/user_tests/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import TestResult, UserTest
+from .rankings import record_score
+
+
+@receiver(post_save, sender=TestResult)
+def move_result_bucket(sender, instance: TestResult, created, update_fields, **kwargs):
+    if update_fields is not None and "overall_score" not in update_fields:
+        return
+    if created:
+        old = None
+    elif hasattr(instance, "_saved_overall"):
+        old = instance._saved_overall
+    else:
+        return  # built by hand and saved over a row: rebuild_score_histograms
+    record_score(instance.user_test_id, old, instance.overall_score)  # type: ignore[attr-defined]
+    instance._saved_overall = instance.overall_score
+
+
+@receiver(post_delete, sender=TestResult)
+def release_result_bucket(sender, instance: TestResult, **kwargs):
+    # cascades from UserTest run before the user_tests row is deleted
+    old = getattr(instance, "_saved_overall", instance.overall_score)
+    record_score(instance.user_test_id, old, None)  # type: ignore[attr-defined]
+
+
+@receiver(post_save, sender=TestResult)
+def complete_scored_test(sender, instance: TestResult, **kwargs):
+    # Tests with a writing part are completed by grade_submission once every
+    # task is checked; without one, a scored result is the end of the test.
+    if instance.overall_score is None:
+        return
+    ut = (
+        UserTest.objects.filter(pk=instance.user_test_id, test__writing__isnull=True)  # type: ignore[attr-defined]
+        .exclude(status=UserTest.Status.COMPLETED)
+        .first()
+    )
+    if ut is not None:
+        ut.mark_completed()
@@ -1,3 +1,214 @@
-from django.test import TestCase
+# apps/user_tests/tests.py
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.db import IntegrityError, transaction
+from django.db.backends.utils import CursorWrapper
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.profiles.models import StudentProfile
+from apps.tests.models import Question, Test
+from apps.users.models import User
+from .models import ScoreBucket, TestResult, UserAnswer, UserTest
+from .rankings import bucket, histograms, rebuild_histograms
+from .services import PurchaseOutcome, checkout, purchase, quote_cart
+
+
+def _user(role: str, i: int) -> User:
+    return User.objects.create_user(
+        fullname=f"{role} {i}", phone_number=f"+99804{i:07d}", role=role
+    )
+
+
+def _fund(user: User, balance: str) -> None:
+    StudentProfile.objects.filter(user=user).update(balance=Decimal(balance))
+
+
+def _balance(user: User) -> Decimal:
+    return StudentProfile.objects.get(user=user).balance
+
+
+def _without_debit(cursor):
+    # as if a concurrent purchase spent the balance between the statement's
+    # snapshot and its conditional debit
+    return cursor.cursor.fetchone()[:4] + (None,)
+
+
+class PurchaseTests(TestCase):
+    def setUp(self):
+        self.student = _user(User.Roles.STUDENT, 1)
+        self.test = Test.objects.create(title="T", price=Decimal("30000.00"))
+
+    def _owned(self) -> int:
+        return UserTest.objects.filter(user=self.student, test=self.test).count()
+
+    def test_created_debits_the_balance(self):
+        _fund(self.student, "50000.00")
+        result = purchase(user=self.student, test=self.test)
+        self.assertIs(result.outcome, PurchaseOutcome.CREATED)
+        self.assertEqual(result.balance, Decimal("20000.00"))
+        self.assertEqual(_balance(self.student), Decimal("20000.00"))
+        ut = UserTest.objects.get(user=self.student, test=self.test)
+        self.assertEqual(ut.pk, result.user_test_id)
+        self.assertEqual(ut.price_paid, Decimal("30000.00"))
+
+    def test_already_owned_is_not_charged_twice(self):
+        _fund(self.student, "50000.00")
+        first = purchase(user=self.student, test=self.test)
+        result = purchase(user=self.student, test=self.test)
+        self.assertIs(result.outcome, PurchaseOutcome.ALREADY_OWNED)
+        self.assertEqual(result.user_test_id, first.user_test_id)
+        self.assertEqual(_balance(self.student), Decimal("20000.00"))
+        self.assertEqual(self._owned(), 1)
+
+    def test_insufficient_funds(self):
+        _fund(self.student, "29999.99")
+        result = purchase(user=self.student, test=self.test)
+        self.assertIs(result.outcome, PurchaseOutcome.INSUFFICIENT_FUNDS)
+        self.assertEqual(_balance(self.student), Decimal("29999.99"))
+        self.assertEqual(self._owned(), 0)
+
+    def test_no_profile(self):
+        teacher = _user(User.Roles.TEACHER, 2)
+        result = purchase(user=teacher, test=self.test)
+        self.assertIs(result.outcome, PurchaseOutcome.NO_PROFILE)
+        self.assertFalse(UserTest.objects.filter(user=teacher).exists())
+
+    def test_offline_student_buys_for_free(self):
+        StudentProfile.objects.filter(user=self.student).update(
+            is_approved=True, type=StudentProfile.TYPE_OFFLINE
+        )
+        result = purchase(user=self.student, test=self.test)
+        self.assertIs(result.outcome, PurchaseOutcome.CREATED)
+        self.assertEqual(result.price, Decimal("0.00"))
+        self.assertEqual(_balance(self.student), Decimal("0.00"))
+        self.assertEqual(self._owned(), 1)
+
+    def test_failed_debit_rolls_back_the_insert(self):
+        _fund(self.student, "50000.00")
+        with mock.patch.object(CursorWrapper, "fetchone", _without_debit, create=True):
+            result = purchase(user=self.student, test=self.test)
+        self.assertIs(result.outcome, PurchaseOutcome.INSUFFICIENT_FUNDS)
+        self.assertEqual(self._owned(), 0)
+        self.assertEqual(_balance(self.student), Decimal("50000.00"))
+
+
+@override_settings(BUNDLES={"MAX_ITEMS": 20, "DISCOUNTS": {2: 10}})
+class CartTests(TestCase):
+    def setUp(self):
+        self.student = _user(User.Roles.STUDENT, 11)
+        self.tests = [
+            Test.objects.create(title=f"T{i}", price=Decimal("0.05")) for i in range(3)
+        ]
+        self.ids = [t.pk for t in self.tests]
+
+    def _owned(self):
+        return set(
+            UserTest.objects.filter(user=self.student).values_list("test_id", flat=True)
+        )
+
+    def test_discount_remainder_goes_to_the_last_item(self):
+        _fund(self.student, "1.00")
+        quote = quote_cart(user=self.student, test_ids=self.ids[:2])
+        self.assertEqual(quote.subtotal, Decimal("0.10"))
+        self.assertEqual(quote.discount, Decimal("0.01"))
+        self.assertEqual(quote.total, Decimal("0.09"))
+        # 0.045 rounds to 0.04; the last item absorbs the remaining cent
+        self.assertEqual(
+            [quote.prices[i] for i in self.ids[:2]],
+            [Decimal("0.04"), Decimal("0.05")],
+        )
+
+        result = checkout(user=self.student, test_ids=self.ids[:2])
+        self.assertIs(result.outcome, PurchaseOutcome.CREATED)
+        self.assertEqual(_balance(self.student), Decimal("0.91"))
+        paid = dict(
+            UserTest.objects.filter(user=self.student).values_list(
+                "test_id", "price_paid"
+            )
+        )
+        self.assertEqual(paid, quote.prices)
+
+    def test_owned_and_unknown_ids_are_left_out(self):
+        _fund(self.student, "1.00")
+        purchase(user=self.student, test=self.tests[0])  # 0.05
+        missing = max(self.ids) + 1000
+        cart = [self.ids[0], missing, self.ids[1], self.ids[2], self.ids[1]]
+
+        result = checkout(user=self.student, test_ids=cart)
+        self.assertIs(result.outcome, PurchaseOutcome.CREATED)
+        self.assertEqual(result.quote.already_owned, [self.ids[0]])
+        self.assertEqual(result.quote.not_found, [missing])
+        self.assertEqual([t.pk for t in result.quote.tests], self.ids[1:])
+        self.assertEqual(result.quote.total, Decimal("0.09"))
+        self.assertEqual(_balance(self.student), Decimal("0.86"))
+        self.assertEqual(self._owned(), set(self.ids))
+
+        again = checkout(user=self.student, test_ids=cart)
+        self.assertIs(again.outcome, PurchaseOutcome.ALREADY_OWNED)
+        self.assertEqual(_balance(self.student), Decimal("0.86"))
+
+    def test_insufficient_funds_buys_nothing(self):
+        _fund(self.student, "0.08")
+        result = checkout(user=self.student, test_ids=self.ids[:2])
+        self.assertIs(result.outcome, PurchaseOutcome.INSUFFICIENT_FUNDS)
+        self.assertEqual(self._owned(), set())
+        self.assertEqual(_balance(self.student), Decimal("0.08"))
+
+    def test_retries_end_in_insufficient_funds(self):
+        _fund(self.student, "1.00")
+        calls = []
+
+        def lost_race(cursor):
+            # every attempt loses one item to a concurrent purchase
+            calls.append(1)
+            funded, inserted, balance = cursor.cursor.fetchone()
+            return funded, inserted - 1, balance
+
+        with mock.patch.object(CursorWrapper, "fetchone", lost_race, create=True):
+            result = checkout(user=self.student, test_ids=self.ids)
+        self.assertEqual(len(calls), 3)
+        self.assertIs(result.outcome, PurchaseOutcome.INSUFFICIENT_FUNDS)
+        self.assertEqual(self._owned(), set())
+        self.assertEqual(_balance(self.student), Decimal("1.00"))
+
+
+class UniqueAnswerTriggerTests(TestCase):
+    def test_one_answer_per_question_across_partitions(self):
+        ut = UserTest.objects.create(
+            user=_user(User.Roles.STUDENT, 41), test=Test.objects.create(title="T")
+        )
+        question = Question.objects.create(text="q")
+        UserAnswer.objects.create(user_test=ut, question=question)
+
+        # a month later the lookup still reaches the first answer's partition
+        later = timezone.now() + timedelta(days=31)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UserAnswer.objects.create(user_test=ut, question=question, created_at=later)
+        UserAnswer.objects.create(
+            user_test=ut, question=Question.objects.create(text="q2"), created_at=later
+        )
+        self.assertEqual(ut.answers.count(), 2)
+
+
+class HistogramTests(TestCase):
+    def test_all_tests_histogram_is_summed_per_bucket(self):
+        tests = [Test.objects.create(title=f"T{i}") for i in range(2)]
+        scores = [(tests[0], 6.0), (tests[0], 7.0), (tests[1], 6.0)]
+        for i, (test, score) in enumerate(scores):
+            ut = UserTest.objects.create(
+                user=_user(User.Roles.STUDENT, 51 + i), test=test
+            )
+            TestResult.objects.create(user_test=ut, overall_score=score)
+
+        hists = histograms([tests[0].pk])
+        self.assertEqual(set(hists), {None, tests[0].pk})
+        self.assertEqual(hists[tests[0].pk][bucket(6.0)], 1)
+        self.assertEqual(hists[None][bucket(6.0)], 2)
+        self.assertEqual(sum(hists[None]), 3)
+        self.assertFalse(ScoreBucket.objects.filter(test__isnull=True).exists())
+
+        rebuild_histograms()
+        self.assertEqual(histograms([tests[0].pk]), hists)
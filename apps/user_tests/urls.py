@@ -3,8 +3,13 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    path("all-tests/", views.all_tests, name="all-tests"),
+    path("all-tests/", views.AllTestsView.as_view(), name="all-tests"),
     path("purchase/<int:test_id>/", views.purchase_test_api, name="purchase-test"),
+    path("cart/quote/", views.cart_quote, name="cart-quote"),
+    path("cart/checkout/", views.cart_checkout, name="cart-checkout"),
     path("my-tests/", views.my_tests, name="my-tests"),
     path("results/", views.my_results, name="my-results"),
+    path("results/export/", views.export_results, name="results-export"),
+    path("item-stats/", views.item_stats, name="item-stats"),
+    path("leaderboard/", views.leaderboard, name="leaderboard"),
 ]
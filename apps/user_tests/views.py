@@ -8,14 +8,39 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.core.metrics import PURCHASES
+from apps.core.async_views import AsyncAPIView
+from apps.core.exports import export_schema
+from apps.core.pagination import (
+    CreatedAtCursorPagination,
+    apaginate,
+    clamp_limit,
+    paginate,
+    paginated_schema,
+)
+from apps.profiles.permissions import IsTeacherOrSuperAdmin
 from apps.tests.models.ielts import Test
-from .models import UserTest, TestResult
+from apps.users.permissions import IsSuperAdmin
+from . import rankings
+from .models import QuestionStat, UserTest, TestResult
 from .serializers import (
+    CartQuoteSerializer,
+    CartSerializer,
+    CheckoutSerializer,
+    LeaderboardSerializer,
+    QuestionStatSerializer,
     TestListItemSerializer,
     UserTestSerializer,
     TestResultSerializer,
+    RESULT_EXPORT,
+)
+from .services import (
+    PURCHASE_ERRORS,
+    PurchaseOutcome,
+    checkout,
+    purchase,
+    quote_cart,
 )
-from .services import purchase_test
 
 
 @extend_schema(
@@ -23,16 +48,19 @@ from .services import purchase_test
     summary="Barcha testlar (purchased flag bilan)",
     responses={200: TestListItemSerializer(many=True)},
 )
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-def all_tests(request):
-    purchased_qs = UserTest.objects.filter(user=request.user, test=OuterRef("pk"))
-    tests = (
-        Test.objects.all()
-        .annotate(purchased=Exists(purchased_qs))
-        .order_by("-created_at")
-    )
-    return Response(TestListItemSerializer(tests, many=True).data)
+class AllTestsView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+
+    async def get(self, request, *args, **kwargs):
+        purchased_qs = UserTest.objects.filter(user=request.user, test=OuterRef("pk"))
+        tests = Test.objects.all().annotate(purchased=Exists(purchased_qs))
+        return await apaginate(
+            request,
+            tests,
+            TestListItemSerializer,
+            pagination_class=self.pagination_class,
+        )
 
 
 @extend_schema(
@@ -52,20 +80,66 @@ def all_tests(request):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def purchase_test_api(request, test_id: int):
-    user = request.user
     test = get_object_or_404(Test, pk=test_id)
+    result = purchase(user=request.user, test=test)
+    PURCHASES.labels(result.outcome.value).inc()
 
-    if UserTest.objects.filter(user=user, test=test).exists():
-        return Response({"detail": "Already purchased"}, status=400)
+    if result.outcome is PurchaseOutcome.ALREADY_OWNED:
+        return Response({"detail": PURCHASE_ERRORS[result.outcome]}, status=400)
+    if not result.ok:
+        return Response({"error": PURCHASE_ERRORS[result.outcome]}, status=400)
 
-    try:
-        ut = purchase_test(user=user, test=test)
-    except Exception as e:
-        return Response({"error": str(e)}, status=400)
+    return Response(
+        UserTestSerializer(result.user_test).data, status=status.HTTP_201_CREATED
+    )
+
+
+@extend_schema(
+    tags=["UserTests"],
+    summary="Savat narxi (bundle chegirmasi bilan)",
+    request=CartSerializer,
+    responses={200: CartQuoteSerializer},
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def cart_quote(request):
+    ser = CartSerializer(data=request.data)
+    ser.is_valid(raise_exception=True)
+    quote = quote_cart(user=request.user, test_ids=ser.validated_data["test_ids"])
+    return Response(CartQuoteSerializer(quote).data)
 
-    return Response(UserTestSerializer(ut).data, status=status.HTTP_201_CREATED)
 
+@extend_schema(
+    tags=["UserTests"],
+    summary="Savatdagi testlarni bitta to‘lov bilan sotib olish",
+    request=CartSerializer,
+    responses={201: CheckoutSerializer, 400: CartQuoteSerializer},
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def cart_checkout(request):
+    ser = CartSerializer(data=request.data)
+    ser.is_valid(raise_exception=True)
+    result = checkout(user=request.user, test_ids=ser.validated_data["test_ids"])
+    PURCHASES.labels(result.outcome.value).inc()
+
+    if not result.ok:
+        data = CartQuoteSerializer(result.quote).data
+        key = "detail" if result.outcome is PurchaseOutcome.ALREADY_OWNED else "error"
+        return Response({key: PURCHASE_ERRORS[result.outcome], **data}, status=400)
+
+    data = CheckoutSerializer(
+        {
+            **vars(result.quote),
+            "sufficient": result.quote.sufficient,
+            "purchased": result.user_tests,
+            "new_balance": result.balance,
+        }
+    ).data
+    return Response(data, status=status.HTTP_201_CREATED)
 
+
+@paginated_schema()
 @extend_schema(
     tags=["UserTests"],
     summary="Mening sotib olingan testlarim (My tests)",
@@ -74,14 +148,11 @@ def purchase_test_api(request, test_id: int):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def my_tests(request):
-    uts = (
-        UserTest.objects.filter(user=request.user)
-        .select_related("test")
-        .order_by("-created_at")
-    )
-    return Response(UserTestSerializer(uts, many=True).data)
+    uts = UserTest.objects.filter(user=request.user).select_related("test")
+    return paginate(request, uts, UserTestSerializer)
 
 
+@paginated_schema()
 @extend_schema(
     tags=["UserTests"],
     summary="Mening natijalarim (Result reviews)",
@@ -90,9 +161,109 @@ def my_tests(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def my_results(request):
-    results = (
-        TestResult.objects.filter(user_test__user=request.user)
-        .select_related("user_test__test")
-        .order_by("-created_at")
+    results = TestResult.objects.filter(user_test__user=request.user).select_related(
+        "user_test__test"
+    )
+    return paginate(request, results, TestResultSerializer)
+
+
+@export_schema("UserTests", "Natijalar eksporti (CSV / JSONL, superadmin)")
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsSuperAdmin])
+def export_results(request):
+    return RESULT_EXPORT.view_response(request, TestResult.objects.all())
+
+
+@extend_schema(
+    tags=["UserTests"],
+    summary="Savollar statistikasi (item analysis, teacher/superadmin)",
+    description=(
+        "Har bir savol bo‘yicha yig‘ilgan statistika: difficulty (p-value), "
+        "discrimination va variantlar tanlanishi. Butun bank bitta so‘rov bilan."
+    ),
+    parameters=[
+        OpenApiParameter("question_set", OpenApiTypes.INT, required=False),
+        OpenApiParameter("question_type", OpenApiTypes.STR, required=False),
+        OpenApiParameter(
+            "min_attempts",
+            OpenApiTypes.INT,
+            required=False,
+            description="Kamida shuncha javob berilgan savollar.",
+        ),
+    ],
+    responses={200: QuestionStatSerializer(many=True)},
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsTeacherOrSuperAdmin])
+def item_stats(request):
+    qp = request.query_params
+    stats = (
+        QuestionStat.objects.select_related("question")
+        .only(
+            *(f.name for f in QuestionStat._meta.concrete_fields),
+            "question__question_type",
+        )
+        .order_by("question_id")
     )
-    return Response(TestResultSerializer(results, many=True).data)
+    try:
+        if qp.get("question_set"):
+            stats = stats.filter(question__sets=int(qp["question_set"]))
+        if qp.get("min_attempts"):
+            stats = stats.filter(attempts__gte=int(qp["min_attempts"]))
+    except ValueError:
+        return Response({"detail": "Noto‘g‘ri parametr."}, status=400)
+    if qp.get("question_type"):
+        stats = stats.filter(question__question_type=qp["question_type"])
+    return Response(QuestionStatSerializer(stats, many=True).data)
+
+
+@extend_schema(
+    tags=["UserTests"],
+    summary="Reyting: ballar taqsimoti va eng yaxshi natijalar (teacher/superadmin)",
+    description=(
+        "`test` berilsa shu test bo‘yicha, aks holda barcha testlar bo‘yicha. "
+        "Taqsimot 0–9 oralig‘ida 0.5 qadamli band’lar."
+    ),
+    parameters=[
+        OpenApiParameter("test", OpenApiTypes.INT, required=False),
+        OpenApiParameter(
+            "limit",
+            OpenApiTypes.INT,
+            required=False,
+            description="Top natijalar soni (default 20, max 100).",
+        ),
+    ],
+    responses={200: LeaderboardSerializer},
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsTeacherOrSuperAdmin])
+def leaderboard(request):
+    qp = request.query_params
+    try:
+        test_id = int(qp["test"]) if qp.get("test") else None
+        limit = clamp_limit(int(qp.get("limit") or 0))
+    except ValueError:
+        return Response({"detail": "Noto‘g‘ri parametr."}, status=400)
+    hist, top = rankings.leaderboard(test_id, limit)
+
+    entries, rank, previous = [], 0, None
+    for i, tr in enumerate(top, start=1):
+        if tr.overall_score != previous:
+            rank, previous = i, tr.overall_score
+        entries.append(
+            {
+                "rank": rank,
+                "user_test_id": tr.user_test_id,
+                "user_id": tr.user_test.user_id,
+                "fullname": tr.user_test.user.fullname,
+                "overall_score": tr.overall_score,
+                "created_at": tr.created_at,
+            }
+        )
+    data = {
+        "test_id": test_id,
+        "total": sum(hist),
+        "histogram": [{"band": b / 2, "count": count} for b, count in enumerate(hist)],
+        "top": entries,
+    }
+    return Response(LeaderboardSerializer(data).data)
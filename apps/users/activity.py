@@ -0,0 +1,164 @@
+# apps/users/activity.py
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from apps.core.metrics import ACTIVITY_FLUSHED
+
+log = logging.getLogger(__name__)
+
+# users.last_activity without a write per request: touches are floored to
+# ACTIVITY["GRANULARITY"] seconds and kept in memory (one entry per user, later
+# touches in the same bucket are free). A daemon thread writes them every
+# FLUSH_INTERVAL seconds, or as soon as MAX_PENDING users are waiting, with a
+# single UPDATE ... FROM (VALUES ...). last_activity therefore lags by at most
+# GRANULARITY + FLUSH_INTERVAL seconds (plus one flush after a crash: lost).
+
+
+def _floor(when: datetime, granularity: int) -> datetime:
+    ts = int(when.timestamp()) // granularity * granularity
+    return datetime.fromtimestamp(ts, tz=dt_timezone.utc)
+
+
+class _Tracker:
+    def __init__(self, granularity: int, interval: float, max_pending: int):
+        self.granularity = max(int(granularity), 1)
+        self.interval = interval
+        self.max_pending = max_pending
+        self.pending: Dict[object, datetime] = {}
+        self.seen: Dict[object, datetime] = {}  # user -> last bucket recorded
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name="activity-flusher", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def touch(self, user_id, when: Optional[datetime] = None) -> None:
+        bucket = _floor(when or datetime.now(dt_timezone.utc), self.granularity)
+        last = self.seen.get(user_id)
+        if last is not None and last >= bucket:
+            return  # already recorded for this bucket, no lock needed
+        with self._lock:
+            last = self.seen.get(user_id)
+            if last is not None and last >= bucket:
+                return
+            self.seen[user_id] = bucket
+            self.pending[user_id] = bucket
+            full = len(self.pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        with self._lock:
+            batch, self.pending = self.pending, {}
+            # forget users idle for a whole bucket, so `seen` stays bounded
+            cutoff = _floor(datetime.now(dt_timezone.utc), self.granularity)
+            self.seen = {k: v for k, v in self.seen.items() if v >= cutoff}
+        if not batch:
+            return 0
+        # sorted ids: concurrent flushes from other workers lock rows in the
+        # same order and cannot deadlock
+        rows = sorted(batch.items(), key=lambda kv: str(kv[0]))
+        values = ", ".join(["(%s::uuid, %s::timestamptz)"] * len(rows))
+        params = [v for row in rows for v in row]
+        try:
+            with connection.cursor() as cur:
+                cur.execute(
+                    "UPDATE users AS u SET last_activity = v.ts "
+                    f"FROM (VALUES {values}) AS v(id, ts) "
+                    "WHERE u.id = v.id "
+                    "AND (u.last_activity IS NULL OR u.last_activity < v.ts)",
+                    params,
+                )
+                updated = cur.rowcount
+        except Exception as e:  # noqa
+            log.warning("Activity flush failed (%d users): %s", len(rows), e)
+            with self._lock:  # retry with the next flush
+                for user_id, bucket in batch.items():
+                    if self.pending.get(user_id, bucket) <= bucket:
+                        self.pending[user_id] = bucket
+            return 0
+        finally:
+            connection.close()  # back to the pool; this thread is mostly idle
+        ACTIVITY_FLUSHED.inc(updated)
+        return updated
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def shutdown(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+
+_tracker: Optional[_Tracker] = None
+_tracker_lock = threading.Lock()
+
+
+def tracker() -> _Tracker:
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                cfg = settings.ACTIVITY
+                _tracker = _Tracker(
+                    cfg.get("GRANULARITY", 60),
+                    cfg.get("FLUSH_INTERVAL", 30),
+                    cfg.get("MAX_PENDING", 5000),
+                )
+    return _tracker
+
+
+def touch(user_id, when: Optional[datetime] = None) -> None:
+    """Records activity of `user_id`; written to the database on the next flush."""
+    tracker().touch(user_id, when)
+
+
+class ActivityMiddleware:
+    """Touches request.user after the view ran (settings.ACTIVITY)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.ACTIVITY.get("ENABLED"):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self._touch(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        self._touch(request)
+        return response
+
+    @staticmethod
+    def _touch(request):
+        # DRF and the async views set request.user once they authenticated
+        user = request.__dict__.get("user")
+        if user is not None and user.is_authenticated:
+            touch(user.pk)
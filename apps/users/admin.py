@@ -9,7 +9,10 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.contrib.auth.forms import ReadOnlyPasswordHashField
 
+from apps.accounts.revocation import revoke_user
+from .authentication import invalidate_user
 from .models import User
+from .search import search_users
 
 StudentInline = None
 TeacherInline = None
@@ -171,6 +174,7 @@ class UserAdmin(DjangoUserAdmin):
     ordering = ("-created_at",)
 
     readonly_fields = ("created_at", "updated_at", "last_activity")
+    show_full_result_count = False
 
     fieldsets = (
         ("Identity", {"fields": ("fullname", "phone_number", "role")}),
@@ -221,14 +225,28 @@ class UserAdmin(DjangoUserAdmin):
         if TeacherInline:
             inlines.append(TeacherInline)
 
+    def get_search_results(self, request, queryset, search_term):
+        # Same indexed lookups as the API instead of four `%q%` scans.
+        return search_users(queryset, search_term), False
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and "is_active" in form.changed_data and not obj.is_active:
+            revoke_user(obj.pk)
+
     @admin.action(description="Mark as active")
     def make_active(self, request, queryset):
-        updated = queryset.update(is_active=True)
+        pks = list(queryset.values_list("pk", flat=True))
+        updated = User.objects.filter(pk__in=pks).update(is_active=True)
+        invalidate_user(*pks)
         self.message_user(request, f"{updated} user(s) marked active.")
 
     @admin.action(description="Mark as inactive")
     def make_inactive(self, request, queryset):
-        updated = queryset.update(is_active=False)
+        pks = list(queryset.values_list("pk", flat=True))
+        updated = User.objects.filter(pk__in=pks).update(is_active=False)
+        invalidate_user(*pks)
+        revoke_user(*pks)
         self.message_user(request, f"{updated} user(s) marked inactive.")
 
     actions = ("make_active", "make_inactive")
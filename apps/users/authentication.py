@@ -0,0 +1,137 @@
+# apps/users/authentication.py
+from __future__ import annotations
+
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+    TokenError,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from apps.accounts import revocation
+
+from .models import AUTH_STATE_FIELDS, CachedUser, User
+
+# simplejwt's JWTAuthentication reads the users row on every request. Here the
+# few fields permissions need (role, flags, student profile id) are kept in
+# the cache for AUTH_USER_CACHE["TTL"] seconds and dropped whenever the user
+# or their profile is saved or deleted (apps/users/signals.py,
+# apps/profiles/signals.py). A miss costs the same single query as before.
+
+ROLE_CLAIM = "role"
+ACTIVE_CLAIM = "active"
+STUDENT_PROFILE_CLAIM = "spid"
+
+
+def _key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+def _state(user: User, student_profile_id) -> dict:
+    state = {f: getattr(user, f) for f in AUTH_STATE_FIELDS}
+    state["student_profile_id"] = (
+        str(student_profile_id) if student_profile_id else None
+    )
+    return state
+
+
+def _load_user(user_id) -> Optional[CachedUser]:
+    """Full user row plus its student profile id in one query; caches the state."""
+    user = (
+        CachedUser.objects.filter(pk=user_id)
+        .annotate(spid=F("student_profile__id"))
+        .first()
+    )
+    if user is None:
+        return None
+    user.student_profile_id = user.spid
+    user._auth_state = _state(user, user.spid)
+    cache.set(_key(user_id), user._auth_state, settings.AUTH_USER_CACHE["TTL"])
+    return user
+
+
+def user_state(user_id) -> Optional[dict]:
+    """Cached auth state of a user, or None if there is no such user."""
+    state = cache.get(_key(user_id))
+    if state is None:
+        user = _load_user(user_id)
+        state = user._auth_state if user is not None else None
+    return state
+
+
+def invalidate_user(*user_ids) -> None:
+    cache.delete_many([_key(pk) for pk in user_ids])
+
+
+class _RevocableMixin:
+    def verify(self):
+        super().verify()
+        if revocation.is_revoked(self.payload):
+            raise TokenError(_("Token is revoked"))
+
+
+class AuthAccessToken(_RevocableMixin, AccessToken):
+    pass
+
+
+class AuthRefreshToken(_RevocableMixin, RefreshToken):
+    """Refresh/access pair carrying role, active flag and student profile id."""
+
+    access_token_class = AuthAccessToken
+
+    def blacklist(self):
+        # called by TokenRefreshSerializer after rotation
+        revocation.revoke_token(self.payload)
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        state = user_state(user.pk) or {}
+        token[ROLE_CLAIM] = state.get("role", user.role)
+        token[ACTIVE_CLAIM] = state.get("is_active", user.is_active)
+        token[STUDENT_PROFILE_CLAIM] = state.get("student_profile_id")
+        return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication whose request.user is a CachedUser built from the cached
+    auth state: no users query on a cache hit. Tokens whose role claim no
+    longer matches the user are rejected, so a role change forces a new login.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        state = cache.get(_key(user_id))
+        if state is None:
+            # miss: load the whole row, so the request needs no further query
+            user = _load_user(user_id)
+            state = user._auth_state if user is not None else None
+        else:
+            user = None
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not state["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        role = validated_token.get(ROLE_CLAIM)
+        if role is not None and role != state["role"]:
+            raise AuthenticationFailed(_("Token is stale"), code="token_stale")
+        return user or CachedUser.from_auth_state(user_id, state)
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    # same "jwtAuth" bearer scheme in the OpenAPI schema
+    target_class = CachedJWTAuthentication
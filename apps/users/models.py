@@ -10,16 +10,19 @@ from django.contrib.auth.models import (
     Group,
     Permission,
 )
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import DEFAULT_DB_ALIAS, models
 from django.db.models import Q
-from django.db.models.functions import Lower
+from django.db.models.functions import Lower, Upper
 from django.utils import timezone
 
+from apps.core.ids import uuid7
+
 
 class UUIDPrimaryKeyMixin(models.Model):
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     class Meta:
         abstract = True
@@ -151,6 +154,21 @@ class User(UUIDPrimaryKeyMixin, TimeStampedMixin, AbstractBaseUser, PermissionsM
             models.Index(fields=["role"], name="users_role_idx"),
             models.Index(fields=["telegram_id"], name="users_tgid_idx"),
             models.Index(fields=["created_at"], name="users_created_idx"),
+            # pg_trgm indexes for apps/users/search.py (`%q%` lookups)
+            GinIndex(
+                OpClass(Upper("fullname"), name="gin_trgm_ops"),
+                name="users_fullname_trgm",
+            ),
+            GinIndex(
+                fields=["telegram_username"],
+                opclasses=["gin_trgm_ops"],
+                name="users_tg_username_trgm",
+            ),
+            GinIndex(
+                fields=["phone_number"],
+                opclasses=["gin_trgm_ops"],
+                name="users_phone_trgm",
+            ),
         ]
         constraints = [
             models.CheckConstraint(
@@ -177,5 +195,60 @@ class User(UUIDPrimaryKeyMixin, TimeStampedMixin, AbstractBaseUser, PermissionsM
         return super().save(*args, **kwargs)
 
     def update_last_activity(self):
+        # coalesced with other touches and written by the next flush
+        from .activity import touch
+
         self.last_activity = timezone.now()
-        self.save(update_fields=["last_activity"])
+        touch(self.pk, self.last_activity)
+
+
+# Fields the JWT authentication keeps in its per-user cache (see
+# apps/users/authentication.py); everything else is loaded on demand.
+AUTH_STATE_FIELDS = ("role", "is_active", "is_staff", "is_superuser")
+
+
+class CachedUser(User):
+    """
+    request.user for JWT requests, built from the cached auth state without
+    a query. Only id, role and the flags are loaded. The other fields are
+    deferred and the first access to any of them loads all of them at once.
+    save() never writes the cached fields back unless they were changed.
+    """
+
+    class Meta:
+        proxy = True
+        default_permissions = ()
+
+    @classmethod
+    def from_auth_state(cls, user_id, state: dict) -> "CachedUser":
+        known = {
+            "id": uuid.UUID(str(user_id)),
+            **{f: state[f] for f in AUTH_STATE_FIELDS},
+        }
+        names = [f.attname for f in cls._meta.concrete_fields if f.attname in known]
+        user = cls.from_db(DEFAULT_DB_ALIAS, names, [known[n] for n in names])
+        user.student_profile_id = state.get("student_profile_id")
+        user._auth_state = {f: state[f] for f in AUTH_STATE_FIELDS}
+        return user
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred  # one query for all of them, not one per field
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+    def save(self, *args, **kwargs):
+        if kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            deferred = self.get_deferred_fields()
+            state = getattr(self, "_auth_state", {})
+            kwargs["update_fields"] = {
+                f.attname
+                for f in self._meta.concrete_fields
+                if not f.primary_key
+                and f.attname not in deferred
+                and (
+                    f.attname not in state
+                    or getattr(self, f.attname) != state[f.attname]
+                )
+            } | {"updated_at"}
+        return super().save(*args, **kwargs)
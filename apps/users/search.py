@@ -0,0 +1,53 @@
+# apps/users/search.py
+from __future__ import annotations
+
+import re
+
+from django.db.models import Q, QuerySet
+
+# Below this length a trigram index cannot narrow the search, so names fall
+# back to a prefix match instead of a full `%q%` scan.
+TRIGRAM_MIN_LEN = 3
+
+_phone_chars_re = re.compile(r"^\+?[\d\s\-()]+$")
+_non_digits_re = re.compile(r"\D")
+
+
+def _phone_query(q: str) -> Q | None:
+    if not _phone_chars_re.match(q):
+        return None
+    digits = _non_digits_re.sub("", q)
+    if not digits:
+        return None
+
+    # International form (+998..., 998...) -> prefix range on the
+    # varchar_pattern_ops index Django keeps for the unique phone_number;
+    # other fragments use users_phone_trgm.
+    if q.startswith("+") or digits.startswith("998"):
+        cond = Q(phone_number__startswith=f"+{digits}") | Q(
+            phone_number__startswith=digits
+        )
+    elif len(digits) >= TRIGRAM_MIN_LEN:
+        cond = Q(phone_number__contains=digits)
+    else:
+        cond = Q(phone_number__startswith=f"+{digits}")
+
+    if len(digits) <= 18:
+        cond |= Q(telegram_id=int(digits))
+    return cond
+
+
+def _text_query(q: str) -> Q:
+    username = q.lstrip("@").lower()
+    if len(q) < TRIGRAM_MIN_LEN:
+        return Q(fullname__istartswith=q) | Q(telegram_username__startswith=username)
+    # fullname: icontains -> UPPER(fullname) LIKE, served by users_fullname_trgm
+    # telegram_username is stored lowercased, so a plain LIKE is enough.
+    return Q(fullname__icontains=q) | Q(telegram_username__contains=username)
+
+
+def search_users(qs: QuerySet, q: str | None) -> QuerySet:
+    q = (q or "").strip()
+    if not q:
+        return qs
+    return qs.filter(_phone_query(q) or _text_query(q))
@@ -0,0 +1,15 @@
+# apps/users/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_user
+from .models import CachedUser, User
+
+
+# proxy saves are sent with sender=CachedUser, so both senders are needed
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=CachedUser)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=CachedUser)
+def drop_cached_auth_state(sender, instance: User, **kwargs):
+    invalidate_user(instance.pk)
@@ -1,5 +1,4 @@
 #  apps/users/views.py
-from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
@@ -7,8 +6,11 @@ from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
+from apps.accounts.revocation import revoke_user
+from apps.core.pagination import CreatedAtCursorPagination
 from .models import User
 from .permissions import IsSuperAdmin
+from .search import search_users
 from .serializers import (
     UserReadSerializer,
     UserMeUpdateSerializer,
@@ -45,7 +47,10 @@ class MeView(generics.RetrieveUpdateAPIView):
     parameters=[
         OpenApiParameter(
             name="q",
-            description="Qidirish (fullname/phone/telegram)",
+            description=(
+                "Qidirish (fullname/phone/telegram). `+998...` ko‘rinishidagi "
+                "raqamlar prefiks bo‘yicha qidiriladi."
+            ),
             required=False,
             type=OpenApiTypes.STR,
         ),
@@ -68,19 +73,15 @@ class MeView(generics.RetrieveUpdateAPIView):
 class UsersListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsSuperAdmin]
     serializer_class = UserReadSerializer
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
-        qs = User.objects.all().order_by("-created_at")
+        qs = User.objects.all()
         q = self.request.query_params.get("q")  # noqa
         role = self.request.query_params.get("role")  # noqa
         is_active = self.request.query_params.get("is_active")  # noqa
 
-        if q:
-            qs = qs.filter(
-                Q(fullname__icontains=q)
-                | Q(phone_number__icontains=q)
-                | Q(telegram_username__icontains=q)
-            )
+        qs = search_users(qs, q)
         if role in {"student", "teacher", "superadmin"}:
             qs = qs.filter(role=role)
         if is_active in {"0", "1"}:
@@ -111,4 +112,6 @@ def toggle_status(request, pk):
     user = get_object_or_404(User, pk=pk)
     user.is_active = not user.is_active
     user.save(update_fields=["is_active", "updated_at"])
+    if not user.is_active:
+        revoke_user(user.pk)
     return Response(UserReadSerializer(user).data, status=status.HTTP_200_OK)
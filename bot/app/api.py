@@ -6,6 +6,9 @@ from typing import Any
 
 import httpx
 
+from . import tracing
+from .logger import REQUEST_ID_HEADER, current_request_id
+
 BACKEND_BASE_URL = os.getenv("BACKEND_BASE_URL", "http://web:8000")
 INGEST_TOKEN = os.getenv("BOT_INGEST_TOKEN")
 
@@ -15,15 +18,28 @@ class BackendClient:
         self._client = httpx.AsyncClient(base_url=BACKEND_BASE_URL, timeout=10.0)
         self._hdr = {"X-Bot-Token": INGEST_TOKEN or ""}
 
+    def _headers(self) -> dict[str, str]:
+        hdr = {**self._hdr, REQUEST_ID_HEADER: current_request_id()}
+        return tracing.inject(hdr)
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        async with tracing.span(f"backend {method} {url}", kind="client") as sp:
+            r = await self._client.request(
+                method, url, headers=self._headers(), **kwargs
+            )
+            if sp is not None:
+                sp.attrs["http.status"] = r.status_code
+            return r
+
     async def close(self) -> None:
         await self._client.aclose()
 
     async def get_otp_status(
         self, *, telegram_id: int, telegram_username: str, purpose: str
     ) -> dict[str, Any]:
-        r = await self._client.get(
+        r = await self._request(
+            "GET",
             "/api/accounts/otp/status/",
-            headers=self._hdr,
             params={
                 "telegram_id": telegram_id,
                 "telegram_username": telegram_username or "",
@@ -36,9 +52,9 @@ class BackendClient:
     async def push_otp(
         self, *, telegram_id: int, telegram_username: str, code: str, purpose: str
     ) -> httpx.Response:
-        r = await self._client.post(
+        r = await self._request(
+            "POST",
             "/api/accounts/otp/ingest/",
-            headers=self._hdr,
             json={
                 "telegram_id": telegram_id,
                 "telegram_username": telegram_username or "",
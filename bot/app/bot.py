@@ -7,6 +7,8 @@ from aiogram.enums import ParseMode
 
 from .config import settings
 from .handlers import common, auth
+from .logger import RequestIdMiddleware
+from .tracing import TracingMiddleware
 
 
 def build_bot() -> Bot:
@@ -18,6 +20,8 @@ def build_bot() -> Bot:
 
 def build_dispatcher() -> Dispatcher:
     dp = Dispatcher()
+    dp.update.outer_middleware(RequestIdMiddleware())
+    dp.update.outer_middleware(TracingMiddleware())
     dp.include_router(auth.router)
     dp.include_router(common.router)
     return dp
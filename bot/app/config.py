@@ -11,6 +11,10 @@ class Settings(BaseSettings):
     backend_base_url: str = Field(alias="BACKEND_BASE_URL")
 
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
+    log_format: str = Field(default="json", alias="LOG_FORMAT")  # json | text
+    tracing_enabled: bool = Field(default=False, alias="TRACING_ENABLED")
+    trace_sample_rate: float = Field(default=0.1, alias="TRACING_SAMPLE_RATE")
+    trace_file: str = Field(default="/tmp/bot-traces.jsonl", alias="TRACING_FILE")
     health_host: str = Field(default="0.0.0.0", alias="HEALTH_HOST")
     health_port: int = Field(default=8081, alias="HEALTH_PORT")
     
@@ -1,11 +1,111 @@
 from __future__ import annotations
+
+import atexit
+import json
 import logging
+import queue
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
 from .config import settings
 
+REQUEST_ID_HEADER = "X-Request-ID"
+# One id per Telegram update; BackendClient forwards it so the Django logs of
+# the same OTP flow carry the same request_id.
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+_RESERVED = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__.keys()
+    | {"message", "asctime", "request_id"}
+)
+
+
+def current_request_id() -> str:
+    rid = request_id_var.get()
+    if rid == "-":
+        rid = uuid.uuid4().hex
+        request_id_var.set(rid)
+    return rid
+
+
+class RequestIdMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        update_id = (
+            getattr(event, "update_id", None) if isinstance(event, Update) else None
+        )
+        rid = (
+            f"tg-{update_id}-{uuid.uuid4().hex[:8]}" if update_id else uuid.uuid4().hex
+        )
+        token = request_id_var.set(rid)
+        try:
+            return await handler(event, data)
+        finally:
+            request_id_var.reset(token)
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _PreparedQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # only resolve %-args here; JSON/traceback formatting runs in the
+        # listener thread, off the event loop
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
 
 def setup_logging() -> None:
     level = getattr(logging, settings.log_level.upper(), logging.INFO)
-    logging.basicConfig(
-        level=level,
-        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-    )
+
+    stream = logging.StreamHandler()
+    if settings.log_format == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(
+            logging.Formatter(
+                "%(asctime)s | %(levelname)s | %(name)s | %(request_id)s | %(message)s"
+            )
+        )
+
+    q: queue.Queue = queue.Queue(10000)
+    handler = _PreparedQueueHandler(q)
+    handler.addFilter(RequestIdFilter())
+    listener = QueueListener(q, stream)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
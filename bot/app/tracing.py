@@ -0,0 +1,189 @@
+# bot/app/tracing.py
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import queue
+import random
+import secrets
+import threading
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from .config import settings
+
+# Same span format as apps/core/tracing.py on the backend, so both files can
+# be fed to `manage.py trace_report` together.
+TRACEPARENT_HEADER = "traceparent"
+log = logging.getLogger(__name__)
+
+
+class Span:
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "start",
+        "duration_ms",
+        "status",
+        "attrs",
+        "_t0",
+    )
+
+    def __init__(self, trace_id: str, name: str, kind: str, parent_id=None, **attrs):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time()
+        self.duration_ms = 0.0
+        self.status = "ok"
+        self.attrs: Dict[str, Any] = attrs
+        self._t0 = time.perf_counter()
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.duration_ms = round((time.perf_counter() - self._t0) * 1000, 3)
+        if error is not None:
+            self.status = "error"
+            self.attrs["error"] = f"{type(error).__name__}: {error}"[:300]
+        _exporter.put(
+            {
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "name": self.name,
+                "kind": self.kind,
+                "service": "bot",
+                "start": self.start,
+                "duration_ms": self.duration_ms,
+                "status": self.status,
+                "attrs": self.attrs,
+            }
+        )
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+@asynccontextmanager
+async def span(name: str, kind: str = "internal", **attrs):
+    """Child of the current span; no-op (yields None) outside a sampled trace."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    sp = Span(parent.trace_id, name, kind, parent_id=parent.span_id, **attrs)
+    token = _current.set(sp)
+    try:
+        yield sp
+    except BaseException as e:
+        _current.reset(token)
+        sp.finish(e)
+        raise
+    _current.reset(token)
+    sp.finish()
+
+
+def inject(headers: Dict[str, str]) -> Dict[str, str]:
+    sp = _current.get()
+    if sp is not None:
+        headers[TRACEPARENT_HEADER] = sp.traceparent
+    return headers
+
+
+class TracingMiddleware(BaseMiddleware):
+    """Root span per Telegram update (sampled by TRACING_SAMPLE_RATE)."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if (
+            not settings.tracing_enabled
+            or random.random() >= settings.trace_sample_rate
+        ):
+            return await handler(event, data)
+        sp = Span(
+            secrets.token_hex(16),
+            "telegram.update",
+            "server",
+            update_id=getattr(event, "update_id", None),
+        )
+        token = _current.set(sp)
+        try:
+            result = await handler(event, data)
+        except BaseException as e:
+            _current.reset(token)
+            sp.finish(e)
+            raise
+        _current.reset(token)
+        sp.finish()
+        return result
+
+
+class _FileExporter:
+    """Writes spans as JSON lines from a daemon thread, off the event loop."""
+
+    def __init__(self, path: str, maxsize: int = 10000):
+        self.path = path
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def put(self, data: dict) -> None:
+        if not self.path:
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="trace-exporter", daemon=True
+                    )
+                    self._thread.start()
+                    atexit.register(self.shutdown)
+        try:
+            self.queue.put_nowait(data)
+        except queue.Full:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < 512:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = None in batch
+            try:
+                with open(self.path, "a", encoding="utf-8") as fh:
+                    for data in batch:
+                        if data is not None:
+                            fh.write(json.dumps(data, ensure_ascii=False) + "\n")
+            except OSError as e:
+                log.warning("Trace export failed: %s", e)
+            if done:
+                return
+
+    def shutdown(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join(timeout=5)
+
+
+_exporter = _FileExporter(settings.trace_file)
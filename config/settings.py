@@ -28,6 +28,9 @@ SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 # APPLICATIONS
 # ===================================
 DJANGO_APPS = [
+    # daphne: `runserver` ASGI serverini ishga tushiradi (async view’lar uchun);
+    # staticfiles’dan oldin turishi shart
+    "daphne",
     "jazzmin",
     "django.contrib.admin",
     "django.contrib.auth",
@@ -35,6 +38,7 @@ DJANGO_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 ]
 
 THIRD_PARTY_APPS = [
@@ -62,6 +66,11 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 # MIDDLEWARE
 # ===================================
 MIDDLEWARE = [
+    "apps.core.log.RequestIdMiddleware",  # X-Request-ID (bot → backend)
+    "apps.core.tracing.TracingMiddleware",  # TRACING["ENABLED"] bo‘lsa
+    "apps.core.metrics.MetricsMiddleware",  # METRICS["ENABLED"] bo‘lsa
+    "apps.core.profiling.QueryProfilerMiddleware",  # PROFILING["ENABLED"] bo‘lsa
+    "apps.users.activity.ActivityMiddleware",  # ACTIVITY["ENABLED"] bo‘lsa
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # CORS first, after sessions
@@ -73,10 +82,11 @@ MIDDLEWARE = [
 ]
 
 # ===================================
-# URLS & WSGI
+# URLS & WSGI / ASGI
 # ===================================
 ROOT_URLCONF = "config.urls"
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 # ===================================
 # DATABASE (Docker)
@@ -89,6 +99,20 @@ DATABASES = {
         "PASSWORD": env("POSTGRES_PASSWORD"),
         "HOST": env("POSTGRES_HOST"),
         "PORT": env("POSTGRES_PORT"),
+        # ASGI’da har bir so‘rov o‘z thread’ida ulanish ochadi — pool bo‘lmasa
+        # yuqori concurrency’da Postgres max_connections tugaydi.
+        # POSTGRES_POOL_MAX_SIZE=0 pool’ni o‘chiradi.
+        "OPTIONS": (
+            {
+                "pool": {
+                    "min_size": env.int("POSTGRES_POOL_MIN_SIZE", default=2),
+                    "max_size": env.int("POSTGRES_POOL_MAX_SIZE", default=20),
+                    "timeout": env.float("POSTGRES_POOL_TIMEOUT", default=30.0),
+                }
+            }
+            if env.int("POSTGRES_POOL_MAX_SIZE", default=20)
+            else {}
+        ),
     }
 }
 
@@ -158,7 +182,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     # --- Auth / Perms
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.users.authentication.CachedJWTAuthentication",
         # Browsable API uchun faqat DEBUG’da sessiya auth qulay:
         *(
             ("rest_framework.authentication.SessionAuthentication",)
@@ -202,8 +226,10 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     # --- Datetime format
     "DATETIME_FORMAT": "%Y-%m-%dT%H:%M:%SZ",
-    # --- Pagination (tavsiya etiladi: count ko‘rinadi, bo‘sh ro‘yxatda ham aniqroq)
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # --- Pagination: keyset (cursor) — OFFSET ham, COUNT(*) ham yo‘q.
+    # Boshqa ustun bo‘yicha tartiblangan view’lar apps.core.pagination dagi
+    # mos class’ni `pagination_class` orqali ko‘rsatadi.
+    "DEFAULT_PAGINATION_CLASS": "apps.core.pagination.CreatedAtCursorPagination",
     "PAGE_SIZE": 20,
     # --- Testlar uchun qulaylik
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
@@ -221,7 +247,18 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
     "ALGORITHM": "HS256",
     # "SIGNING_KEY": SECRET_KEY,  # odatda default SECRET_KEY ishlatiladi
-    "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
+    "AUTH_TOKEN_CLASSES": ("apps.users.authentication.AuthAccessToken",),
+    "TOKEN_REFRESH_SERIALIZER": "apps.accounts.serializers.TokenRefreshSerializer",
+}
+
+# Bekor qilingan tokenlar (apps/accounts/revocation.py): har bir process
+# ularni xotirada (Bloom filter) saqlaydi va REFRESH_INTERVAL sekundda yangilaydi;
+# REBUILD_INTERVAL’da to‘liq qayta quriladi va muddati o‘tgan qatorlar o‘chiriladi.
+TOKEN_REVOCATION = {
+    "REFRESH_INTERVAL": env.float("TOKEN_REVOCATION_REFRESH_INTERVAL", default=5.0),
+    "REBUILD_INTERVAL": env.float("TOKEN_REVOCATION_REBUILD_INTERVAL", default=3600.0),
+    "CAPACITY": env.int("TOKEN_REVOCATION_CAPACITY", default=100_000),
+    "ERROR_RATE": env.float("TOKEN_REVOCATION_ERROR_RATE", default=0.001),
 }
 
 
@@ -278,21 +315,142 @@ PAYMENTS = {
 SPEAKING = {
     "FEE": 50000,
 }
+
+# Savat (bir nechta testni bitta to‘lov bilan olish): kamida N ta test -> % chegirma.
+BUNDLES = {
+    "MAX_ITEMS": 20,
+    "DISCOUNTS": {3: 10, 5: 15, 10: 25},
+}
+# So‘rov profiler: SQL soni/vaqti, takroriy so‘rovlar (N+1), serializer vaqti.
+# Prod’da SAMPLE_RATE bilan faqat so‘rovlarning bir qismi o‘lchanadi.
+PROFILING = {
+    "ENABLED": env.bool("PROFILING_ENABLED", default=False),
+    "SAMPLE_RATE": env.float("PROFILING_SAMPLE_RATE", default=1.0),
+    "DUPLICATE_THRESHOLD": env.int("PROFILING_DUPLICATE_THRESHOLD", default=2),
+    "HEADERS": env.bool("PROFILING_HEADERS", default=True),
+}
+
+# Prometheus metrics: /metrics/ faqat TOKEN berilganda ochiladi
+# (`Authorization: Bearer <TOKEN>`), aks holda 404. DB’dan o‘qiladigan domain
+# gauge’lar (to‘lovlar, aktiv userlar) DOMAIN_TTL sekund keshda turadi.
+# Bir nechta worker bo‘lsa PROMETHEUS_MULTIPROC_DIR env’ini umumiy papkaga
+# qo‘ying — har bir scrape barcha worker’lar yig‘indisini qaytaradi.
+METRICS = {
+    "ENABLED": env.bool("METRICS_ENABLED", default=True),
+    "TOKEN": env("METRICS_TOKEN", default=""),
+    "DOMAIN_TTL": env.int("METRICS_DOMAIN_TTL", default=60),
+}
+
+# Admin changelist’lar: natija ESTIMATE_THRESHOLD qatordan ko‘p bo‘lsa COUNT(*)
+# o‘rniga Postgres taxmini (reltuples / EXPLAIN) ko‘rsatiladi.
+ADMIN_PAGINATION = {
+    "ESTIMATE_THRESHOLD": env.int("ADMIN_PAGINATION_ESTIMATE_THRESHOLD", default=10000),
+}
+
+# CSV / JSONL eksportlar (natijalar, to‘lovlar, top-up loglar): qatorlar
+# server-side cursor orqali CHUNK_SIZE tadan o‘qiladi va oqim bilan yuboriladi.
+EXPORTS = {
+    "CHUNK_SIZE": env.int("EXPORT_CHUNK_SIZE", default=2000),
+}
+
+# Savollar statistikasi (difficulty, discrimination, variantlar): LIVE bo‘lsa
+# UserTest yakunlanganda darhol qo‘shiladi, aks holda tungi
+# `manage.py update_item_stats` BATCH_SIZE tadan qo‘shadi.
+ITEM_STATS = {
+    "LIVE": env.bool("ITEM_STATS_LIVE", default=True),
+    "BATCH_SIZE": env.int("ITEM_STATS_BATCH_SIZE", default=500),
+}
+
+# users.last_activity: so‘rovlar xotirada yig‘iladi va har FLUSH_INTERVAL
+# sekundda (yoki MAX_PENDING ta user yig‘ilganda) bitta UPDATE bilan yoziladi.
+# GRANULARITY — aniqlik (sekund); kechikish GRANULARITY + FLUSH_INTERVAL dan oshmaydi.
+ACTIVITY = {
+    "ENABLED": env.bool("ACTIVITY_ENABLED", default=True),
+    "GRANULARITY": env.int("ACTIVITY_GRANULARITY", default=60),
+    "FLUSH_INTERVAL": env.float("ACTIVITY_FLUSH_INTERVAL", default=30.0),
+    "MAX_PENDING": env.int("ACTIVITY_MAX_PENDING", default=5000),
+}
+
+# Tracing: bot → backend → Telegram span’lari (W3C traceparent header).
+# FILE — JSON lines (`manage.py trace_report` bilan tahlil qilinadi),
+# ENDPOINT — span’lar batch qilib POST qilinadigan collector URL.
+TRACING = {
+    "ENABLED": env.bool("TRACING_ENABLED", default=False),
+    "SAMPLE_RATE": env.float("TRACING_SAMPLE_RATE", default=0.1),
+    "FILE": env("TRACING_FILE", default="/tmp/traces.jsonl"),
+    "ENDPOINT": env("TRACING_ENDPOINT", default=""),
+}
+
+# created_at bo‘yicha partition qilingan jadvallar. `manage.py maintain_partitions`
+# har kuni (docker-compose `scheduler` servisi, deploy’da runner.sh ham)
+# oldindan PREMAKE ta partition yaratadi va RETENTION dan eski partition’larni
+# ARCHIVE ("detach" — alohida jadval bo‘lib qoladi, "drop" — o‘chiriladi)
+# qiladi. RETENTION None — hech narsa o‘chirilmaydi.
+PARTITIONS = {
+    "user_answers": {
+        "INTERVAL": "month",
+        "PREMAKE": 3,
+        "RETENTION": None,
+        "ARCHIVE": "detach",
+    },
+    "verification_codes": {
+        "INTERVAL": "day",
+        "PREMAKE": 7,
+        "RETENTION": env.int("VERIFICATION_CODES_RETENTION_DAYS", default=30),
+        "ARCHIVE": "drop",
+    },
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "apps.core.cache.InstrumentedLocMemCache",
+        "LOCATION": "default",
+    }
+}
+
+# JWT auth: user role/is_active/student profile id keshda saqlanadi (sekund).
+# LocMem har bir process’da alohida — boshqa worker’larda eskirish TTL bilan cheklangan.
+AUTH_USER_CACHE = {
+    "TTL": env.int("AUTH_USER_CACHE_TTL", default=60),
+}
+
 TELEGRAM_BOT_TOKEN = env("TELEGRAM_BOT_TOKEN", default="")
 TELEGRAM_ADMIN_CHAT_ID = env("TELEGRAM_ADMIN_CHAT_ID", default="")
 
 # ===================================
 # LOGGING (useful in Docker)
 # ===================================
+# LOG_FORMAT: json | text — bot bilan bir xil qiymatlar (bir .env); noma’lum
+# qiymat oddiy matnli (verbose) formatga tushadi.
+LOG_FORMAT = env("LOG_FORMAT", default="json")
+LOG_FORMATTER = {"json": "json", "text": "verbose"}.get(LOG_FORMAT, "verbose")
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "filters": {
+        "request_id": {"()": "apps.core.log.RequestIdFilter"},
+        # INFO/DEBUG sampling per logger, masalan:
+        # LOG_SAMPLE_RATES="apps.profiling=0.1,django.db.backends=0.01"
+        "sampling": {
+            "()": "apps.core.log.SamplingFilter",
+            "rates": env.dict("LOG_SAMPLE_RATES", cast={"value": float}, default={}),
+        },
+    },
     "formatters": {
-        "verbose": {"format": "[{asctime}] {levelname} {name} {message}", "style": "{"},
+        "json": {"()": "apps.core.log.JsonFormatter"},
+        "verbose": {
+            "format": "[{asctime}] {levelname} {name} [{request_id}] {message}",
+            "style": "{",
+        },
         "simple": {"format": "{levelname} {message}", "style": "{"},
     },
     "handlers": {
-        "console": {"class": "logging.StreamHandler", "formatter": "verbose"},
+        # Yozish/formatlash alohida thread’da (QueueListener) — request yo‘lida emas.
+        "console": {
+            "class": "apps.core.log.QueueStreamHandler",
+            "formatter": LOG_FORMATTER,
+            "filters": ["request_id", "sampling"],
+        },
     },
-    "root": {"handlers": ["console"], "level": "INFO"},
+    "root": {"handlers": ["console"], "level": env("LOG_LEVEL", default="INFO")},
 }
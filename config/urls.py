@@ -3,6 +3,8 @@ from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from apps.core.metrics import metrics_view
+
 urlpatterns = [
     # Admin
     path("admin/", admin.site.urls),
@@ -15,6 +17,8 @@ urlpatterns = [
     path("api/tests/", include("apps.tests.urls")),
     path("api/payments/", include("apps.payments.urls")),
     path("api/speaking/", include("apps.speaking.urls")),
+    # Prometheus scrape endpoint (plain Django view, no DRF/auth stack)
+    path("metrics/", metrics_view, name="metrics"),
     # API schema & docs
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
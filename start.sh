@@ -23,6 +23,9 @@ python manage.py makemigrations --noinput
 echo "🚀  Applying migrations …"
 python manage.py migrate --noinput
 
+echo "🗂️  Creating upcoming partitions …"
+python manage.py maintain_partitions
+
 echo "📦  Collecting static files …"
 python manage.py collectstatic --noinput
 